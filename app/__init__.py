@@ -8,8 +8,10 @@ from flask_login import LoginManager
 from flask_wtf import CSRFProtect
 
 from config import Config
-from .models import User, db
-from .routes import bp
+from . import counters  # noqa: F401  registers the counter session events
+from . import cache, compression, identity, jobs, media, metrics, recent, replicas, sqlstats, tokens
+from .models import db
+from .routes import api_posts_batch, bp
 
 csrf = CSRFProtect()
 
@@ -29,15 +31,26 @@ def create_app(config_class: type[Config] = Config) -> Flask:
         Path(app.config[key]).mkdir(parents=True, exist_ok=True)
 
     db.init_app(app)
+    metrics.init_app(app)
     csrf.init_app(app)
+    sqlstats.init_app(app)
+    cache.init_app(app)
+    jobs.init_app(app)
+    replicas.init_app(app)
+    media.init_app(app)
+    identity.init_app(app)
+    recent.init_app(app)
+    compression.init_app(app)
 
     login_manager = LoginManager(app)
     login_manager.login_view = "app.login"
     login_manager.login_message_category = "danger"
 
-    @login_manager.user_loader
-    def load_user(user_id: str):
-        return db.session.get(User, int(user_id))
+    login_manager.user_loader(identity.load_user)
+    login_manager.request_loader(tokens.load_user_from_request)
+
+    # api_login_required checks CSRF itself, and only for cookie-authenticated calls.
+    csrf.exempt(api_posts_batch)
 
     app.register_blueprint(bp)
     return app
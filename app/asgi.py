@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+import re
+from urllib.parse import parse_qs
+
+from flask import Flask
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from config import Config
+
+from . import create_app
+from .models import Comment, Post
+from .pagination import InvalidCursor, keyset_paginate_async
+from .routes import serialize_comment, serialize_post
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def async_database_url(url: str) -> str:
+    """Swap a sync driver for its asyncio counterpart (aiosqlite / asyncpg)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        raise RuntimeError(f"No async driver known for {parsed.drivername!r}.")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _limit(query: dict, default: int = 20) -> int:
+    try:
+        limit = int(query.get("limit", [default])[0])
+    except ValueError:
+        limit = default
+    return min(limit if limit > 0 else default, 100)
+
+
+def _flask_environ(scope: dict) -> dict:
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"],
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+    }
+    for name, value in scope.get("headers", ()):
+        environ["HTTP_" + name.decode("latin-1").upper().replace("-", "_")] = value.decode(
+            "latin-1"
+        )
+    return environ
+
+
+class AsyncAPI:
+    def __init__(self, flask_app: Flask, engine: AsyncEngine) -> None:
+        # The Flask app supplies config and URL building for the shared serializers.
+        self.flask_app = flask_app
+        self.engine = engine
+        self.sessions = async_sessionmaker(engine, expire_on_commit=False)
+        self.routes = [
+            (re.compile(r"^/api/posts$"), self.list_posts, serialize_post),
+            (re.compile(r"^/api/posts/(\d+)$"), self.get_post, serialize_post),
+            (re.compile(r"^/api/posts/(\d+)/comments$"), self.list_comments, serialize_comment),
+        ]
+
+    async def list_posts(self, session, query: dict) -> tuple[list, dict]:
+        limit = _limit(query)
+        stmt = select(Post).options(joinedload(Post.user))
+        try:
+            page = await keyset_paginate_async(session, stmt, query.get("cursor", [""])[0], limit)
+        except InvalidCursor as exc:
+            raise HTTPError(400, "Invalid cursor") from exc
+        payload = {
+            "limit": limit,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
+        return page.items, payload
+
+    async def get_post(self, session, query: dict, post_id: str) -> tuple[Post, dict]:
+        post = await session.get(Post, int(post_id), options=[joinedload(Post.user)])
+        if post is None:
+            raise HTTPError(404, "Not found")
+        return post, {}
+
+    async def list_comments(self, session, query: dict, post_id: str) -> tuple[list, dict]:
+        post = await session.get(Post, int(post_id))
+        if post is None:
+            raise HTTPError(404, "Not found")
+        limit = _limit(query, default=50)
+        try:
+            page = max(int(query.get("page", ["1"])[0]), 1)
+        except ValueError:
+            page = 1
+        result = await session.scalars(
+            select(Comment)
+            .options(joinedload(Comment.user))
+            .where(Comment.post_id == post.id)
+            .order_by(Comment.date_created, Comment.id)
+            .limit(limit)
+            .offset((page - 1) * limit)
+        )
+        return list(result), {"page": page, "limit": limit, "total": post.comment_count}
+
+    def _resolve(self, path: str):
+        for pattern, handler, serialize in self.routes:
+            match = pattern.match(path)
+            if match:
+                return handler, serialize, match.groups()
+        raise HTTPError(404, "Not found")
+
+    async def _dispatch(self, scope: dict) -> tuple[int, dict]:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPError(405, "Method not allowed")
+        handler, serialize, args = self._resolve(scope["path"])
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        async with self.sessions() as session:
+            result, payload = await handler(session, query, *args)
+        # Serialization builds media URLs, which needs a Flask request context. Everything
+        # it touches was loaded eagerly above, so no lazy load can hit the database here.
+        with self.flask_app.request_context(_flask_environ(scope)):
+            if not isinstance(result, list):
+                return 200, serialize(result)
+            payload["items"] = [serialize(item) for item in result]
+        return 200, payload
+
+    async def __call__(self, scope: dict, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await self.engine.dispose()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        try:
+            status, payload = await self._dispatch(scope)
+        except HTTPError as exc:
+            status, payload = exc.status, {"error": str(exc)}
+        body = json.dumps(payload).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send(
+            {"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body}
+        )
+
+
+def create_asgi_app(config_class: type[Config] = Config) -> AsyncAPI:
+    """Serve the posts API over an ``AsyncEngine``; run with ``uvicorn --factory``."""
+    flask_app = create_app(config_class)
+    url = flask_app.config.get("ASYNC_DATABASE_URL") or async_database_url(
+        flask_app.config["SQLALCHEMY_DATABASE_URI"]
+    )
+    options = dict(flask_app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    engine = create_async_engine(url, **options)
+    return AsyncAPI(flask_app, engine)
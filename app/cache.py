@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import functools
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+from flask import Flask, current_app, has_app_context, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .metrics import PAGE_CACHE_EVENTS
+from .models import Comment, Post, User
+
+FEED = "feed"
+_PENDING_KEY = "pulse_cache_invalidate"
+
+
+class CacheBackend:
+    """Key/value store with TTLs plus per-namespace generation counters.
+
+    Bumping a namespace generation orphans every key built with the old generation, which
+    invalidates a whole family of entries with a single write.
+    """
+
+    def get(self, key: str) -> Any | None:
+        return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def generation(self, namespace: str) -> int:
+        return 0
+
+    def bump(self, namespace: str) -> None:
+        pass
+
+    def after_fork(self) -> None:
+        """Drop handles inherited from the parent process."""
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU with per-entry TTL; safe to share between threads."""
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._generations: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def generation(self, namespace: str) -> int:
+        return self._generations[namespace]
+
+    def bump(self, namespace: str) -> None:
+        with self._lock:
+            self._generations[namespace] += 1
+
+
+class SQLiteCache(CacheBackend):
+    """Cache in a SQLite file, shared by every worker process on the host."""
+
+    def __init__(self, path: str | Path, max_entries: int = 4096) -> None:
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entry "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entry_expires ON cache_entry(expires)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_generation "
+                "(namespace TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+    def after_fork(self) -> None:
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any | None:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value FROM cache_entry WHERE key = ? AND expires > ?", (key, time.time())
+            )
+            .fetchone()
+        )
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value), now + ttl),
+        )
+        conn.execute("DELETE FROM cache_entry WHERE expires <= ?", (now,))
+        conn.execute(
+            "DELETE FROM cache_entry WHERE key NOT IN "
+            "(SELECT key FROM cache_entry ORDER BY expires DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM cache_entry WHERE key = ?", (key,))
+
+    def generation(self, namespace: str) -> int:
+        row = (
+            self._connect()
+            .execute("SELECT value FROM cache_generation WHERE namespace = ?", (namespace,))
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def bump(self, namespace: str) -> None:
+        self._connect().execute(
+            "INSERT INTO cache_generation (namespace, value) VALUES (?, 1) "
+            "ON CONFLICT(namespace) DO UPDATE SET value = value + 1",
+            (namespace,),
+        )
+
+
+class PageCache:
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    def key(self, namespace: str) -> str:
+        args = urlencode(sorted(request.args.items(multi=True)))
+        return f"{namespace}:{self.backend.generation(namespace)}:{request.endpoint}?{args}"
+
+    def get(self, key: str) -> Any | None:
+        value = self.backend.get(key)
+        namespace = key.partition(":")[0]
+        PAGE_CACHE_EVENTS.labels(namespace, "hit" if value is not None else "miss").inc()
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(key, value, self.ttl)
+
+    def invalidate(self, namespace: str) -> None:
+        self.backend.bump(namespace)
+        PAGE_CACHE_EVENTS.labels(namespace, "invalidation").inc()
+
+
+def create_backend(app: Flask, kind: str | None = None) -> CacheBackend | None:
+    kind = kind or app.config.get("PAGE_CACHE_BACKEND", "auto")
+    # auto is memory here; manage.py serve switches it to sqlite when it runs several workers.
+    if kind in ("memory", "auto"):
+        return LRUCache(app.config.get("PAGE_CACHE_MAX_ENTRIES", 512))
+    if kind == "sqlite":
+        return SQLiteCache(
+            app.config["PAGE_CACHE_PATH"], app.config.get("PAGE_CACHE_MAX_ENTRIES", 512)
+        )
+    if kind in ("none", "", None):
+        return None
+    raise RuntimeError(f"Unknown PAGE_CACHE_BACKEND {kind!r}.")
+
+
+def init_app(app: Flask) -> None:
+    backend = create_backend(app)
+    if backend is not None:
+        app.extensions["pulse_page_cache"] = PageCache(
+            backend, app.config.get("PAGE_CACHE_TTL", 60)
+        )
+
+
+def get_page_cache() -> PageCache | None:
+    return current_app.extensions.get("pulse_page_cache")
+
+
+def cached_page(namespace: str):
+    """Serve anonymous GETs of the decorated view from the page cache."""
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_page_cache()
+            if (
+                cache is None
+                or request.method != "GET"
+                or "_flashes" in session
+                or current_user.is_authenticated
+            ):
+                return view(*args, **kwargs)
+
+            key = cache.key(namespace)
+            cached = cache.get(key)
+            if cached is not None:
+                body, mimetype = cached
+                response = make_response(body)
+                response.mimetype = mimetype
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, (response.get_data(), response.mimetype))
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _affects_feed(obj) -> bool:
+    if isinstance(obj, (Post, Comment)):
+        return True
+    if isinstance(obj, User):
+        return inspect(obj).attrs.profile_image.history.has_changes()
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_invalidations(session: Session, flush_context) -> None:
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    if any(_affects_feed(obj) for obj in changed):
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_PENDING_KEY, False) and has_app_context():
+        cache = get_page_cache()
+        if cache is not None:
+            cache.invalidate(FEED)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from flask import Flask, Response, current_app, request, send_from_directory
+from flask_login import current_user
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+STATIC_EXTENSIONS = {".css", ".js", ".mjs", ".svg", ".html", ".txt", ".json", ".map", ".xml"}
+
+
+def negotiate_encoding() -> str | None:
+    """The client's preferred encoding we can produce, brotli winning ties."""
+    accepted = request.accept_encodings
+    candidates = [("gzip", accepted.quality("gzip"))]
+    if brotli is not None:
+        candidates.insert(0, ("br", accepted.quality("br")))
+    encoding, quality = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if quality > 0 else None
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compressible(response: Response, config) -> bool:
+    return (
+        200 <= response.status_code < 300
+        and response.status_code != 204
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in config["COMPRESSION_MIMETYPES"]
+        # BREACH: logged-in pages carry the CSRF token next to reflected input.
+        and not (response.mimetype == "text/html" and current_user.is_authenticated)
+    )
+
+
+def compress_response(response: Response) -> Response:
+    """Compress dynamic text responses of at least ``COMPRESSION_MIN_SIZE`` bytes."""
+    config = current_app.config
+    if not _compressible(response, config):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+    if encoding is None or (response.content_length or 0) < config["COMPRESSION_MIN_SIZE"]:
+        return response
+
+    level_key = "COMPRESSION_BROTLI_QUALITY" if encoding == "br" else "COMPRESSION_LEVEL"
+    response.set_data(compress(response.get_data(), encoding, config[level_key]))
+    response.headers["Content-Encoding"] = encoding
+    # The compressed bytes differ from the identity ones, so a strong validator no longer
+    # holds; If-None-Match uses weak comparison, so revalidation keeps working.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def serve_static(filename: str):
+    """Flask's static view, preferring a precompressed sibling the client accepts."""
+    static_folder = current_app.static_folder
+    encoding = negotiate_encoding()
+    source = safe_join(static_folder, filename)
+    if encoding is not None and source is not None and os.path.isfile(source):
+        candidate = source + SUFFIXES[encoding]
+        # A sibling older than its source is left over from a previous build.
+        if os.path.isfile(candidate) and os.path.getmtime(candidate) >= os.path.getmtime(source):
+            response = send_from_directory(
+                static_folder,
+                filename + SUFFIXES[encoding],
+                mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                max_age=current_app.get_send_file_max_age(filename),
+            )
+            response.headers["Content-Encoding"] = encoding
+            response.vary.add("Accept-Encoding")
+            return response
+    response = current_app.send_static_file(filename)
+    if Path(filename).suffix in STATIC_EXTENSIONS:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def precompress_directory(root: str | Path, exclude: tuple[str | Path, ...] = ()) -> list[Path]:
+    """Write ``.br`` and ``.gz`` siblings for the text assets under ``root`` at the highest
+    levels; returns the files written. Siblings that would not be smaller are skipped."""
+    written = []
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    excluded = [Path(path).resolve() for path in exclude]
+    for path in sorted(Path(root).rglob("*")):
+        if not path.is_file() or path.suffix not in STATIC_EXTENSIONS:
+            continue
+        if any(path.resolve().is_relative_to(folder) for folder in excluded):
+            continue
+        data = path.read_bytes()
+        for encoding in encodings:
+            compressed = compress(data, encoding, 11 if encoding == "br" else 9)
+            target = path.with_name(path.name + SUFFIXES[encoding])
+            if len(compressed) >= len(data):
+                target.unlink(missing_ok=True)
+                continue
+            target.write_bytes(compressed)
+            written.append(target)
+    return written
+
+
+def init_app(app: Flask) -> None:
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+    app.after_request(compress_response)
+    if "static" in app.view_functions:
+        app.view_functions["static"] = serve_static
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+
+from flask import Response, make_response, request
+
+
+def compute_etag(*parts) -> str:
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def not_modified(etag: str, last_modified: datetime | None = None) -> Response | None:
+    """Return a 304 response when the request's validators still match, else ``None``.
+
+    Call it before loading the full representation; ``If-Modified-Since`` is only consulted
+    when the client sent no ``If-None-Match``.
+    """
+    last_modified = _as_utc(last_modified)
+    if request.if_none_match:
+        # Weak comparison (RFC 9110): compression turns the ETag weak, the content is the same.
+        matched = request.if_none_match.contains_weak(etag)
+    else:
+        since = request.if_modified_since
+        matched = bool(since and last_modified and last_modified <= since)
+    if not matched:
+        return None
+    return with_validators(make_response("", 304), etag, last_modified)
+
+
+def with_validators(response: Response, etag: str, last_modified: datetime | None = None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _as_utc(last_modified)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+
+from .models import Comment, Post, User, db
+
+_PENDING_KEY = "pulse_counter_refresh"
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_counter_deltas(session: Session, flush_context) -> None:
+    comments = Counter()
+    posts = Counter()
+    changes = [(obj, 1) for obj in session.new] + [(obj, -1) for obj in session.deleted]
+    # Edited comments change no counter but still have to bump their post's updated_at.
+    changes += [
+        (obj, 0) for obj in session.dirty if isinstance(obj, Comment) and session.is_modified(obj)
+    ]
+    for obj, sign in changes:
+        if isinstance(obj, Comment):
+            comments[obj.post_id] += sign
+        elif isinstance(obj, Post):
+            posts[obj.user_id] += sign
+
+    connection = session.connection()
+    post_table, user_table = Post.__table__, User.__table__
+    for post_id, delta in comments.items():
+        # Runs even for a zero delta so the column onupdate refreshes post.updated_at.
+        connection.execute(
+            update(post_table)
+            .where(post_table.c.id == post_id)
+            .values(comment_count=post_table.c.comment_count + delta)
+        )
+    for user_id, delta in posts.items():
+        if delta:
+            connection.execute(
+                update(user_table)
+                .where(user_table.c.id == user_id)
+                .values(post_count=user_table.c.post_count + delta)
+            )
+
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    pending.extend((Post, post_id, ["comment_count", "updated_at"]) for post_id in comments)
+    pending.extend((User, user_id, ["post_count"]) for user_id in posts)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_stale_counters(session: Session, flush_context) -> None:
+    for model, pk, attributes in session.info.pop(_PENDING_KEY, []):
+        instance = session.identity_map.get(session.identity_key(model, (pk,)))
+        if instance is not None:
+            session.expire(instance, attributes)
+
+
+def recount_all() -> None:
+    """Recompute every denormalized counter from the source rows in two UPDATEs."""
+    post_table, user_table = Post.__table__, User.__table__
+    comment_table = Comment.__table__
+    db.session.execute(
+        update(post_table).values(
+            comment_count=select(func.count())
+            .where(comment_table.c.post_id == post_table.c.id)
+            .scalar_subquery(),
+            # A repair pass, not an edit: keep the column onupdate from touching updated_at.
+            updated_at=post_table.c.updated_at,
+        )
+    )
+    db.session.execute(
+        update(user_table).values(
+            post_count=select(func.count())
+            .where(post_table.c.user_id == user_table.c.id)
+            .scalar_subquery()
+        )
+    )
+    db.session.commit()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+
+from sqlalchemy import select
+
+from .models import Comment, Post, User, db
+
+EXPORTS = {
+    "posts": (
+        Post,
+        (
+            Post.id,
+            Post.title,
+            Post.content,
+            Post.user_id,
+            User.username.label("author"),
+            Post.date_posted,
+            Post.updated_at,
+            Post.image,
+            Post.comment_count,
+        ),
+    ),
+    "comments": (
+        Comment,
+        (
+            Comment.id,
+            Comment.post_id,
+            Comment.user_id,
+            User.username.label("author"),
+            Comment.content,
+            Comment.date_created,
+        ),
+    ),
+}
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def export_rows(kind: str, after_id: int = 0, batch_size: int = 1000) -> Iterator[dict]:
+    """Rows with ids above ``after_id`` in id order, streamed in ``batch_size`` batches."""
+    model, columns = EXPORTS[kind]
+    stmt = (
+        select(*columns)
+        .join(User, User.id == model.user_id)
+        .where(model.id > after_id)
+        .order_by(model.id)
+    )
+    result = db.session.execute(stmt, execution_options={"yield_per": batch_size})
+    try:
+        for row in result:
+            yield row._asdict()
+    finally:
+        result.close()
+
+
+def ndjson_lines(rows: Iterable[dict], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Encode rows as NDJSON, yielding chunks of about ``chunk_size`` bytes."""
+    buffer, size = [], 0
+    for row in rows:
+        line = json.dumps(row, default=_default, ensure_ascii=False).encode() + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into gzip format incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(
+    kind: str, after_id: int = 0, compress: bool = False, batch_size: int = 1000
+) -> Iterator[bytes]:
+    chunks = ndjson_lines(export_rows(kind, after_id, batch_size))
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from flask import Flask, current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from .cache import LRUCache
+from .models import ProfileImageMixin, User, db
+
+USERS = "users"
+_PENDING_KEY = "pulse_user_cache_invalidate"
+_CACHED_ATTRIBUTES = ("username", "profile_image", "profile_image_variants")
+
+
+@dataclass(frozen=True, eq=False)
+class SessionUser(ProfileImageMixin, UserMixin):
+    """The logged-in user as templates and views see it, detached from any session.
+
+    Compares equal to the ``User`` row with the same id (via ``UserMixin``). Views that
+    modify the account load the row itself.
+    """
+
+    id: int
+    username: str
+    profile_image: str | None
+    profile_image_variants: list[dict] | None
+
+
+class UserCache:
+    """Per-process LRU of :class:`SessionUser` keyed by id.
+
+    Changes committed in this process bump the ``users`` generation, which also orphans
+    entries a concurrent request is about to store from an older read. Other workers see
+    the change once ``USER_CACHE_TTL`` expires.
+    """
+
+    def __init__(self, backend: LRUCache, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    def load(self, user_id: int) -> SessionUser | None:
+        generation = self.backend.generation(USERS)
+        key = f"{USERS}:{generation}:{user_id}"
+        cached = self.backend.get(key)
+        if cached is not None:
+            return cached
+        row = db.session.execute(
+            select(User.id, *(getattr(User, name) for name in _CACHED_ATTRIBUTES)).where(
+                User.id == user_id
+            )
+        ).first()
+        if row is None:
+            return None
+        session_user = SessionUser(*row)
+        self.backend.set(key, session_user, self.ttl)
+        return session_user
+
+    def invalidate(self) -> None:
+        self.backend.bump(USERS)
+
+
+def init_app(app: Flask) -> None:
+    ttl = app.config.get("USER_CACHE_TTL", 0)
+    if ttl:
+        app.extensions["pulse_user_cache"] = UserCache(
+            LRUCache(app.config.get("USER_CACHE_MAX_ENTRIES", 1024)), ttl
+        )
+
+
+def get_user_cache() -> UserCache | None:
+    return current_app.extensions.get("pulse_user_cache")
+
+
+def load_user(user_id: str):
+    cache = get_user_cache()
+    if cache is None:
+        return db.session.get(User, int(user_id))
+    return cache.load(int(user_id))
+
+
+def _affects_identity(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in _CACHED_ATTRIBUTES)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session: Session, flush_context) -> None:
+    if any(isinstance(obj, User) for obj in session.deleted) or any(
+        isinstance(obj, User) and _affects_identity(obj) for obj in session.dirty
+    ):
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_PENDING_KEY, False) and has_app_context():
+        cache = get_user_cache()
+        if cache is not None:
+            cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
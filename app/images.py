@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import NamedTuple
+from uuid import uuid4
+
+from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .metrics import IMAGE_BYTES, IMAGE_SECONDS
+from .models import StoredFile, db
+
+FORMAT_EXTENSION_MAP = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
+FORMAT_MIMETYPE_MAP = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+
+
+# WEBP is matched separately: "RIFF", a 4-byte length, then "WEBP".
+MAGIC_BYTES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+)
+_INFO_ATTR = "pulse_image_info"
+
+
+class ImageInfo(NamedTuple):
+    format: str
+    width: int
+    height: int
+
+
+class EncodedImage(NamedTuple):
+    path: str
+    # [{"width": 320, "path": ..., "type": "image/jpeg"}, ...]
+    variants: list[dict]
+
+
+def _allowed_formats() -> set[str]:
+    configured = current_app.config.get("ALLOWED_IMAGE_FORMATS") or set()
+    return {fmt.upper() for fmt in configured}
+
+
+def extension_for(image_format: str) -> str:
+    return FORMAT_EXTENSION_MAP.get(image_format, f".{image_format.lower()}")
+
+
+def sniff_format(header: bytes) -> str | None:
+    """Identify an upload by its leading magic bytes."""
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "WEBP"
+    for magic, image_format in MAGIC_BYTES:
+        if header.startswith(magic):
+            return image_format
+    return None
+
+
+def _check_dimensions(width: int, height: int) -> None:
+    config = current_app.config
+    max_width = config.get("MAX_IMAGE_WIDTH")
+    max_height = config.get("MAX_IMAGE_HEIGHT")
+    max_pixels = config.get("MAX_IMAGE_PIXELS")
+    if (max_width and width > max_width) or (max_height and height > max_height):
+        raise ValueError(
+            f"Изображение слишком большое: не более {max_width}×{max_height} пикселей."
+        )
+    if max_pixels and width * height > max_pixels:
+        raise ValueError(f"Изображение слишком большое: не более {max_pixels} пикселей.")
+
+
+def verify_image_upload(file_storage) -> ImageInfo:
+    """Check that an upload is an allowed image of acceptable size without decoding pixels.
+
+    The format comes from the magic bytes and the size from the header Pillow parses on
+    open; the result is cached on the ``FileStorage`` so the form validator, the route and
+    the background queue share a single pass. Pixels are decoded once, in
+    :func:`encode_image`.
+    """
+    cached = getattr(file_storage, _INFO_ATTR, None)
+    if cached is not None:
+        return cached
+    if not file_storage or file_storage.filename == "":
+        raise ValueError("Выберите файл изображения.")
+    if not (file_storage.mimetype or "").startswith("image/"):
+        raise ValueError("Разрешена загрузка только изображений.")
+
+    stream = file_storage.stream
+    stream.seek(0)
+    image_format = sniff_format(stream.read(16))
+    stream.seek(0)
+    if image_format is None:
+        raise ValueError("Файл не является допустимым изображением.")
+    allowed_formats = _allowed_formats()
+    if image_format not in allowed_formats:
+        raise ValueError(f"Недопустимый формат. Разрешены: {', '.join(sorted(allowed_formats))}")
+
+    try:
+        with Image.open(stream, formats=[image_format]) as image:
+            width, height = image.size
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        raise ValueError("Файл не является допустимым изображением.") from exc
+    finally:
+        stream.seek(0)
+    _check_dimensions(width, height)
+
+    info = ImageInfo(image_format, width, height)
+    setattr(file_storage, _INFO_ATTR, info)
+    return info
+
+
+def prepare_image_for_save(image: Image.Image, image_format: str) -> Image.Image:
+    if image_format == "JPEG":
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+    elif image_format in {"PNG", "WEBP"}:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+    elif image_format == "GIF":
+        if image.mode not in ("P", "L", "RGBA", "RGB"):
+            image = image.convert("RGBA")
+    return image
+
+
+def _save_kwargs(image_format: str) -> dict:
+    kwargs = {"format": image_format}
+    if image_format == "JPEG":
+        kwargs.update({"quality": 85, "optimize": True})
+    elif image_format == "WEBP":
+        kwargs.update({"quality": 80, "method": 4})
+    return kwargs
+
+
+def _encode(image: Image.Image, image_format: str) -> bytes:
+    buf = BytesIO()
+    with IMAGE_SECONDS.labels("encode").time():
+        image.save(buf, **_save_kwargs(image_format))
+    return buf.getvalue()
+
+
+def _write_once(path: Path, data: bytes, kind: str = "original") -> None:
+    """Write ``data`` unless ``path`` already holds it; the rename keeps readers from seeing
+    a half-written file when two uploads of the same image race."""
+    if path.exists():
+        return
+    tmp = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    IMAGE_BYTES.labels(kind).inc(len(data))
+
+
+def variant_options(folder_key: str) -> dict:
+    """Derivative sizes for uploads stored under ``folder_key``."""
+    if folder_key == "PROFILE_UPLOAD_FOLDER":
+        widths, square = current_app.config.get("AVATAR_VARIANT_SIZES", ()), True
+    else:
+        widths, square = current_app.config.get("IMAGE_VARIANT_WIDTHS", ()), False
+    return {
+        "widths": tuple(widths),
+        "square": square,
+        "webp": bool(current_app.config.get("IMAGE_VARIANT_WEBP")),
+    }
+
+
+def generate_variants(
+    image: Image.Image,
+    path: Path,
+    image_format: str,
+    widths=(),
+    square: bool = False,
+    webp: bool = False,
+) -> list[dict]:
+    """Write downscaled copies of ``image`` next to ``path``; never upscales.
+
+    GIFs are left alone so animations are not flattened into a single frame.
+    """
+    if image_format == "GIF":
+        return []
+    formats = [image_format]
+    if webp and image_format != "WEBP":
+        formats.append("WEBP")
+
+    variants = []
+    for width in sorted(set(widths)):
+        if square:
+            if min(image.size) < width:
+                continue
+            with IMAGE_SECONDS.labels("resize").time():
+                resized = ImageOps.fit(image, (width, width), Image.LANCZOS)
+        else:
+            if image.width <= width:
+                continue
+            height = max(round(image.height * width / image.width), 1)
+            with IMAGE_SECONDS.labels("resize").time():
+                resized = image.resize((width, height), Image.LANCZOS)
+        for variant_format in formats:
+            variant_path = path.with_name(f"{path.stem}_{width}{extension_for(variant_format)}")
+            if not variant_path.exists():
+                _write_once(variant_path, _encode(resized, variant_format), "variant")
+            variants.append(
+                {
+                    "width": width,
+                    "path": str(variant_path),
+                    "type": FORMAT_MIMETYPE_MAP[variant_format],
+                }
+            )
+    return variants
+
+
+def encode_image(
+    source, target_dir: str | Path, image_format: str, variants: dict | None = None
+) -> EncodedImage:
+    """Decode ``source`` (a path or file object), normalize it and store it by content hash.
+
+    Identical normalized output maps to the same file, so reposted images are stored once.
+    ``variants`` holds :func:`generate_variants` options. Runs without an app context so it
+    can execute inside a worker process; returned paths are absolute.
+    """
+    with IMAGE_SECONDS.labels("decode").time():
+        try:
+            image = Image.open(source)
+            image.load()
+        except (UnidentifiedImageError, OSError) as exc:
+            raise ValueError("Файл не является допустимым изображением.") from exc
+        image = prepare_image_for_save(image, image_format)
+
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    data = _encode(image, image_format)
+    path = target_dir / f"{hashlib.sha256(data).hexdigest()}{extension_for(image_format)}"
+    _write_once(path, data)
+    return EncodedImage(str(path), generate_variants(image, path, image_format, **(variants or {})))
+
+
+def static_relative(path: str | Path) -> str:
+    static_root = Path(current_app.static_folder).resolve()
+    try:
+        relative = Path(path).resolve().relative_to(static_root)
+    except ValueError as exc:
+        raise RuntimeError("Upload path is misconfigured.") from exc
+    return relative.as_posix()
+
+
+def relative_image(encoded: EncodedImage) -> tuple[str, list[dict]]:
+    variants = [
+        {**variant, "path": static_relative(variant["path"])} for variant in encoded.variants
+    ]
+    return static_relative(encoded.path), variants
+
+
+_UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def retain_image(relative_path: str, count: int = 1) -> None:
+    """Count ``count`` more rows using ``relative_path``; runs in the caller's transaction.
+
+    The row stays write-locked until that transaction ends, which is what keeps
+    :func:`delete_image` from removing the files of an image being retained.
+    """
+    table = StoredFile.__table__
+    upsert = _UPSERTS.get(db.engine.dialect.name)
+    if upsert is not None:
+        stmt = upsert(table).values(path=relative_path, refcount=count)
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.path], set_={"refcount": table.c.refcount + count}
+            )
+        )
+        return
+    result = db.session.execute(
+        update(table).where(table.c.path == relative_path).values(refcount=table.c.refcount + count)
+    )
+    if not result.rowcount:
+        db.session.add(StoredFile(path=relative_path, refcount=count))
+
+
+def restore_files(
+    relative_path: str, variants: list[dict] | None, source, folder_key: str, image_format: str
+) -> None:
+    """Re-encode ``source`` when a concurrent :func:`delete_image` unlinked the stored files
+    after they were encoded; call right after :func:`retain_image`."""
+    static_root = Path(current_app.static_folder)
+    paths = [relative_path, *(variant["path"] for variant in variants or ())]
+    if all((static_root / path).exists() for path in paths):
+        return
+    encode_image(source, current_app.config[folder_key], image_format, variant_options(folder_key))
+
+
+def _release_reference(relative_path: str) -> bool:
+    """Drop one reference in the current transaction; True when nothing uses the file any
+    more."""
+    table = StoredFile.__table__
+    db.session.execute(
+        update(table).where(table.c.path == relative_path).values(refcount=table.c.refcount - 1)
+    )
+    remaining = db.session.scalar(select(table.c.refcount).where(table.c.path == relative_path))
+    # No row means an upload stored before reference counting, which was never shared.
+    unused = remaining is None or remaining <= 0
+    if unused:
+        db.session.execute(delete(table).where(table.c.path == relative_path))
+    return unused
+
+
+def save_image(file_storage, folder_key: str) -> tuple[str, list[dict]] | None:
+    """Validate and store an upload inline; returns its static path and variants.
+
+    The stored file gains a reference in the current transaction; pair it with
+    :func:`delete_image` once the row stops using it.
+    """
+    if not file_storage or file_storage.filename == "":
+        return None
+
+    image_format = verify_image_upload(file_storage).format
+    encoded = encode_image(
+        file_storage.stream,
+        current_app.config[folder_key],
+        image_format,
+        variant_options(folder_key),
+    )
+    path, variants = relative_image(encoded)
+    retain_image(path)
+    file_storage.stream.seek(0)
+    restore_files(path, variants, file_storage.stream, folder_key, image_format)
+    return path, variants
+
+
+def backfill_variants(relative_path: str, folder_key: str) -> list[dict]:
+    """Generate the configured variants for an already stored upload."""
+    path = Path(current_app.static_folder) / relative_path
+    with Image.open(path) as image:
+        image.load()
+        image_format = (image.format or "").upper()
+        variants = generate_variants(image, path, image_format, **variant_options(folder_key))
+    return relative_image(EncodedImage(str(path), variants))[1]
+
+
+def delete_image(relative_path: str | None, variants: list[dict] | None = None) -> None:
+    """Release a reference to a stored upload; the files go once the last user is gone.
+
+    Commits its own transaction, so call it after the change that dropped the image.
+    """
+    if not relative_path:
+        return
+    if _release_reference(relative_path):
+        # Unlinked before the commit releases the row lock: an upload of the same image
+        # that is retaining it waits, then finds the files gone and restores them.
+        for variant in variants or ():
+            delete_file(variant["path"])
+        delete_file(relative_path)
+    db.session.commit()
+
+
+def delete_file(relative_path: str | None) -> None:
+    if not relative_path:
+        return
+
+    rel_path = Path(relative_path)
+    if rel_path.is_absolute():
+        current_app.logger.warning("Attempt to delete absolute path %s was blocked.", rel_path)
+        return
+
+    uploads_root = Path(current_app.config["UPLOAD_ROOT"]).resolve()
+    target = (Path(current_app.static_folder) / rel_path).resolve()
+    if uploads_root not in target.parents and target != uploads_root:
+        current_app.logger.warning("Attempt to delete file outside uploads dir: %s", target)
+        return
+
+    try:
+        target.unlink()
+    except FileNotFoundError:
+        return
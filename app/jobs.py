@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .images import (
+    delete_image,
+    encode_image,
+    extension_for,
+    relative_image,
+    restore_files,
+    retain_image,
+    variant_options,
+    verify_image_upload,
+)
+from .models import DEFAULT_PROFILE_IMAGE, ImageJob, Post, User, db
+
+TARGET_MODELS = {"post": Post, "user": User}
+_QUEUED_KEY = "pulse_image_jobs"
+_SUBMIT_KEY = "pulse_image_jobs_submit"
+
+
+class ImagePipeline:
+    """Re-encodes uploads in a process pool; job state lives in the ``image_job`` table."""
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self.is_async = app.config.get("IMAGE_PIPELINE", "sync") == "process"
+        self.max_workers = app.config.get("IMAGE_WORKERS") or max((os.cpu_count() or 2) // 2, 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending: set[int] = set()
+        self._cond = threading.Condition()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._cond:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def submit(
+        self, job_id: int, source_path: str, target_dir: str, image_format: str, variants: dict
+    ) -> None:
+        with self._cond:
+            self._pending.add(job_id)
+        future = self._get_executor().submit(
+            encode_image, source_path, target_dir, image_format, variants
+        )
+        future.add_done_callback(lambda done: self._finished(job_id, done))
+
+    def _finished(self, job_id: int, future: Future) -> None:
+        try:
+            with self.app.app_context():
+                finish_job(job_id, future)
+        except Exception:
+            self.app.logger.exception("Finalizing image job %s failed", job_id)
+        finally:
+            with self._cond:
+                self._pending.discard(job_id)
+                self._cond.notify_all()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Block until every submitted job has been finalized; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout=timeout)
+
+    def resubmit_pending(self, older_than: float = 0) -> int:
+        """Queue jobs left ``pending`` by a process that died, e.g. a killed worker.
+
+        Only jobs queued or claimed at least ``older_than`` seconds ago are taken; each is
+        claimed with a conditional update, so concurrent workers resubmit it once.
+        """
+        now = datetime.now(timezone.utc)
+        stale = (
+            ImageJob.status == "pending",
+            func.coalesce(ImageJob.claimed_at, ImageJob.created_at)
+            <= now - timedelta(seconds=older_than),
+        )
+        claimed = []
+        for job_id in db.session.scalars(select(ImageJob.id).where(*stale)).all():
+            if job_id in self._pending:
+                continue
+            result = db.session.execute(
+                update(ImageJob).where(ImageJob.id == job_id, *stale).values(claimed_at=now)
+            )
+            if result.rowcount:
+                claimed.append(job_id)
+        db.session.commit()
+        for job in ImageJob.query.filter(ImageJob.id.in_(claimed)):
+            target_dir = str(current_app.config[job.folder_key])
+            variants = variant_options(job.folder_key)
+            self.submit(job.id, job.source_path, target_dir, job.image_format, variants)
+        return len(claimed)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def init_app(app: Flask) -> None:
+    app.extensions["pulse_images"] = ImagePipeline(app)
+
+
+def get_pipeline() -> ImagePipeline:
+    return current_app.extensions["pulse_images"]
+
+
+def resume_stale_jobs(app: Flask) -> None:
+    """Requeue jobs orphaned by a crashed or killed process, e.g. in a freshly forked worker."""
+    pipeline = app.extensions["pulse_images"]
+    if not pipeline.is_async:
+        return
+    with app.app_context():
+        try:
+            resumed = pipeline.resubmit_pending(app.config.get("IMAGE_JOB_STALE_AFTER", 600))
+        except SQLAlchemyError:
+            app.logger.warning("Could not requeue stale image jobs", exc_info=True)
+            return
+    if resumed:
+        app.logger.info("Requeued %s stale image jobs", resumed)
+
+
+def queue_image(file_storage, folder_key: str, target, attribute: str) -> ImageJob:
+    """Validate an upload, park the raw bytes and queue a job that fills ``target.attribute``.
+
+    The job is handed to the worker pool once the surrounding transaction commits.
+    """
+    image_format = verify_image_upload(file_storage).format
+    incoming = Path(current_app.config["UPLOAD_ROOT"]) / "incoming"
+    incoming.mkdir(parents=True, exist_ok=True)
+    source = incoming / f"{uuid4().hex}{extension_for(image_format)}"
+    file_storage.save(source)
+
+    if isinstance(target, Post):
+        target.image_pending = True
+    db.session.add(target)
+    db.session.flush()
+    job = ImageJob(
+        target_type=target.__tablename__,
+        target_id=target.id,
+        target_attribute=attribute,
+        folder_key=folder_key,
+        source_path=str(source),
+        image_format=image_format,
+    )
+    db.session.add(job)
+    db.session.info.setdefault(_QUEUED_KEY, []).append(job)
+    return job
+
+
+def finish_job(job_id: int, future: Future) -> None:
+    job = db.session.get(ImageJob, job_id)
+    if job is None or job.status != "pending":
+        return
+    target = db.session.get(TARGET_MODELS[job.target_type], job.target_id)
+
+    new_path = new_variants = None
+    replaced = (None, None)
+    error = future.exception()
+    if error is None:
+        new_path, new_variants = relative_image(future.result())
+        # The job holds the reference until it is handed to the target below.
+        retain_image(new_path)
+        restore_files(new_path, new_variants, job.source_path, job.folder_key, job.image_format)
+        job.status, job.result_path = "done", new_path
+    else:
+        job.status, job.error = "failed", str(error)[:255]
+        current_app.logger.warning("Image job %s failed: %s", job_id, error)
+
+    if target is not None:
+        if new_path:
+            variants_attribute = f"{job.target_attribute}_variants"
+            replaced = getattr(target, job.target_attribute), getattr(target, variants_attribute)
+            setattr(target, job.target_attribute, new_path)
+            setattr(target, variants_attribute, new_variants)
+        if isinstance(target, Post):
+            target.image_pending = False
+    job.finished_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+    Path(job.source_path).unlink(missing_ok=True)
+    if new_path and target is None:
+        delete_image(new_path, new_variants)
+    if replaced[0] and replaced[0] != DEFAULT_PROFILE_IMAGE:
+        delete_image(*replaced)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_queued_jobs(session: Session, flush_context) -> None:
+    queued = session.info.pop(_QUEUED_KEY, None)
+    if queued:
+        session.info.setdefault(_SUBMIT_KEY, []).extend(
+            (job.id, job.source_path, job.folder_key, job.image_format) for job in queued
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_queued_jobs(session: Session) -> None:
+    ready = session.info.pop(_SUBMIT_KEY, None)
+    if not ready or not has_app_context():
+        return
+    pipeline = get_pipeline()
+    for job_id, source_path, folder_key, image_format in ready:
+        target_dir = str(current_app.config[folder_key])
+        pipeline.submit(job_id, source_path, target_dir, image_format, variant_options(folder_key))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_queued_jobs(session: Session) -> None:
+    discarded = session.info.pop(_QUEUED_KEY, []) + session.info.pop(_SUBMIT_KEY, [])
+    for entry in discarded:
+        source_path = entry.source_path if isinstance(entry, ImageJob) else entry[1]
+        Path(source_path).unlink(missing_ok=True)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import mimetypes
+import re
+from pathlib import Path
+
+from flask import Flask, abort, current_app, make_response, send_from_directory, url_for
+from werkzeug.security import safe_join
+
+# Uploads live under static/<MEDIA_DIR>; their stored paths keep that prefix.
+MEDIA_DIR = "uploads"
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Content-hash (sha256) or legacy uuid4 names, optionally with a _<width> variant suffix.
+_IMMUTABLE_NAME_RE = re.compile(r"^(?:[0-9a-f]{64}|[0-9a-f]{32})(?:_\d+)?$")
+
+
+def is_immutable(filename: str) -> bool:
+    """Whether ``filename`` can never change content under the same name."""
+    return bool(_IMMUTABLE_NAME_RE.match(Path(filename).stem))
+
+
+def media_url(path: str) -> str:
+    """URL for a path relative to the static folder; uploads go through ``/media``."""
+    prefix = f"{MEDIA_DIR}/"
+    if path.startswith(prefix):
+        return url_for("media", filename=path[len(prefix) :])
+    return url_for("static", filename=path)
+
+
+def media_root() -> Path:
+    return Path(current_app.static_folder) / MEDIA_DIR
+
+
+def serve_media(filename: str):
+    """Serve an upload, or hand it to nginx with ``X-Accel-Redirect`` in ``accel`` mode.
+
+    In ``nginx`` mode the proxy answers ``/media/`` itself and requests only reach this view
+    when the app runs without it.
+    """
+    if current_app.config.get("MEDIA_SERVING") == "accel":
+        if safe_join(str(media_root()), filename) is None:
+            abort(404)
+        response = make_response("")
+        response.headers["X-Accel-Redirect"] = (
+            current_app.config["MEDIA_ACCEL_PREFIX"].rstrip("/") + "/" + filename
+        )
+        response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    else:
+        # conditional=True answers If-None-Match/If-Modified-Since and Range requests.
+        response = send_from_directory(media_root(), filename, conditional=True)
+        # send_file marks files no-cache, which would make browsers revalidate every image.
+        response.cache_control.no_cache = None
+
+    if is_immutable(filename):
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = current_app.config.get("MEDIA_MAX_AGE", 3600)
+    return response
+
+
+def init_app(app: Flask) -> None:
+    app.add_url_rule("/media/<path:filename>", "media", serve_media)
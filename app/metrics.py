@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from flask import Flask, Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .sqlstats import observe_queries
+
+# With several worker processes set this to an empty directory; /metrics then sums them.
+_MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+if os.environ.get(_MULTIPROC_ENV):
+    # Samples are written on first use; CLI commands record queries too.
+    Path(os.environ[_MULTIPROC_ENV]).mkdir(parents=True, exist_ok=True)
+
+REQUEST_SECONDS = Histogram(
+    "pulse_http_request_duration_seconds",
+    "Time to produce a response, by endpoint.",
+    ["endpoint", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    "pulse_http_requests",
+    "Responses by endpoint and status code.",
+    ["endpoint", "method", "status"],
+)
+QUERY_SECONDS = Histogram(
+    "pulse_db_query_duration_seconds",
+    "Time per SQL statement, by the endpoint that ran it.",
+    ["endpoint"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+IMAGE_SECONDS = Histogram(
+    "pulse_image_processing_seconds",
+    "Upload processing time by stage (decode, resize, encode).",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PAGE_CACHE_EVENTS = Counter(
+    "pulse_page_cache_events",
+    "Page cache lookups (hit, miss) and invalidations, by namespace.",
+    ["namespace", "outcome"],
+)
+IMAGE_BYTES = Counter(
+    "pulse_image_bytes_written",
+    "Bytes of encoded images written to the upload folders.",
+    ["kind"],
+)
+
+
+def _endpoint() -> str:
+    # Unmatched URLs share one label so scanners cannot blow up the series count.
+    return request.endpoint or "unmatched"
+
+
+def _observe_request(status: int) -> None:
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return
+    endpoint = _endpoint()
+    REQUEST_SECONDS.labels(endpoint, request.method).observe(time.perf_counter() - started)
+    REQUESTS.labels(endpoint, request.method, str(status)).inc()
+
+
+def _observe_query(statement: str, parameters, elapsed: float) -> None:
+    endpoint = _endpoint() if has_request_context() else "none"
+    QUERY_SECONDS.labels(endpoint).observe(elapsed)
+
+
+def metrics_view() -> Response:
+    registry = REGISTRY
+    if os.environ.get(_MULTIPROC_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def reset_multiprocess_dir() -> None:
+    """Start a server with an empty multiprocess directory; files of old pids would add up."""
+    path = os.environ.get(_MULTIPROC_ENV)
+    if path:
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in directory.glob("*.db"):
+            stale.unlink(missing_ok=True)
+
+
+def mark_process_dead(pid: int) -> None:
+    if os.environ.get(_MULTIPROC_ENV):
+        multiprocess.mark_process_dead(pid)
+
+
+def init_app(app: Flask) -> None:
+    """Time every request; call before other ``before_request`` hooks are registered so
+    requests they reject (CSRF failures, for one) are counted too."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    observe_queries(_observe_query)
+
+    @app.before_request
+    def _start_request_timer() -> None:
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _count_response(response):
+        _observe_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _count_failure(exc) -> None:
+        # Still pending only when an exception propagated past the error handlers.
+        if exc is not None:
+            _observe_request(500)
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
@@ -3,11 +3,13 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 
-from flask import url_for
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from .media import media_url
+from .replicas import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 DEFAULT_PROFILE_IMAGE = "uploads/profiles/default.svg"
 
 
@@ -15,45 +17,121 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-class User(db.Model, UserMixin):
+def _pick_variant(variants: list[dict] | None, width: int, mimetype: str | None = None):
+    """Smallest stored variant at least ``width`` pixels wide, if any."""
+    candidates = [
+        v
+        for v in variants or ()
+        if v["width"] >= width and (mimetype is None or v["type"] == mimetype)
+    ]
+    return min(candidates, key=lambda v: v["width"])["path"] if candidates else None
+
+
+def _primary_type(variants: list[dict] | None) -> str | None:
+    # Each width is written in the original format first, optional WebP copies follow.
+    return variants[0]["type"] if variants else None
+
+
+def _srcset(variants: list[dict] | None, mimetype: str, url=media_url) -> str:
+    return ", ".join(
+        f"{url(v['path'])} {v['width']}w"
+        for v in sorted(variants or (), key=lambda v: v["width"])
+        if v["type"] == mimetype
+    )
+
+
+class ProfileImageMixin:
+    """Avatar URLs for anything carrying ``profile_image`` and ``profile_image_variants``."""
+
+    __slots__ = ()
+    # Read-model rows (see app.readmodel) replace this with prefixes resolved once.
+    _media_url = staticmethod(media_url)
+
+    def profile_image_url(self, size: int | None = None) -> str:
+        if self.profile_image:
+            if size:
+                variants = self.profile_image_variants
+                variant = _pick_variant(variants, size, _primary_type(variants))
+                if variant:
+                    return self._media_url(variant)
+            return self._media_url(self.profile_image)
+        return self._media_url(DEFAULT_PROFILE_IMAGE)
+
+    def profile_image_srcset(self) -> str:
+        if not self.profile_image:
+            return ""
+        variants = self.profile_image_variants
+        return _srcset(variants, _primary_type(variants), self._media_url)
+
+
+class PostImageMixin:
+    """Image URLs for anything carrying ``image`` and ``image_variants``."""
+
+    __slots__ = ()
+    _media_url = staticmethod(media_url)
+
+    def image_url(self, width: int | None = None) -> Optional[str]:
+        if not self.image:
+            return None
+        if width:
+            variant = _pick_variant(self.image_variants, width, _primary_type(self.image_variants))
+            if variant:
+                return self._media_url(variant)
+        return self._media_url(self.image)
+
+    def image_srcset(self, mimetype: str | None = None) -> str:
+        return _srcset(
+            self.image_variants, mimetype or _primary_type(self.image_variants), self._media_url
+        )
+
+
+class User(db.Model, UserMixin, ProfileImageMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
     profile_image = db.Column(db.String(200), nullable=True)
+    profile_image_variants = db.Column(db.JSON(none_as_null=True))
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     posts = db.relationship("Post", back_populates="user", cascade="all, delete-orphan")
     comments = db.relationship("Comment", back_populates="user", cascade="all, delete-orphan")
 
-    def profile_image_url(self) -> str:
-        if self.profile_image:
-            return url_for("static", filename=self.profile_image, _external=False)
-        return url_for("static", filename=DEFAULT_PROFILE_IMAGE, _external=False)
-
     def __repr__(self) -> str:
         return f"<User {self.username}>"
 
 
-class Post(db.Model):
+class Post(db.Model, PostImageMixin):
+    __table_args__ = (
+        db.Index("ix_post_date_posted_id", "date_posted", "id"),
+        db.Index("ix_post_user_id_date_posted", "user_id", "date_posted"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     content = db.Column(db.Text, nullable=False)
     date_posted = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    # Bumped on every change to the post or its comments; drives HTTP validators.
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     image = db.Column(db.String(255))
+    image_variants = db.Column(db.JSON(none_as_null=True))
+    # Set while a queued upload for this post is being processed in the background.
+    image_pending = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     user = db.relationship("User", back_populates="posts")
     comments = db.relationship("Comment", back_populates="post", cascade="all, delete-orphan")
 
-    def image_url(self) -> Optional[str]:
-        if self.image:
-            return url_for("static", filename=self.image, _external=False)
-        return None
-
     def __repr__(self) -> str:
         return f"<Post {self.title}>"
 
 
 class Comment(db.Model):
+    __table_args__ = (
+        db.Index("ix_comment_post_id_date_created", "post_id", "date_created"),
+        db.Index("ix_comment_user_id", "user_id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     date_created = db.Column(db.DateTime, nullable=False, default=_utcnow)
@@ -65,3 +143,36 @@ class Comment(db.Model):
 
     def __repr__(self) -> str:
         return f"<Comment {self.id} on {self.post_id}>"
+
+
+class ImageJob(db.Model):
+    __table_args__ = (db.Index("ix_image_job_status", "status"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    target_type = db.Column(db.String(20), nullable=False)
+    target_id = db.Column(db.Integer, nullable=False)
+    target_attribute = db.Column(db.String(50), nullable=False)
+    folder_key = db.Column(db.String(50), nullable=False)
+    source_path = db.Column(db.String(500), nullable=False)
+    image_format = db.Column(db.String(10), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="pending")
+    result_path = db.Column(db.String(255))
+    error = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    # Set when a process takes over a job left pending by one that died.
+    claimed_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self) -> str:
+        return f"<ImageJob {self.id} {self.status}>"
+
+
+class StoredFile(db.Model):
+    """Reference count for a content-addressed upload shared by several rows."""
+
+    path = db.Column(db.String(255), primary_key=True)
+    refcount = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+
+    def __repr__(self) -> str:
+        return f"<StoredFile {self.path} x{self.refcount}>"
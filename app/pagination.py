@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from flask import current_app
+from sqlalchemy import func, select, tuple_
+
+from .models import Post, db
+
+_NEXT = "n"
+_PREV = "p"
+# Largest id a BIGINT (and SQLite's INTEGER) column can bind.
+MAX_ID = 2**63 - 1
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction: str, post: Post) -> str:
+    payload = json.dumps([direction, post.date_posted.isoformat(), post.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction, posted, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in (_NEXT, _PREV):
+            raise ValueError(direction)
+        post_id = int(post_id)
+        if not 1 <= post_id <= MAX_ID:
+            raise ValueError(post_id)
+        return direction, datetime.fromisoformat(posted), post_id
+    except (binascii.Error, UnicodeDecodeError, OverflowError, TypeError, ValueError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+@dataclass
+class KeysetPage:
+    items: list[Any]
+    per_page: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def _keyset_window(cursor: str | None):
+    """Direction, filter criteria and ordering for the page after/before ``cursor``."""
+    key = (Post.date_posted, Post.id)
+    newest_first = (Post.date_posted.desc(), Post.id.desc())
+    if not cursor:
+        return None, (), newest_first
+    direction, posted, post_id = decode_cursor(cursor)
+    if direction == _NEXT:
+        return _NEXT, (tuple_(*key) < tuple_(posted, post_id),), newest_first
+    return _PREV, (tuple_(*key) > tuple_(posted, post_id),), (Post.date_posted.asc(), Post.id.asc())
+
+
+def _keyset_page(rows: list, direction: str | None, per_page: int) -> KeysetPage:
+    if direction == _PREV:
+        page = KeysetPage(items=list(reversed(rows[:per_page])), per_page=per_page)
+        if len(rows) > per_page:
+            page.prev_cursor = encode_cursor(_PREV, page.items[0])
+        if page.items:
+            page.next_cursor = encode_cursor(_NEXT, page.items[-1])
+        return page
+
+    page = KeysetPage(items=rows[:per_page], per_page=per_page)
+    if len(rows) > per_page:
+        page.next_cursor = encode_cursor(_NEXT, page.items[-1])
+    if direction == _NEXT and page.items:
+        page.prev_cursor = encode_cursor(_PREV, page.items[0])
+    return page
+
+
+def keyset_paginate(query, cursor: str | None, per_page: int) -> KeysetPage:
+    """Page ``query`` newest-first by ``(date_posted, id)`` without OFFSET or COUNT."""
+    direction, criteria, order_by = _keyset_window(cursor)
+    rows = query.filter(*criteria).order_by(*order_by).limit(per_page + 1).all()
+    return _keyset_page(rows, direction, per_page)
+
+
+async def keyset_paginate_async(session, stmt, cursor: str | None, per_page: int) -> KeysetPage:
+    """:func:`keyset_paginate` for a 2.0 ``select()`` run on an ``AsyncSession``."""
+    direction, criteria, order_by = _keyset_window(cursor)
+    result = await session.scalars(stmt.where(*criteria).order_by(*order_by).limit(per_page + 1))
+    return _keyset_page(list(result), direction, per_page)
+
+
+def approximate_post_count() -> int:
+    """Total number of posts, recounted at most once per ``POST_COUNT_CACHE_TTL`` seconds."""
+    cached = current_app.extensions.get("pulse_post_count")
+    now = time.monotonic()
+    if cached and cached[1] > now:
+        return cached[0]
+    total = db.session.execute(select(func.count()).select_from(Post)).scalar_one()
+    ttl = current_app.config.get("POST_COUNT_CACHE_TTL", 30)
+    current_app.extensions["pulse_post_count"] = (total, now + ttl)
+    return total
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from urllib.parse import quote
+
+from flask import current_app, request, url_for
+from sqlalchemy import func, select
+
+from .media import MEDIA_DIR
+from .models import PostImageMixin, ProfileImageMixin, Post, User, db
+
+# Listings read plain column tuples instead of ORM objects; nothing enters the identity map.
+FEED_COLUMNS = (
+    Post.id,
+    Post.title,
+    Post.content,
+    Post.date_posted,
+    Post.user_id,
+    Post.image,
+    Post.image_variants,
+    Post.image_pending,
+    Post.comment_count,
+)
+AUTHOR_COLUMNS = (User.username, User.profile_image, User.profile_image_variants)
+_AUTHOR = "author_"
+# What werkzeug's path converter leaves unescaped, so URLs match url_for() exactly.
+_SAFE = "!$&'()*+,/:;=@"
+
+
+class MediaURLs:
+    """:func:`app.media.media_url` with the ``/static`` and ``/media`` prefixes prebuilt."""
+
+    __slots__ = ("static", "media")
+
+    def __init__(self) -> None:
+        self.static = url_for("static", filename="_")[:-1]
+        self.media = url_for("media", filename="_")[:-1]
+
+    def __call__(self, path: str) -> str:
+        if path.startswith(f"{MEDIA_DIR}/"):
+            return self.media + quote(path[len(MEDIA_DIR) + 1 :], safe=_SAFE)
+        return self.static + quote(path, safe=_SAFE)
+
+
+def media_urls() -> MediaURLs:
+    cache = current_app.extensions.setdefault("pulse_media_urls", {})
+    urls = cache.get(request.script_root)
+    if urls is None:
+        urls = cache[request.script_root] = MediaURLs()
+    return urls
+
+
+class AuthorRow(ProfileImageMixin):
+    __slots__ = ("id", "username", "profile_image", "profile_image_variants", "_media_url")
+
+
+class PostRow(PostImageMixin):
+    """A post as listings read it; only the selected columns are set."""
+
+    __slots__ = (
+        *(column.key for column in Post.__table__.columns),
+        "excerpt",
+        "user",
+        "_media_url",
+    )
+
+
+def _selected(columns, author_columns, excerpt: int | None) -> list:
+    selected = {column.key: column for column in (Post.id, *columns)}
+    if excerpt is not None:
+        selected["excerpt"] = func.substr(Post.content, 1, excerpt + 1).label("excerpt")
+    if author_columns:
+        selected.setdefault("user_id", Post.user_id)
+        for column in author_columns:
+            selected[_AUTHOR + column.key] = column.label(_AUTHOR + column.key)
+    return list(selected.values())
+
+
+def select_posts(columns=FEED_COLUMNS, author_columns=AUTHOR_COLUMNS, excerpt: int | None = None):
+    """Select ``columns`` of posts and ``author_columns`` of their authors. ``excerpt`` adds
+    the first ``excerpt + 1`` characters of the content; the extra one tells whether it was
+    cut."""
+    stmt = select(*_selected(columns, author_columns, excerpt))
+    if author_columns:
+        stmt = stmt.join_from(Post, User, Post.user_id == User.id)
+    return stmt
+
+
+def feed_query():
+    """The feed columns as a legacy ``Query`` for the pagination helpers; convert the page
+    items with :func:`to_rows`."""
+    columns = _selected(FEED_COLUMNS, AUTHOR_COLUMNS, None)
+    return db.session.query(*columns).join(User, Post.user_id == User.id)
+
+
+def to_rows(rows) -> list[PostRow]:
+    """Build :class:`PostRow` objects from result rows of :func:`select_posts`. Posts by the
+    same author share one :class:`AuthorRow`."""
+    if not rows:
+        return []
+    url = media_urls()
+    keys = rows[0]._fields
+    split = next((n for n, key in enumerate(keys) if key.startswith(_AUTHOR)), len(keys))
+    post_keys = keys[:split]
+    author_keys = [key[len(_AUTHOR) :] for key in keys[split:]]
+    authors: dict[int, AuthorRow] = {}
+    posts = []
+    for values in rows:
+        post = PostRow()
+        post._media_url = url
+        for key, value in zip(post_keys, values[:split], strict=True):
+            setattr(post, key, value)
+        if author_keys:
+            author = authors.get(post.user_id)
+            if author is None:
+                author = authors[post.user_id] = AuthorRow()
+                author.id = post.user_id
+                author._media_url = url
+                for key, value in zip(author_keys, values[split:], strict=True):
+                    setattr(author, key, value)
+            post.user = author
+        posts.append(post)
+    return posts
+
+
+def recent_posts(limit: int) -> list[PostRow]:
+    stmt = select_posts().order_by(Post.date_posted.desc(), Post.id.desc()).limit(limit)
+    return to_rows(db.session.execute(stmt).all())
+
+
+def posts_by_id(ids, **options) -> dict[int, PostRow]:
+    """Posts with the given ids, keyed by id; ``options`` go to :func:`select_posts`."""
+    stmt = select_posts(**options).where(Post.id.in_(set(ids)))
+    return {post.id: post for post in to_rows(db.session.execute(stmt).all())}
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import readmodel
+from .models import Comment, Post, User, db
+
+_PENDING_KEY = "pulse_recent_changes"
+_AUTHOR_ATTRIBUTES = ("username", "profile_image", "profile_image_variants")
+
+
+def _newest_first(row) -> tuple:
+    return row.date_posted, row.id
+
+
+class RecentPosts:
+    """The newest ``size`` posts; reloaded once ``ttl`` seconds old to pick up other writers."""
+
+    def __init__(self, size: int, ttl: float) -> None:
+        self.size = size
+        self.ttl = ttl
+        # Readers take the tuple without locking; reloads and patches build a new one.
+        self._rows: tuple = ()
+        self._complete = False
+        self._expires = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _store(self, rows: list, complete: bool) -> None:
+        rows.sort(key=_newest_first, reverse=True)
+        self._complete = complete and len(rows) <= self.size
+        self._rows = tuple(rows[: self.size])
+
+    def reload(self) -> None:
+        stmt = (
+            readmodel.select_posts()
+            .order_by(Post.date_posted.desc(), Post.id.desc())
+            .limit(self.size)
+        )
+        rows = db.session.execute(stmt).all()
+        with self._lock:
+            self._store(rows, complete=len(rows) < self.size)
+            self._expires = time.monotonic() + self.ttl
+            self._loaded = True
+
+    def invalidate(self) -> None:
+        self._expires = 0.0
+
+    def _claim_reload(self) -> bool:
+        # Once warm, one thread reconciles while the others keep serving the current rows.
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded and now < self._expires:
+                return False
+            self._expires = now + self.ttl
+            return True
+
+    def rows(self, limit: int) -> tuple:
+        if time.monotonic() >= self._expires and self._claim_reload():
+            self.reload()
+        elif len(self._rows) < limit and not self._complete:
+            self.reload()
+        return self._rows[:limit]
+
+    def apply(self, upserts: set[int], deletes: set[int], user_ids: set[int]) -> None:
+        """Patch the window after a commit: reread changed posts, drop deleted ones."""
+        if not self._loaded:
+            return
+        with self._lock:
+            if not self._rows and not self._complete:
+                # Emptied by deletes: nothing to compare new posts with, so start over.
+                self.invalidate()
+                return
+            rows = {row.id: row for row in self._rows if row.id not in deletes}
+            upserts = upserts | {row.id for row in rows.values() if row.user_id in user_ids}
+            upserts -= deletes
+            if upserts:
+                # The session cannot run SQL once it has committed; read from the primary.
+                with db.engine.connect() as connection:
+                    loaded = connection.execute(
+                        readmodel.select_posts().where(Post.id.in_(upserts))
+                    ).all()
+                oldest = min(map(_newest_first, self._rows), default=None)
+                for row in loaded:
+                    # Past the end of a partial window there may be posts it never saw.
+                    if self._complete or row.id in rows or _newest_first(row) > oldest:
+                        rows[row.id] = row
+            self._store(list(rows.values()), self._complete)
+
+
+def init_app(app: Flask) -> None:
+    ttl = app.config.get("RECENT_POSTS_TTL", 0)
+    if ttl:
+        app.extensions["pulse_recent"] = RecentPosts(app.config.get("RECENT_POSTS_SIZE", 20), ttl)
+
+
+def get_recent_posts() -> RecentPosts | None:
+    return current_app.extensions.get("pulse_recent")
+
+
+def recent_posts(limit: int) -> list[readmodel.PostRow]:
+    """The ``limit`` newest posts as read-model rows, from memory when possible."""
+    recent = get_recent_posts()
+    if recent is None or limit > recent.size:
+        return readmodel.recent_posts(limit)
+    return readmodel.to_rows(recent.rows(limit))
+
+
+def warm(app: Flask) -> None:
+    """Load the window before the first request, e.g. in a freshly forked worker."""
+    recent = app.extensions.get("pulse_recent")
+    if recent is None:
+        return
+    with app.app_context():
+        try:
+            recent.reload()
+        except SQLAlchemyError:
+            # The first request loads it instead.
+            app.logger.warning("Could not warm the recent posts window", exc_info=True)
+
+
+def _author_changed(user: User) -> bool:
+    state = inspect(user)
+    return any(state.attrs[name].history.has_changes() for name in _AUTHOR_ATTRIBUTES)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    upserts, deletes, user_ids = session.info.setdefault(_PENDING_KEY, (set(), set(), set()))
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Post) and (obj in session.new or session.is_modified(obj)):
+            upserts.add(obj.id)
+        elif isinstance(obj, Comment):
+            # Counters changed the post's comment_count.
+            upserts.add(obj.post_id)
+        elif isinstance(obj, User) and obj not in session.new and _author_changed(obj):
+            user_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Post):
+            deletes.add(obj.id)
+        elif isinstance(obj, Comment):
+            upserts.add(obj.post_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes or not any(changes) or not has_app_context():
+        return
+    recent = get_recent_posts()
+    if recent is None:
+        return
+    try:
+        recent.apply(*changes)
+    except SQLAlchemyError:
+        current_app.logger.warning("Could not patch the recent posts window", exc_info=True)
+        recent.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import functools
+import itertools
+import threading
+import time
+
+from flask import Flask, current_app, has_request_context, request, session
+from flask_sqlalchemy.session import Session as SQLAlchemySession
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+_REPLICA_KEY = "pulse_replica"
+_WROTE_KEY = "pulse_wrote_primary"
+# Flask session key: read from the primary until this Unix time.
+_PRIMARY_UNTIL_KEY = "read_primary_until"
+
+
+class RoutingSession(SQLAlchemySession):
+    """Sends reads to the replica chosen for the request until the session writes.
+
+    Flushes always go to the primary, and once a session has flushed, later reads do too,
+    so a request sees its own writes even when the replica lags.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = self.info.get(_REPLICA_KEY)
+        if bind is None and replica is not None and not self._flushing:
+            if not self.info.get(_WROTE_KEY):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_to_primary(db_session: SQLAlchemySession, flush_context) -> None:
+    db_session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(db_session: SQLAlchemySession) -> None:
+    # The redirect after a write would otherwise read a replica that may not have it yet.
+    if db_session.info.get(_WROTE_KEY) and has_request_context() and get_replicas():
+        pin = current_app.config.get("DATABASE_REPLICA_PIN_SECONDS", 5)
+        session[_PRIMARY_UNTIL_KEY] = time.time() + pin
+
+
+class ReplicaSet:
+    def __init__(self, engines: list[Engine]) -> None:
+        self.engines = engines
+        self._cycle = itertools.cycle(engines)
+        self._lock = threading.Lock()
+
+    def next_engine(self) -> Engine:
+        with self._lock:
+            return next(self._cycle)
+
+    def dispose(self, close: bool = True) -> None:
+        for engine in self.engines:
+            engine.dispose(close=close)
+
+
+def init_app(app: Flask) -> None:
+    """Create an engine per DATABASE_REPLICA_URLS entry.
+
+    They are plain engines rather than Flask-SQLAlchemy binds: no model is bound to a
+    replica, and ``create_all`` must never run against one.
+    """
+    urls = app.config.get("DATABASE_REPLICA_URLS") or []
+    if urls:
+        options = app.config.get("DATABASE_REPLICA_ENGINE_OPTIONS") or {}
+        app.extensions["pulse_replicas"] = ReplicaSet(
+            [create_engine(url, **options) for url in urls]
+        )
+
+
+def get_replicas() -> ReplicaSet | None:
+    return current_app.extensions.get("pulse_replicas")
+
+
+def read_replica(view):
+    """Run GET/HEAD requests of the decorated view against a replica, round-robin."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        replicas = get_replicas()
+        if (
+            replicas is None
+            or request.method not in ("GET", "HEAD")
+            or session.get(_PRIMARY_UNTIL_KEY, 0) > time.time()
+        ):
+            return view(*args, **kwargs)
+        db_session = current_app.extensions["sqlalchemy"].session
+        db_session.info[_REPLICA_KEY] = replicas.next_engine()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            db_session.info.pop(_REPLICA_KEY, None)
+
+    return wrapper
@@ -1,33 +1,44 @@
 from __future__ import annotations
 
-from pathlib import Path
-from uuid import uuid4
-
 from flask import (
     Blueprint,
     abort,
     current_app,
     flash,
+    g,
     jsonify,
     redirect,
     render_template,
+    make_response,
     request,
+    session,
+    stream_with_context,
     url_for,
 )
 from flask_login import current_user, login_required, login_user, logout_user
-from PIL import Image, UnidentifiedImageError
+from sqlalchemy import inspect
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 from werkzeug.security import check_password_hash, generate_password_hash
 from werkzeug.exceptions import RequestEntityTooLarge
 
+from . import readmodel
+from .cache import FEED, cached_page
+from .conditional import compute_etag, not_modified, with_validators
+from .export import EXPORTS, export_stream
 from .forms import CommentForm, LoginForm, PostForm, RegistrationForm, UpdateProfileForm
-from .models import DEFAULT_PROFILE_IMAGE, Comment, Post, User, db
+from .images import delete_image, save_image
+from .jobs import get_pipeline, queue_image
+from .media import media_url
+from .models import DEFAULT_PROFILE_IMAGE, Comment, ImageJob, Post, User, db
+from .pagination import MAX_ID, InvalidCursor, approximate_post_count, keyset_paginate
+from .recent import recent_posts
+from .replicas import read_replica
+from .search import get_backend, search_posts
+from .tokens import api_login_required, issue_token
 
 bp = Blueprint("app", __name__)
 
-FORMAT_EXTENSION_MAP = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
-
 
 def _get_post_or_404(post_id: int) -> Post:
     post = db.session.get(Post, post_id)
@@ -43,103 +54,117 @@ def _get_comment_or_404(comment_id: int) -> Comment:
     return comment
 
 
-def _allowed_formats() -> set[str]:
-    configured = current_app.config.get("ALLOWED_IMAGE_FORMATS") or set()
-    return {fmt.upper() for fmt in configured}
-
-
-def _validate_image_upload(file_storage) -> tuple[Image.Image, str]:
-    if not file_storage or file_storage.filename == "":
-        raise ValueError("Выберите файл изображения.")
-    if not (file_storage.mimetype or "").startswith("image/"):
-        raise ValueError("Разрешена загрузка только изображений.")
-
-    try:
-        file_storage.stream.seek(0)
-        image = Image.open(file_storage.stream)
-        image.verify()
-        image_format = (image.format or "").upper()
-    except (UnidentifiedImageError, OSError) as exc:
-        raise ValueError("Файл не является допустимым изображением.") from exc
-
-    allowed_formats = _allowed_formats()
-    if image_format not in allowed_formats:
-        raise ValueError(f"Недопустимый формат. Разрешены: {', '.join(sorted(allowed_formats))}")
-
-    file_storage.stream.seek(0)
-    sanitized = Image.open(file_storage.stream)
-    sanitized.load()
-    return sanitized, image_format
-
-
-def _prepare_image_for_save(image: Image.Image, image_format: str) -> Image.Image:
-    if image_format == "JPEG":
-        if image.mode not in ("RGB", "L"):
-            image = image.convert("RGB")
-    elif image_format in {"PNG", "WEBP"}:
-        if image.mode not in ("RGB", "RGBA"):
-            image = image.convert("RGBA")
-    elif image_format == "GIF":
-        if image.mode not in ("P", "L", "RGBA", "RGB"):
-            image = image.convert("RGBA")
-    return image
-
-
-def _save_image(file_storage, folder_key: str) -> str | None:
-    if not file_storage or file_storage.filename == "":
-        return None
-
-    image, image_format = _validate_image_upload(file_storage)
-    image = _prepare_image_for_save(image, image_format)
-
-    target_dir = Path(current_app.config[folder_key])
-    target_dir.mkdir(parents=True, exist_ok=True)
-
-    extension = FORMAT_EXTENSION_MAP.get(image_format, f".{image_format.lower()}")
-    filename = f"{uuid4().hex}{extension}"
-    path = target_dir / filename
-
-    save_kwargs = {"format": image_format}
-    if image_format == "JPEG":
-        save_kwargs.update({"quality": 85, "optimize": True})
-
-    image.save(path, **save_kwargs)
-
-    static_root = Path(current_app.static_folder).resolve()
-    try:
-        relative = path.resolve().relative_to(static_root)
-    except ValueError as exc:
-        raise RuntimeError("Upload path is misconfigured.") from exc
-    return relative.as_posix()
-
-
-def _delete_file(relative_path: str | None) -> None:
-    if not relative_path:
-        return
-
-    rel_path = Path(relative_path)
-    if rel_path.is_absolute():
-        current_app.logger.warning("Attempt to delete absolute path %s was blocked.", rel_path)
-        return
+# JSON field -> (Post columns it reads, value). The order is the default response order.
+POST_FIELDS = {
+    "id": ((Post.id,), lambda post: post.id),
+    "title": ((Post.title,), lambda post: post.title),
+    "content": ((Post.content,), lambda post: post.content),
+    "author": ((Post.user_id,), lambda post: post.user.username),
+    "created_at": ((Post.date_posted,), lambda post: post.date_posted.isoformat()),
+    "image": ((Post.image, Post.image_variants), lambda post: post.image_url()),
+    "thumbnail": ((Post.image, Post.image_variants), lambda post: post.image_url(320)),
+    "image_pending": ((Post.image_pending,), lambda post: post.image_pending),
+}
+MAX_EXCERPT = 10_000
+
+
+def serialize_post(
+    post: Post, fields: tuple[str, ...] | None = None, excerpt: int | None = None
+) -> dict:
+    """``fields`` limits the keys; ``excerpt`` replaces ``content`` with its first N
+    characters, read from ``post.excerpt`` (see :func:`post_read_options`)."""
+    data = {}
+    for name in fields or POST_FIELDS:
+        if name == "content" and excerpt is not None:
+            data["content"] = post.excerpt[:excerpt]
+            data["content_truncated"] = len(post.excerpt) > excerpt
+        else:
+            data[name] = POST_FIELDS[name][1](post)
+    return data
+
+
+def parse_post_fieldset(args) -> tuple[tuple[str, ...] | None, int | None]:
+    """Read ``fields=a,b`` and ``excerpt=N``; raises ValueError on bad input."""
+    fields = None
+    if args.get("fields"):
+        fields = tuple(dict.fromkeys(name.strip() for name in args["fields"].split(",")))
+        fields = tuple(name for name in fields if name)
+        unknown = [name for name in fields if name not in POST_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"Unknown fields {unknown}; allowed: {', '.join(POST_FIELDS)}")
+    excerpt = None
+    if "excerpt" in args:
+        excerpt = args.get("excerpt", type=int)
+        if excerpt is None or not 0 < excerpt <= MAX_EXCERPT:
+            raise ValueError(f"excerpt must be an integer between 1 and {MAX_EXCERPT}")
+    return fields, excerpt
+
+
+def post_read_options(
+    fields: tuple[str, ...] | None = None, excerpt: int | None = None, *extra_columns
+) -> dict:
+    """:func:`readmodel.select_posts` arguments reading only the columns the fieldset
+    serializes, plus ``extra_columns``."""
+    names = fields or tuple(POST_FIELDS)
+    columns = {column.key: column for name in names for column in POST_FIELDS[name][0]}
+    columns.update((column.key, column) for column in extra_columns)
+    if excerpt is not None:
+        # Only the first excerpt + 1 characters of content leave the database.
+        columns.pop("content", None)
+    return {
+        "columns": tuple(columns.values()),
+        "author_columns": (User.username,) if "author" in names else (),
+        "excerpt": excerpt if "content" in names else None,
+    }
+
+
+def serialize_comment(comment: Comment) -> dict:
+    return {
+        "id": comment.id,
+        "post_id": comment.post_id,
+        "content": comment.content,
+        "author": comment.user.username,
+        "created_at": comment.date_created.isoformat(),
+    }
+
+
+def _attach_image(
+    file_storage, folder_key: str, target, attribute: str
+) -> tuple[str | None, list[dict] | None]:
+    """Store an upload as ``target.<attribute>`` plus its ``<attribute>_variants``.
+
+    Returns the replaced ``(path, variants)``, which the caller deletes after committing.
+    With IMAGE_PIPELINE=process the upload is queued instead and the worker swaps the image
+    and cleans up once it is ready; the response names the job in ``X-Image-Job``.
+    """
+    if get_pipeline().is_async:
+        g.setdefault("image_jobs", []).append(
+            queue_image(file_storage, folder_key, target, attribute)
+        )
+        return None, None
+    variants_attribute = f"{attribute}_variants"
+    replaced = getattr(target, attribute), getattr(target, variants_attribute)
+    path, variants = save_image(file_storage, folder_key)
+    setattr(target, attribute, path)
+    setattr(target, variants_attribute, variants)
+    return replaced
 
-    uploads_root = Path(current_app.config["UPLOAD_ROOT"]).resolve()
-    target = (Path(current_app.static_folder) / rel_path).resolve()
-    if uploads_root not in target.parents and target != uploads_root:
-        current_app.logger.warning("Attempt to delete file outside uploads dir: %s", target)
-        return
 
-    try:
-        target.unlink()
-    except FileNotFoundError:
-        return
+@bp.after_request
+def _link_image_jobs(response):
+    # Jobs expire on commit; the identity key still holds the id without another query.
+    for job in g.pop("image_jobs", ()):
+        identity = inspect(job).identity
+        if identity:
+            response.headers.add("X-Image-Job", url_for("app.api_image_job", job_id=identity[0]))
+    return response
 
 
 @bp.route("/")
+@read_replica
+@cached_page(FEED)
 def home():
-    recent_posts = (
-        Post.query.options(joinedload(Post.user)).order_by(Post.date_posted.desc()).limit(6).all()
-    )
-    return render_template("home.html", posts=recent_posts)
+    return render_template("home.html", posts=recent_posts(6))
 
 
 @bp.route("/register", methods=["GET", "POST"])
@@ -192,20 +217,19 @@ def create_post():
     form = PostForm()
     status_code = 200
     if form.validate_on_submit():
-        image_path = None
+        post = Post(
+            title=form.title.data.strip(),
+            content=form.content.data.strip(),
+            user_id=current_user.id,
+        )
         if form.image.data:
             try:
-                image_path = _save_image(form.image.data, "POST_UPLOAD_FOLDER")
+                _attach_image(form.image.data, "POST_UPLOAD_FOLDER", post, "image")
             except ValueError as exc:
+                db.session.rollback()
                 flash(str(exc), "danger")
                 return render_template("create_post.html", form=form), 400
 
-        post = Post(
-            title=form.title.data.strip(),
-            content=form.content.data.strip(),
-            user=current_user,
-            image=image_path,
-        )
         db.session.add(post)
         db.session.commit()
         flash("Пост опубликован!", "success")
@@ -224,22 +248,19 @@ def edit_post(post_id: int):
 
     form = PostForm(obj=post)
     if form.validate_on_submit():
-        previous_image = post.image
-        new_image_path = None
+        replaced_image = (None, None)
         if form.image.data:
             try:
-                new_image_path = _save_image(form.image.data, "POST_UPLOAD_FOLDER")
+                replaced_image = _attach_image(form.image.data, "POST_UPLOAD_FOLDER", post, "image")
             except ValueError as exc:
                 flash(str(exc), "danger")
                 db.session.rollback()
                 return render_template("edit_post.html", form=form, post=post), 400
         post.title = form.title.data.strip()
         post.content = form.content.data.strip()
-        if new_image_path:
-            post.image = new_image_path
         db.session.commit()
-        if new_image_path and previous_image and new_image_path != previous_image:
-            _delete_file(previous_image)
+        if replaced_image[0]:
+            delete_image(*replaced_image)
         flash("Пост обновлён.", "success")
         return redirect(url_for("app.view_post", post_id=post.id))
 
@@ -251,6 +272,7 @@ def edit_post(post_id: int):
 
 
 @bp.route("/post/<int:post_id>", methods=["GET", "POST"])
+@read_replica
 def view_post(post_id: int):
     post = Post.query.options(joinedload(Post.user)).filter_by(id=post_id).first_or_404()
     form = CommentForm()
@@ -259,36 +281,78 @@ def view_post(post_id: int):
             flash("Войдите, чтобы оставлять комментарии.", "danger")
             return redirect(url_for("app.login"))
         if form.validate_on_submit():
-            comment = Comment(content=form.content.data.strip(), post=post, user=current_user)
+            comment = Comment(content=form.content.data.strip(), post=post, user_id=current_user.id)
             db.session.add(comment)
             db.session.commit()
             flash("Комментарий добавлен!", "success")
             return redirect(url_for("app.view_post", post_id=post_id))
 
+    # Anonymous pages only differ by post state, so they can be revalidated before the
+    # comments are loaded. Authenticated pages embed per-session CSRF tokens.
+    etag = None
+    if not current_user.is_authenticated and "_flashes" not in session:
+        etag = compute_etag("post", post.id, post.updated_at, post.user.profile_image)
+        cached = not_modified(etag, post.updated_at)
+        if cached is not None:
+            return cached
+
     comments = (
         Comment.query.options(joinedload(Comment.user))
         .filter_by(post_id=post.id)
         .order_by(Comment.date_created.desc())
         .all()
     )
-    return render_template("view_post.html", post=post, comments=comments, form=form)
+    response = make_response(
+        render_template("view_post.html", post=post, comments=comments, form=form)
+    )
+    if etag is not None:
+        with_validators(response, etag, post.updated_at)
+    return response
 
 
 @bp.route("/all_posts")
+@read_replica
+@cached_page(FEED)
 def all_posts():
     search_query = (request.args.get("search") or "").strip()
-    page = request.args.get("page", 1, type=int)
     per_page = 6
 
-    query = Post.query.options(joinedload(Post.user)).order_by(Post.date_posted.desc())
+    query = readmodel.feed_query()
     if search_query:
-        query = query.filter(
-            Post.title.ilike(f"%{search_query}%") | Post.content.ilike(f"%{search_query}%")
+        page = max(request.args.get("page", 1, type=int) or 1, 1)
+        posts = search_posts(search_query, page=page, per_page=per_page)
+        prev_url = (
+            url_for("app.all_posts", page=page - 1, search=search_query) if posts.has_prev else None
         )
+        next_url = (
+            url_for("app.all_posts", page=page + 1, search=search_query) if posts.has_next else None
+        )
+    elif "page" in request.args:
+        page = request.args.get("page", 1, type=int)
+        posts = query.order_by(Post.date_posted.desc(), Post.id.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        prev_url = url_for("app.all_posts", page=posts.prev_num) if posts.has_prev else None
+        next_url = url_for("app.all_posts", page=posts.next_num) if posts.has_next else None
+        posts.items = readmodel.to_rows(posts.items)
+    else:
+        try:
+            posts = keyset_paginate(query, request.args.get("cursor"), per_page)
+        except InvalidCursor:
+            abort(400)
+        prev_url = url_for("app.all_posts", cursor=posts.prev_cursor) if posts.has_prev else None
+        next_url = url_for("app.all_posts", cursor=posts.next_cursor) if posts.has_next else None
+        posts.items = readmodel.to_rows(posts.items)
 
-    posts = query.paginate(page=page, per_page=per_page, error_out=False)
     form = CommentForm()
-    return render_template("all_posts.html", posts=posts, form=form, search=search_query)
+    return render_template(
+        "all_posts.html",
+        posts=posts,
+        form=form,
+        search=search_query,
+        prev_url=prev_url,
+        next_url=next_url,
+    )
 
 
 @bp.route("/delete_post/<int:post_id>", methods=["POST"])
@@ -297,10 +361,10 @@ def delete_post(post_id: int):
     post = _get_post_or_404(post_id)
     if current_user != post.user:
         abort(403)
-    image_path = post.image
+    image = post.image, post.image_variants
     db.session.delete(post)
     db.session.commit()
-    _delete_file(image_path)
+    delete_image(*image)
     flash("Пост удалён.", "success")
     return redirect(url_for("app.all_posts"))
 
@@ -309,17 +373,18 @@ def delete_post(post_id: int):
 @login_required
 def profile():
     form = UpdateProfileForm()
-    user = current_user
+    # current_user is a cached SessionUser; the avatar is changed on the row itself.
+    user = db.session.get(User, current_user.id)
     status_code = 200
 
     if form.validate_on_submit() and form.profile_picture.data:
-        previous_image = user.profile_image
         try:
-            saved = _save_image(form.profile_picture.data, "PROFILE_UPLOAD_FOLDER")
-            user.profile_image = saved
+            replaced_image = _attach_image(
+                form.profile_picture.data, "PROFILE_UPLOAD_FOLDER", user, "profile_image"
+            )
             db.session.commit()
-            if previous_image and previous_image != DEFAULT_PROFILE_IMAGE:
-                _delete_file(previous_image)
+            if replaced_image[0] and replaced_image[0] != DEFAULT_PROFILE_IMAGE:
+                delete_image(*replaced_image)
             flash("Фото профиля обновлено.", "success")
         except ValueError as exc:
             flash(str(exc), "danger")
@@ -328,12 +393,7 @@ def profile():
     if request.method == "POST" and form.errors:
         status_code = 400
 
-    posts = (
-        Post.query.filter_by(user_id=user.id)
-        .order_by(Post.date_posted.desc())
-        .options(joinedload(Post.comments))
-        .all()
-    )
+    posts = Post.query.filter_by(user_id=user.id).order_by(Post.date_posted.desc()).all()
     return render_template("profile.html", user=user, posts=posts, form=form), status_code
 
 
@@ -372,36 +432,226 @@ def handle_large_file(error):
     return redirect(request.referrer or url_for("app.home")), 413
 
 
+def _parse_ids(raw: str) -> list[int] | None:
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        return None
+    if not all(1 <= post_id <= MAX_ID for post_id in ids):
+        return None
+    return ids if 0 < len(ids) <= current_app.config["API_MAX_IDS"] else None
+
+
+def _api_posts_by_id(raw: str, fields, excerpt):
+    ids = _parse_ids(raw)
+    if ids is None:
+        limit = current_app.config["API_MAX_IDS"]
+        return jsonify({"error": f"ids must be 1-{limit} comma-separated integers"}), 400
+    # One query for the whole set; the response follows the requested order.
+    posts = readmodel.posts_by_id(ids, **post_read_options(fields, excerpt, Post.updated_at))
+    etag = compute_etag(
+        "posts-ids",
+        ids,
+        fields,
+        excerpt,
+        sorted((p.id, p.updated_at) for p in posts.values()),
+    )
+    last_modified = max((p.updated_at for p in posts.values() if p.updated_at), default=None)
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+    items = [
+        (
+            serialize_post(posts[post_id], fields, excerpt)
+            if post_id in posts
+            else {"id": post_id, "error": "not_found"}
+        )
+        for post_id in ids
+    ]
+    return with_validators(jsonify({"items": items}), etag, last_modified)
+
+
 @bp.route("/api/posts")
+@read_replica
 def api_posts():
-    page = max(request.args.get("page", 1, type=int) or 1, 1)
+    try:
+        fields, excerpt = parse_post_fieldset(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if "ids" in request.args:
+        return _api_posts_by_id(request.args["ids"], fields, excerpt)
+
     limit = request.args.get("limit", 20, type=int) or 20
     if limit <= 0:
         limit = 20
     limit = min(limit, 100)
 
-    pagination = (
-        Post.query.options(joinedload(Post.user))
-        .order_by(Post.date_posted.desc())
-        .paginate(page=page, per_page=limit, error_out=False)
-    )
-    items = [
-        {
-            "id": p.id,
-            "title": p.title,
-            "content": p.content,
-            "author": p.user.username,
-            "created_at": p.date_posted.isoformat(),
-            "image": p.image_url(),
+    # Page through narrow (id, date_posted, updated_at) rows first: they are enough to
+    # answer a conditional request, and full posts are only loaded for a 200.
+    keys = db.session.query(Post.id, Post.date_posted, Post.updated_at)
+    if "cursor" in request.args:
+        try:
+            keyset = keyset_paginate(keys, request.args.get("cursor"), limit)
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+        rows = keyset.items
+        payload = {
+            "limit": limit,
+            "next_cursor": keyset.next_cursor,
+            "prev_cursor": keyset.prev_cursor,
         }
-        for p in pagination.items
-    ]
-    return jsonify(
-        {
-            "items": items,
+        if request.args.get("include_total", type=int):
+            payload["total_estimate"] = approximate_post_count()
+    else:
+        page = max(request.args.get("page", 1, type=int) or 1, 1)
+        pagination = keys.order_by(Post.date_posted.desc(), Post.id.desc()).paginate(
+            page=page, per_page=limit, error_out=False
+        )
+        rows = pagination.items
+        payload = {
             "page": pagination.page,
             "limit": pagination.per_page,
             "total": pagination.total,
             "total_pages": pagination.pages or 0,
         }
+
+    etag = compute_etag(
+        "posts",
+        sorted(request.args.items(multi=True)),
+        sorted(payload.items()),
+        [(row.id, row.updated_at) for row in rows],
+    )
+    last_modified = max((row.updated_at for row in rows if row.updated_at), default=None)
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+
+    # Only the columns behind the requested fields are read, into plain rows.
+    posts = readmodel.posts_by_id([row.id for row in rows], **post_read_options(fields, excerpt))
+    payload["items"] = [
+        serialize_post(posts[row.id], fields, excerpt) for row in rows if row.id in posts
+    ]
+    return with_validators(jsonify(payload), etag, last_modified)
+
+
+@bp.route("/api/posts/batch", methods=["POST"])
+@api_login_required
+def api_posts_batch():
+    """Create several posts at once, all or nothing.
+
+    Every item is validated like the post form; if any fails, nothing is written and the
+    response lists the errors per item.
+    """
+    body = request.get_json(silent=True)
+    items = body.get("posts") if isinstance(body, dict) else body
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Expected a non-empty list of posts"}), 400
+    max_posts = current_app.config["API_BATCH_MAX_POSTS"]
+    if len(items) > max_posts:
+        return jsonify({"error": f"At most {max_posts} posts per batch"}), 413
+
+    posts, results = [], []
+    for index, item in enumerate(items):
+        fields = item if isinstance(item, dict) else {}
+        data = {key: fields.get(key) for key in ("title", "content")}
+        # Non-string values are treated as missing rather than coerced.
+        data = {key: value for key, value in data.items() if isinstance(value, str)}
+        form = PostForm(formdata=None, data=data, meta={"csrf": False})
+        if form.validate():
+            posts.append(
+                Post(
+                    title=form.title.data.strip(),
+                    content=form.content.data.strip(),
+                    user_id=current_user.id,
+                )
+            )
+            results.append({"index": index, "status": "valid"})
+        else:
+            results.append({"index": index, "status": "invalid", "errors": form.errors})
+
+    if len(posts) < len(items):
+        return jsonify({"created": 0, "results": results}), 400
+
+    db.session.add_all(posts)
+    db.session.commit()
+    for result, post in zip(results, posts, strict=True):
+        result.update(status="created", id=post.id)
+    return jsonify({"created": len(posts), "results": results}), 201
+
+
+@bp.route("/api/token", methods=["POST"])
+@login_required
+def api_token():
+    return jsonify(
+        {
+            "token": issue_token(current_user.id),
+            "token_type": "Bearer",
+            "expires_in": current_app.config["API_TOKEN_MAX_AGE"],
+        }
+    )
+
+
+@bp.route("/admin/export/<kind>")
+@login_required
+def admin_export(kind: str):
+    """Stream every post or comment as NDJSON: ``?after_id=<id>`` resumes, ``?gzip=1``."""
+    if current_user.id not in current_app.config["ADMIN_USER_IDS"]:
+        abort(403)
+    if kind not in EXPORTS:
+        abort(404)
+    after_id = max(request.args.get("after_id", 0, type=int) or 0, 0)
+    compress = bool(request.args.get("gzip", type=int))
+    response = current_app.response_class(
+        stream_with_context(export_stream(kind, after_id, compress)),
+        mimetype="application/gzip" if compress else "application/x-ndjson",
+    )
+    filename = f"{kind}.ndjson.gz" if compress else f"{kind}.ndjson"
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@bp.route("/api/search")
+def api_search():
+    search_query = (request.args.get("q") or "").strip()
+    if not search_query:
+        return jsonify({"error": "Query parameter q is required"}), 400
+    page = max(request.args.get("page", 1, type=int) or 1, 1)
+    limit = min(max(request.args.get("limit", 20, type=int) or 20, 1), 100)
+
+    results = search_posts(search_query, page=page, per_page=limit)
+    return jsonify(
+        {
+            "items": [
+                {**serialize_post(p), "score": results.scores.get(p.id)} for p in results.items
+            ],
+            "page": page,
+            "limit": limit,
+            "has_next": results.has_next,
+            "backend": get_backend().name,
+        }
+    )
+
+
+@bp.route("/api/image-jobs/<int:job_id>")
+@login_required
+def api_image_job(job_id: int):
+    job = db.session.get(ImageJob, job_id)
+    if job is None:
+        abort(404)
+    owner_id = job.target_id
+    if job.target_type == "post":
+        post = db.session.get(Post, job.target_id)
+        owner_id = post.user_id if post else None
+    if owner_id != current_user.id:
+        abort(404)
+    return jsonify(
+        {
+            "id": job.id,
+            "status": job.status,
+            "error": job.error,
+            "target_type": job.target_type,
+            "target_id": job.target_id,
+            "image": media_url(job.result_path) if job.result_path else None,
+        }
     )
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from sqlalchemy import inspect, text, update
+from sqlalchemy.schema import CreateColumn
+
+from .counters import recount_all
+from .models import Post, db
+from .search import rebuild_search_index, resolve_backend
+
+
+def _backfill_post_updated_at() -> None:
+    post_table = Post.__table__
+    db.session.execute(
+        update(post_table)
+        .where(post_table.c.updated_at.is_(None))
+        .values(updated_at=post_table.c.date_posted)
+    )
+    db.session.commit()
+
+
+# Columns whose values have to be derived from existing rows once they are added.
+_BACKFILLS = {
+    "post.comment_count": recount_all,
+    "user.post_count": recount_all,
+    "post.updated_at": _backfill_post_updated_at,
+}
+
+
+def upgrade_schema() -> list[str]:
+    """Bring an existing database up to date with the models.
+
+    ``create_all`` only creates missing tables, so columns and indexes added to tables that
+    already exist are created here. Returns the names of the objects that were created.
+    """
+    db.create_all()
+    created = []
+    with db.engine.begin() as connection:
+        inspector = inspect(connection)
+        preparer = connection.dialect.identifier_preparer
+        for table in db.metadata.sorted_tables:
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    ddl = CreateColumn(column).compile(dialect=connection.dialect)
+                    connection.execute(
+                        text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}")
+                    )
+                    created.append(f"{table.name}.{column.name}")
+
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(connection)
+                    created.append(index.name)
+
+        # The index is installed when the post table is created; older databases predate it.
+        backend = resolve_backend(connection)
+        search_missing = not backend.is_installed(connection)
+
+    for backfill in dict.fromkeys(_BACKFILLS[name] for name in created if name in _BACKFILLS):
+        backfill()
+    if search_missing:
+        rebuild_search_index()
+        created.append(f"search index ({backend.name})")
+    return created
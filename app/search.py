@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import joinedload
+
+from .models import Post, db
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(query: str) -> list[str]:
+    return _TOKEN_RE.findall(query.lower())
+
+
+class SearchBackend:
+    """Like-based fallback; subclasses keep a real index in sync inside the database."""
+
+    name = "like"
+
+    def is_installed(self, connection) -> bool:
+        return True
+
+    def install(self, connection) -> None:
+        pass
+
+    def uninstall(self, connection) -> None:
+        pass
+
+    def rebuild(self, connection) -> None:
+        self.install(connection)
+
+    def search(self, query: str, limit: int, offset: int) -> list[tuple[int, float | None]]:
+        pattern = f"%{query}%"
+        rows = (
+            db.session.query(Post.id)
+            .filter(Post.title.ilike(pattern) | Post.content.ilike(pattern))
+            .order_by(Post.date_posted.desc(), Post.id.desc())
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+        return [(row.id, None) for row in rows]
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    name = "fts5"
+
+    DDL = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5("
+        "title, content, content='post', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS post_fts_ai AFTER INSERT ON post BEGIN "
+        "INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS post_fts_ad AFTER DELETE ON post BEGIN "
+        "INSERT INTO post_fts(post_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS post_fts_au AFTER UPDATE OF title, content ON post BEGIN "
+        "INSERT INTO post_fts(post_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); "
+        "INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+        "END",
+        # Title hits weigh ten times more; lets ORDER BY rank be answered by FTS5 itself.
+        "INSERT INTO post_fts(post_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    )
+
+    def is_installed(self, connection) -> bool:
+        objects = connection.execute(
+            text("SELECT name FROM sqlite_master WHERE name LIKE 'post_fts%'")
+        ).scalars()
+        return {"post_fts", "post_fts_ai", "post_fts_ad", "post_fts_au"} <= set(objects)
+
+    def install(self, connection) -> None:
+        for statement in self.DDL:
+            connection.execute(text(statement))
+
+    def uninstall(self, connection) -> None:
+        connection.execute(text("DROP TABLE IF EXISTS post_fts"))
+
+    def rebuild(self, connection) -> None:
+        self.install(connection)
+        connection.execute(text("INSERT INTO post_fts(post_fts) VALUES ('rebuild')"))
+
+    def search(self, query: str, limit: int, offset: int) -> list[tuple[int, float | None]]:
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        match = " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+        rows = db.session.execute(
+            text(
+                "SELECT rowid, rank FROM post_fts "
+                "WHERE post_fts MATCH :match ORDER BY rank LIMIT :limit OFFSET :offset"
+            ),
+            {"match": match, "limit": limit, "offset": offset},
+        )
+        return [(row.rowid, -row.rank) for row in rows]
+
+
+class PostgresSearchBackend(SearchBackend):
+    name = "postgres"
+
+    DDL = (
+        "ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(content, '')), 'B')) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_post_search_vector ON post USING GIN (search_vector)",
+    )
+
+    def is_installed(self, connection) -> bool:
+        inspector = inspect(connection)
+        columns = {column["name"] for column in inspector.get_columns("post")}
+        indexes = {index["name"] for index in inspector.get_indexes("post")}
+        return "search_vector" in columns and "ix_post_search_vector" in indexes
+
+    def install(self, connection) -> None:
+        for statement in self.DDL:
+            connection.execute(text(statement))
+
+    def rebuild(self, connection) -> None:
+        self.install(connection)
+        connection.execute(text("REINDEX INDEX ix_post_search_vector"))
+
+    def search(self, query: str, limit: int, offset: int) -> list[tuple[int, float | None]]:
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        rows = db.session.execute(
+            text(
+                "SELECT id, ts_rank_cd(search_vector, q) AS rank "
+                "FROM post, to_tsquery('simple', :tsquery) AS q "
+                "WHERE search_vector @@ q ORDER BY rank DESC, id DESC LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "tsquery": " & ".join(f"{token}:*" for token in tokens),
+                "limit": limit,
+                "offset": offset,
+            },
+        )
+        return [(row.id, float(row.rank)) for row in rows]
+
+
+BACKENDS: dict[str, type[SearchBackend]] = {
+    backend.name: backend for backend in (SearchBackend, SQLiteFTS5Backend, PostgresSearchBackend)
+}
+
+
+def _fts5_available(connection) -> bool:
+    options = connection.exec_driver_sql("PRAGMA compile_options").scalars().all()
+    return "ENABLE_FTS5" in options
+
+
+def resolve_backend(connection) -> SearchBackend:
+    configured = "auto"
+    if has_app_context():
+        configured = current_app.config.get("SEARCH_BACKEND", "auto")
+    dialect = connection.dialect.name
+    if configured == "auto":
+        configured = {"sqlite": "fts5", "postgresql": "postgres"}.get(dialect, "like")
+    if configured == "fts5" and (dialect != "sqlite" or not _fts5_available(connection)):
+        configured = "like"
+    if configured == "postgres" and dialect != "postgresql":
+        configured = "like"
+    try:
+        return BACKENDS[configured]()
+    except KeyError as exc:
+        raise RuntimeError(f"Unknown SEARCH_BACKEND {configured!r}.") from exc
+
+
+def get_backend() -> SearchBackend:
+    backend = current_app.extensions.get("pulse_search")
+    if backend is None:
+        backend = resolve_backend(db.session.connection())
+        current_app.extensions["pulse_search"] = backend
+    return backend
+
+
+def rebuild_search_index() -> SearchBackend:
+    with db.engine.begin() as connection:
+        backend = resolve_backend(connection)
+        backend.rebuild(connection)
+    current_app.extensions["pulse_search"] = backend
+    return backend
+
+
+@event.listens_for(Post.__table__, "after_create")
+def _install_search_index(target, connection, **kw) -> None:
+    resolve_backend(connection).install(connection)
+
+
+@event.listens_for(Post.__table__, "before_drop")
+def _uninstall_search_index(target, connection, **kw) -> None:
+    resolve_backend(connection).uninstall(connection)
+
+
+@dataclass
+class SearchResults:
+    items: list[Post]
+    page: int
+    per_page: int
+    has_next: bool
+    scores: dict[int, Any] = field(default_factory=dict)
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+
+def search_posts(query: str, page: int = 1, per_page: int = 20) -> SearchResults:
+    """Relevance-ranked posts matching ``query`` with their authors preloaded."""
+    hits = get_backend().search(query, limit=per_page + 1, offset=(page - 1) * per_page)
+    scores = dict(hits[:per_page])
+    posts = {}
+    if scores:
+        posts = {
+            post.id: post
+            for post in Post.query.options(joinedload(Post.user)).filter(Post.id.in_(scores))
+        }
+    items = [posts[post_id] for post_id in scores if post_id in posts]
+    return SearchResults(
+        items=items, page=page, per_page=per_page, has_next=len(hits) > per_page, scores=scores
+    )
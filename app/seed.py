@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import io
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from PIL import Image
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+from .images import encode_image, relative_image, retain_image, variant_options
+from .models import Comment, Post, User, db
+
+DISTRIBUTIONS = ("fixed", "uniform", "exponential", "pareto")
+
+WORDS = (
+    "город утро кофе проект код релиз команда идея музыка книга поезд море ветер фото "
+    "запуск тест сервер дизайн вечер друзья горы снег лето осень новости идея план "
+    "flask python api база кеш поиск лента профиль комментарий пост выходные работа"
+).split()
+
+
+@dataclass(frozen=True)
+class SeedOptions:
+    users: int = 1000
+    posts_per_user: float = 10
+    comments_per_post: float = 3
+    distribution: str = "exponential"
+    image_fraction: float = 0.0
+    image_pool: int = 8
+    days: int = 365
+    seed: int = 0
+    chunk_size: int = 10_000
+
+
+@dataclass
+class SeedStats:
+    users: int = 0
+    posts: int = 0
+    comments: int = 0
+    images: int = 0
+
+    @property
+    def rows(self) -> int:
+        return self.users + self.posts + self.comments
+
+
+def draw_count(rng: random.Random, distribution: str, mean: float) -> int:
+    """A non-negative count with the given mean under ``distribution``."""
+    if mean <= 0:
+        return 0
+    if distribution == "fixed":
+        return round(mean)
+    if distribution == "uniform":
+        return rng.randint(0, round(2 * mean))
+    if distribution == "exponential":
+        return int(rng.expovariate(1 / (mean + 0.5)))
+    if distribution == "pareto":
+        # A few very active accounts and threads, most nearly silent; alpha 1.5 has mean 3.
+        return min(int(mean * rng.paretovariate(1.5) / 3), int(mean * 100))
+    raise ValueError(f"Unknown distribution {distribution!r}")
+
+
+def _text(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize()
+
+
+def _text_pool(rng: random.Random, low: int, high: int, size: int = 4096) -> list[str]:
+    # Composing text per row costs more than inserting it; rows draw from a fixed pool.
+    return [_text(rng, low, high) for _ in range(size)]
+
+
+def _placeholder_images(rng: random.Random, count: int) -> list[tuple[str, list[dict]]]:
+    """Store ``count`` distinct gradient images through the normal upload pipeline."""
+    folder_key = "POST_UPLOAD_FOLDER"
+    images = []
+    for _ in range(count):
+        start = tuple(rng.randrange(256) for _ in range(3))
+        end = tuple(rng.randrange(256) for _ in range(3))
+        gradient = Image.linear_gradient("L").resize((1280, 720))
+        image = Image.composite(
+            Image.new("RGB", (1280, 720), end), Image.new("RGB", (1280, 720), start), gradient
+        )
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        buffer.seek(0)
+        encoded = encode_image(
+            buffer,
+            current_app.config[folder_key],
+            "JPEG",
+            variant_options(folder_key),
+        )
+        images.append(relative_image(encoded))
+    return images
+
+
+def _next_id(model) -> int:
+    # Ids are assigned up front so rows can point at parents still in an unflushed chunk.
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+class _Chunks:
+    """Row buffers per table, written parent tables first so foreign keys always resolve."""
+
+    def __init__(self, *tables) -> None:
+        self.rows = {table: [] for table in tables}
+        self.pending = 0
+
+    def add(self, table, row: dict) -> None:
+        self.rows[table].append(row)
+        self.pending += 1
+
+    def flush(self) -> None:
+        for table, rows in self.rows.items():
+            if rows:
+                db.session.execute(insert(table), rows)
+                rows.clear()
+        self.pending = 0
+        db.session.commit()
+
+
+def _sync_sequences() -> None:
+    """Move PostgreSQL id sequences past the explicitly assigned ids."""
+    if db.session.get_bind().dialect.name != "postgresql":
+        return
+    for model in (User, Post, Comment):
+        table = model.__tablename__
+        db.session.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                f'(SELECT MAX(id) FROM "{table}"))'
+            )
+        )
+
+
+def _timestamps(rng: random.Random, now: datetime, days: int) -> Iterator[datetime]:
+    span = days * 86400
+    while True:
+        yield now - timedelta(seconds=rng.random() * span)
+
+
+def seed(options: SeedOptions) -> SeedStats:
+    """Insert ``options.users`` users with their posts and comments; commits per chunk."""
+    if options.distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {options.distribution!r}")
+    rng = random.Random(options.seed)
+    now = datetime.now(timezone.utc)
+    stats = SeedStats()
+    password = generate_password_hash("password", method="pbkdf2:sha256")
+
+    images = []
+    if options.image_fraction > 0:
+        images = _placeholder_images(rng, options.image_pool)
+        stats.images = len(images)
+    image_uses = [0] * len(images)
+
+    first_user, first_post, first_comment = _next_id(User), _next_id(Post), _next_id(Comment)
+    post_counts = [
+        draw_count(rng, options.distribution, options.posts_per_user) for _ in range(options.users)
+    ]
+
+    titles = _text_pool(rng, 2, 8)
+    bodies = _text_pool(rng, 12, 80)
+    replies = _text_pool(rng, 2, 30)
+    user_table, post_table, comment_table = User.__table__, Post.__table__, Comment.__table__
+    chunks = _Chunks(user_table, post_table, comment_table)
+    timestamps = _timestamps(rng, now, options.days)
+    post_id, comment_id = first_post, first_comment
+
+    for offset, post_count in enumerate(post_counts):
+        user_id = first_user + offset
+        chunks.add(
+            user_table,
+            {
+                "id": user_id,
+                "username": f"seed{user_id}",
+                "password": password,
+                "profile_image": None,
+                "profile_image_variants": None,
+                # Core inserts bypass the ORM counter events; fill the counters directly.
+                "post_count": post_count,
+            },
+        )
+        for _ in range(post_count):
+            posted = next(timestamps)
+            comment_count = draw_count(rng, options.distribution, options.comments_per_post)
+            image, variants = None, None
+            if images and rng.random() < options.image_fraction:
+                index = rng.randrange(len(images))
+                image, variants = images[index]
+                image_uses[index] += 1
+            chunks.add(
+                post_table,
+                {
+                    "id": post_id,
+                    "title": rng.choice(titles)[:120],
+                    "content": rng.choice(bodies),
+                    "date_posted": posted,
+                    "updated_at": posted,
+                    "user_id": user_id,
+                    "image": image,
+                    "image_variants": variants,
+                    "image_pending": False,
+                    "comment_count": comment_count,
+                },
+            )
+            for _ in range(comment_count):
+                chunks.add(
+                    comment_table,
+                    {
+                        "id": comment_id,
+                        "content": rng.choice(replies),
+                        "date_created": posted + timedelta(seconds=rng.random() * 86400),
+                        "post_id": post_id,
+                        # Only users generated so far, so the author row is always written first.
+                        "user_id": rng.randint(first_user, user_id),
+                    },
+                )
+                comment_id += 1
+            post_id += 1
+        if chunks.pending >= options.chunk_size:
+            chunks.flush()
+
+    chunks.flush()
+    for (path, _), uses in zip(images, image_uses, strict=True):
+        if uses:
+            retain_image(path, uses)
+    _sync_sequences()
+    db.session.commit()
+
+    stats.users = options.users
+    stats.posts = post_id - first_post
+    stats.comments = comment_id - first_comment
+    return stats
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+
+from flask import Flask
+from gunicorn.app.base import BaseApplication
+
+from .metrics import mark_process_dead, reset_multiprocess_dir
+from .cache import create_backend
+from .jobs import resume_stale_jobs
+from .models import db
+from .recent import warm
+
+
+def worker_counts(app: Flask, workers: int | None = None, threads: int | None = None):
+    """Workers default to ``2 * CPUs + 1``; each runs a few threads for I/O-bound views."""
+    cpus = os.cpu_count() or 1
+    workers = workers or app.config.get("SERVER_WORKERS") or cpus * 2 + 1
+    threads = threads or app.config.get("SERVER_THREADS") or 4
+    return workers, threads
+
+
+def image_workers(app: Flask, workers: int) -> int:
+    """Encoder processes per web worker; by default the CPUs are shared between workers."""
+    cpus = os.cpu_count() or 1
+    return app.config.get("IMAGE_WORKERS") or max(cpus // workers, 1)
+
+
+def share_page_cache(app: Flask, workers: int) -> None:
+    """Give several workers one page cache, so a write invalidates it for all of them."""
+    page_cache = app.extensions.get("pulse_page_cache")
+    if page_cache is not None and workers > 1 and app.config["PAGE_CACHE_BACKEND"] == "auto":
+        page_cache.backend = create_backend(app, "sqlite")
+
+
+def _post_fork(server, worker) -> None:
+    """Give each worker its own DB connections and cache handles, and a loaded home feed."""
+    app = server.app.application
+    with app.app_context():
+        # close=False leaves the parent's sockets alone; the child just forgets them.
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    replicas = app.extensions.get("pulse_replicas")
+    if replicas is not None:
+        replicas.dispose(close=False)
+    page_cache = app.extensions.get("pulse_page_cache")
+    if page_cache is not None:
+        page_cache.backend.after_fork()
+    app.extensions["pulse_images"].max_workers = image_workers(app, server.cfg.workers)
+    warm(app)
+    resume_stale_jobs(app)
+
+
+def _worker_exit(server, worker) -> None:
+    server.app.application.extensions["pulse_images"].shutdown()
+
+
+def _on_starting(server) -> None:
+    reset_multiprocess_dir()
+
+
+def _child_exit(server, worker) -> None:
+    mark_process_dead(worker.pid)
+
+
+def server_options(
+    app: Flask,
+    bind: str,
+    workers: int | None = None,
+    threads: int | None = None,
+) -> dict:
+    workers, threads = worker_counts(app, workers, threads)
+    return {
+        "bind": bind,
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        # Import and build the app once in the master so workers fork with it in memory.
+        # Workers fork with the master's modules, so code changes need a restart (or
+        # `flask run --debug` in development).
+        "preload_app": True,
+        "keepalive": app.config.get("SERVER_KEEPALIVE", 5),
+        "timeout": app.config.get("SERVER_TIMEOUT", 60),
+        "graceful_timeout": app.config.get("SERVER_GRACEFUL_TIMEOUT", 30),
+        "max_requests": app.config.get("SERVER_MAX_REQUESTS", 1000),
+        "max_requests_jitter": app.config.get("SERVER_MAX_REQUESTS", 1000) // 10,
+        "accesslog": "-",
+        "forwarded_allow_ips": app.config.get("SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        "on_starting": _on_starting,
+        "post_fork": _post_fork,
+        "worker_exit": _worker_exit,
+        "child_exit": _child_exit,
+    }
+
+
+class PulseServer(BaseApplication):
+    """Gunicorn running an already created Flask app.
+
+    ``kill -HUP <master>`` replaces workers gracefully, letting in-flight requests finish
+    within ``graceful_timeout``.
+    """
+
+    def __init__(self, app: Flask, options: dict) -> None:
+        share_page_cache(app, options["workers"])
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> Flask:
+        return self.application
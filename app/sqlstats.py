@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_recorders: list[QueryStats] = []
+_recorders_lock = threading.Lock()
+_observers: list = []
+_observers_lock = threading.Lock()
+_START_KEY = "pulse_query_start"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _IN_LIST_RE.sub("IN (...)", shape)
+    return _NUMBER_RE.sub("?", shape)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    statements: list[tuple[str, object]] = field(default_factory=list)
+    keep_statements: bool = False
+
+    def record(self, statement: str, parameters, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+        if self.keep_statements:
+            self.statements.append((statement, parameters))
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f} ms"]
+        lines.extend(f"  {n}x {shape}" for shape, n in self.shapes.most_common())
+        return "\n".join(lines)
+
+
+class QueryRecorder:
+    """Collect every statement executed while the block is active, on any engine."""
+
+    def __init__(self, keep_statements: bool = False) -> None:
+        self.stats = QueryStats(keep_statements=keep_statements)
+
+    def __enter__(self) -> QueryStats:
+        observe_queries(_record_active_recorders)
+        with _recorders_lock:
+            _recorders.append(self.stats)
+        return self.stats
+
+    def __exit__(self, *exc_info) -> None:
+        with _recorders_lock:
+            _recorders.remove(self.stats)
+
+
+def observe_queries(observer) -> None:
+    """Call ``observer(statement, parameters, seconds)`` after each statement on any engine.
+
+    The engine timers are installed with the first observer, so nothing is timed unless
+    instrumentation, metrics or a recorder asked for it.
+    """
+    with _observers_lock:
+        if observer in _observers:
+            return
+        _observers.append(observer)
+        if not event.contains(Engine, "before_cursor_execute", _start_timer):
+            event.listen(Engine, "before_cursor_execute", _start_timer)
+            event.listen(Engine, "after_cursor_execute", _stop_timer)
+            event.listen(Engine, "handle_error", _discard_timer)
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _stop_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info[_START_KEY].pop()
+    for observer in tuple(_observers):
+        observer(statement, parameters, elapsed)
+
+
+def _discard_timer(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute; keep the stack paired.
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(_START_KEY):
+        connection.info[_START_KEY].pop()
+
+
+def _record_request_stats(statement: str, parameters, elapsed: float) -> None:
+    if has_request_context():
+        stats = g.get("sql_stats")
+        if stats is not None:
+            stats.record(statement, parameters, elapsed)
+
+
+def _record_active_recorders(statement: str, parameters, elapsed: float) -> None:
+    if _recorders:
+        with _recorders_lock:
+            active = list(_recorders)
+        for stats in active:
+            stats.record(statement, parameters, elapsed)
+
+
+def init_app(app: Flask) -> None:
+    if not app.config.get("SQL_INSTRUMENTATION"):
+        return
+    observe_queries(_record_request_stats)
+
+    @app.before_request
+    def _start_sql_stats() -> None:
+        g.sql_stats = QueryStats()
+
+    @app.after_request
+    def _report_sql_stats(response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+        if app.config.get("SQL_INSTRUMENTATION_HEADERS"):
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.2f}"
+        app.logger.info(
+            "sql %s %s queries=%d db_ms=%.2f",
+            request.method,
+            request.path,
+            stats.count,
+            stats.duration * 1000,
+        )
+        for shape, n in stats.repeated(app.config.get("SQL_NPLUSONE_THRESHOLD", 5)):
+            app.logger.warning("Possible N+1 on %s: %d x %s", request.path, n, shape)
+        return response
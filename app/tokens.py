@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import functools
+
+from flask import Request, current_app, jsonify, request
+from flask_login import current_user
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from .identity import load_user
+
+_SALT = "pulse-api-token"
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt=_SALT)
+
+
+def issue_token(user_id: int) -> str:
+    """Signed token for scripts; browsers use the session cookie plus CSRF instead."""
+    return _serializer().dumps({"uid": user_id})
+
+
+def token_user_id(token: str) -> int | None:
+    try:
+        payload = _serializer().loads(token, max_age=current_app.config["API_TOKEN_MAX_AGE"])
+    except BadSignature:
+        return None
+    return payload.get("uid") if isinstance(payload, dict) else None
+
+
+def bearer_token(req: Request) -> str | None:
+    scheme, _, token = req.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+def load_user_from_request(req: Request):
+    """Flask-Login request loader: used when the request carries no session user."""
+    token = bearer_token(req)
+    user_id = token_user_id(token) if token else None
+    return load_user(str(user_id)) if user_id is not None else None
+
+
+def api_login_required(view):
+    """Require a valid bearer token, or a session user plus a CSRF token.
+
+    Views using it are exempt from the global CSRF check (see ``create_app``) and check it
+    here instead, for cookie-authenticated requests only: browsers never attach an
+    ``Authorization`` header on their own, so a bearer request cannot be forged cross-site.
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = bearer_token(request)
+        if token is not None:
+            # A session cookie sent alongside must belong to the same user.
+            user_id = token_user_id(token)
+            if user_id is None or not current_user.is_authenticated:
+                return jsonify({"error": "Invalid token"}), 401
+            if current_user.id != user_id:
+                return jsonify({"error": "Invalid token"}), 401
+        elif not current_user.is_authenticated:
+            return jsonify({"error": "Authentication required"}), 401
+        elif current_app.config.get("WTF_CSRF_ENABLED", True):
+            current_app.extensions["csrf"].protect()
+        return view(*args, **kwargs)
+
+    return wrapper
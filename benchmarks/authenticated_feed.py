@@ -0,0 +1,62 @@
+"""Queries and latency of authenticated feed requests with and without the user cache.
+
+    python benchmarks/authenticated_feed.py [--requests 500] [--path /]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import create_app, db  # noqa: E402
+from app.models import Post, User  # noqa: E402
+from app.sqlstats import QueryRecorder  # noqa: E402
+from config import TestConfig  # noqa: E402
+
+
+def run(user_cache_ttl: int, requests: int, path: str) -> tuple[float, float]:
+    config = type("BenchConfig", (TestConfig,), {"USER_CACHE_TTL": user_cache_ttl})
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench", password="hash")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all(
+            Post(title=f"Post {n}", content="content goes here", user_id=user.id) for n in range(20)
+        )
+        db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+    client.get(path)
+
+    with QueryRecorder() as stats:
+        started = time.perf_counter()
+        for _ in range(requests):
+            client.get(path)
+        elapsed = time.perf_counter() - started
+    return stats.count / requests, elapsed / requests * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--path", default="/")
+    args = parser.parse_args()
+
+    print(f"{args.requests} x GET {args.path} as a logged-in user")
+    print(f"{'':14} {'queries/req':>12} {'ms/req':>8}")
+    for name, ttl in (("no user cache", 0), ("user cache", 60)):
+        queries, ms = run(ttl, args.requests, args.path)
+        print(f"{name:14} {queries:12.2f} {ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Per-row cost of loading feed posts through the ORM versus the read model.
+
+Both sides read the same rows and touch what the feed templates use: author name and
+avatar URLs, title, date and image URLs.
+
+    python benchmarks/feed_hydration.py [--rows 6,20,100,1000] [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app import create_app, db, readmodel  # noqa: E402
+from app.models import Post, User  # noqa: E402
+from config import TestConfig  # noqa: E402
+
+
+def _image(name: str, widths: tuple[int, ...], ext: str = "jpg") -> tuple[str, list[dict]]:
+    variants = [
+        {"path": f"uploads/posts/{name}_{width}.{ext}", "width": width, "type": "image/jpeg"}
+        for width in widths
+    ] + [
+        {"path": f"uploads/posts/{name}_{width}.webp", "width": width, "type": "image/webp"}
+        for width in widths
+    ]
+    return f"uploads/posts/{name}.{ext}", variants
+
+
+def seed(rows: int) -> None:
+    users = [
+        User(
+            username=f"user{n}",
+            password="hash",
+            profile_image=f"uploads/profiles/{n:064x}.png",
+            profile_image_variants=[
+                {"path": f"uploads/profiles/{n:064x}_64.png", "width": 64, "type": "image/png"}
+            ],
+        )
+        for n in range(50)
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+    posts = []
+    for n in range(rows):
+        image, variants = _image(f"{n:064x}", (320, 640, 1280)) if n % 2 else (None, None)
+        posts.append(
+            Post(
+                title=f"Post {n}",
+                content="Текст поста. " * 40,
+                user_id=users[n % len(users)].id,
+                image=image,
+                image_variants=variants,
+            )
+        )
+    db.session.add_all(posts)
+    db.session.commit()
+
+
+def render(posts) -> list:
+    out = []
+    for post in posts:
+        out += [
+            post.user.profile_image_url(64),
+            post.user.profile_image_srcset(),
+            post.user.username,
+            post.title,
+            post.content[:220],
+            post.date_posted.strftime("%d.%m.%Y %H:%M"),
+        ]
+        if post.image:
+            out += [post.image_url(640), post.image_srcset(), post.image_srcset("image/webp")]
+    return out
+
+
+def orm_feed(limit: int) -> None:
+    posts = (
+        Post.query.options(joinedload(Post.user))
+        .order_by(Post.date_posted.desc(), Post.id.desc())
+        .limit(limit)
+        .all()
+    )
+    render(posts)
+    # Requests end with a fresh session; do not let the identity map carry over.
+    db.session.remove()
+
+
+def readmodel_feed(limit: int) -> None:
+    render(readmodel.recent_posts(limit))
+    db.session.remove()
+
+
+def measure(func, limit: int, repeat: int) -> float:
+    func(limit)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(limit)
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="6,20,100,1000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.rows.split(",")]
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seed(max(sizes))
+    with app.test_request_context("/"):
+        print(f"{'rows':>6} {'orm ms':>9} {'read ms':>9} {'orm us/row':>11} {'read us/row':>12}")
+        for size in sizes:
+            repeat = max(args.repeat * 6 // size, 5)
+            orm = measure(orm_feed, size, repeat)
+            read = measure(readmodel_feed, size, repeat)
+            print(
+                f"{size:6} {orm * 1000:9.3f} {read * 1000:9.3f} "
+                f"{orm / size * 1e6:11.1f} {read / size * 1e6:12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Route latency and query counts on seeded datasets of several sizes.
+
+    python benchmarks/routes.py [--sizes 1k,100k,1m] [--requests 100] [--output run.json]
+    python benchmarks/routes.py --sizes 1k,100k --compare baseline.json
+    python benchmarks/routes.py --current run.json --compare baseline.json
+
+Each size is seeded once with ``app.seed`` into ``--data-dir`` and reused by later runs
+with the same seed. Every scenario is driven through the Flask test client; the
+anonymous page cache is off so the views themselves are measured. Results (p50/p95/p99
+latency in ms and queries per request) are written as JSON. ``--compare`` prints the
+change against a saved run and exits with status 1 when a scenario's p95 grew by more
+than ``--threshold`` percent (and ``--min-delta`` ms) or it started running more queries.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import sqlalchemy
+from sqlalchemy import func, insert, select, update
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import create_app, db  # noqa: E402
+from app.models import Comment, Post, User  # noqa: E402
+from app.pagination import encode_cursor  # noqa: E402
+from app.seed import SeedOptions, seed  # noqa: E402
+from app.sqlstats import QueryRecorder  # noqa: E402
+from config import TestConfig  # noqa: E402
+
+SIZES = {"k": 1_000, "m": 1_000_000}
+SEARCH_TERM = "кофе"
+
+
+def parse_size(label: str) -> int:
+    label = label.strip().lower()
+    if label[-1:] in SIZES:
+        return int(float(label[:-1]) * SIZES[label[-1]])
+    return int(label)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def make_app(database: Path):
+    config = type(
+        "BenchConfig",
+        (TestConfig,),
+        {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{database}", "PAGE_CACHE_BACKEND": "none"},
+    )
+    return create_app(config)
+
+
+def prepare(app, posts: int, hot_comments: int, random_seed: int) -> None:
+    """Seed about ``posts`` posts plus one post carrying ``hot_comments`` comments."""
+    with app.app_context():
+        db.create_all()
+        if db.session.scalar(select(func.count()).select_from(User)):
+            return
+        seed(SeedOptions(users=max(posts // 10, 1), posts_per_user=10, seed=random_seed))
+        hot = db.session.scalar(select(Post).order_by(Post.id).limit(1))
+        user_ids = db.session.scalars(select(User.id).limit(hot_comments)).all()
+        db.session.execute(
+            insert(Comment.__table__),
+            [
+                {
+                    "content": f"Комментарий {n}",
+                    "date_created": hot.date_posted,
+                    "post_id": hot.id,
+                    "user_id": user_ids[n % len(user_ids)],
+                }
+                for n in range(hot_comments)
+            ],
+        )
+        db.session.execute(
+            update(Post.__table__)
+            .where(Post.__table__.c.id == hot.id)
+            .values(comment_count=Post.__table__.c.comment_count + hot_comments)
+        )
+        db.session.commit()
+
+
+def scenarios(app) -> tuple[list[tuple[str, str, bool]], int, dict]:
+    """(name, path, logged_in) per route, built from the dataset's shape."""
+    with app.app_context():
+        total = db.session.scalar(select(func.count()).select_from(Post))
+        deep = int(total * 0.9)
+        ordered = select(Post).order_by(Post.date_posted.desc(), Post.id.desc())
+        deep_post = db.session.scalar(ordered.offset(max(deep - 1, 0)).limit(1))
+        deep_cursor = encode_cursor("n", deep_post)
+        hot_post = db.session.scalar(select(Post.id).order_by(Post.comment_count.desc()).limit(1))
+        author = db.session.scalar(select(User.id).order_by(User.post_count.desc()).limit(1))
+        comments = db.session.scalar(select(func.count()).select_from(Comment))
+
+    routes = [
+        ("home", "/", False),
+        ("all_posts", "/all_posts", False),
+        ("all_posts_deep_offset", f"/all_posts?page={deep // 6 + 1}", False),
+        ("all_posts_deep_cursor", f"/all_posts?cursor={deep_cursor}", False),
+        ("all_posts_search", f"/all_posts?search={SEARCH_TERM}", False),
+        ("all_posts_search_deep", f"/all_posts?search={SEARCH_TERM}&page=20", False),
+        ("view_post_hot", f"/post/{hot_post}", False),
+        ("profile", "/profile", True),
+        ("api_posts", "/api/posts?cursor=&limit=20", False),
+        ("api_posts_deep_offset", f"/api/posts?page={deep // 20 + 1}&limit=20", False),
+        ("api_posts_deep_cursor", f"/api/posts?cursor={deep_cursor}&limit=20", False),
+    ]
+    return routes, author, {"posts": total, "comments": comments}
+
+
+def measure(client, path: str, requests: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        client.get(path)
+    timings, queries, status = [], 0, None
+    for _ in range(requests):
+        with QueryRecorder() as stats:
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries += stats.count
+        status = response.status_code
+    return {
+        "status": status,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "queries": round(queries / requests, 2),
+    }
+
+
+def run_size(label: str, args) -> dict:
+    posts = parse_size(label)
+    database = Path(args.data_dir) / f"posts-{label}-seed{args.seed}.db"
+    database.parent.mkdir(parents=True, exist_ok=True)
+    app = make_app(database.resolve())
+    started = time.perf_counter()
+    prepare(app, posts, args.hot_comments, args.seed)
+    print(f"[{label}] dataset ready in {time.perf_counter() - started:.1f}s ({database})")
+
+    routes, author, dataset = scenarios(app)
+    results = {}
+    for name, path, logged_in in routes:
+        client = app.test_client()
+        if logged_in:
+            with client.session_transaction() as sess:
+                sess["_user_id"] = str(author)
+        results[name] = {"path": path, **measure(client, path, args.requests, args.warmup)}
+        row = results[name]
+        print(
+            f"[{label}] {name:24} p50 {row['p50_ms']:8.2f}  p95 {row['p95_ms']:8.2f}  "
+            f"p99 {row['p99_ms']:8.2f} ms  {row['queries']:5.1f} q  ({row['status']})"
+        )
+    return {"dataset": dataset, "scenarios": results}
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta: float) -> list[str]:
+    """Print per-scenario changes; return the regressions.
+
+    A p95 change counts once it exceeds both ``threshold`` percent and ``min_delta`` ms, so
+    sub-millisecond jitter on fast routes is not reported.
+    """
+    regressions = []
+    print(f"{'':34} {'p50 ms':>18} {'p95 ms':>18} {'queries':>12}")
+    for size, run in current["sizes"].items():
+        before_size = baseline.get("sizes", {}).get(size)
+        if before_size is None:
+            continue
+        for name, after in run["scenarios"].items():
+            before = before_size["scenarios"].get(name)
+            if before is None:
+                continue
+            change = (after["p95_ms"] - before["p95_ms"]) / max(before["p95_ms"], 1e-9) * 100
+            flag = ""
+            slower = change > threshold and after["p95_ms"] - before["p95_ms"] > min_delta
+            if slower or after["queries"] > before["queries"]:
+                flag = "  REGRESSION"
+                regressions.append(f"{size}/{name}")
+            print(
+                f"{size + '/' + name:34} {before['p50_ms']:8.2f} -> {after['p50_ms']:7.2f} "
+                f"{before['p95_ms']:8.2f} -> {after['p95_ms']:7.2f} "
+                f"{before['queries']:4.1f} -> {after['queries']:4.1f} ({change:+.0f}% p95){flag}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", default="1k,100k,1m", help="Post counts, e.g. 1k,100k,1m.")
+    parser.add_argument("--requests", type=int, default=100, help="Timed requests per route.")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--hot-comments", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=str(Path(__file__).parent / ".data"))
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Saved run to compare against.")
+    parser.add_argument("--current", help="Compare this saved run instead of running.")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 change, %%.")
+    parser.add_argument("--min-delta", type=float, default=1.0, help="Ignored p95 change, ms.")
+    args = parser.parse_args()
+
+    if args.current:
+        current = json.loads(Path(args.current).read_text())
+    else:
+        current = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "git": _git_revision(),
+                "python": platform.python_version(),
+                "sqlalchemy": sqlalchemy.__version__,
+                "platform": platform.platform(),
+                "requests": args.requests,
+                "seed": args.seed,
+            },
+            "sizes": {label: run_size(label, args) for label in args.sizes.split(",")},
+        }
+        if args.output:
+            Path(args.output).write_text(json.dumps(current, indent=2, ensure_ascii=False))
+            print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(
+            json.loads(Path(args.compare).read_text()), current, args.threshold, args.min_delta
+        )
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
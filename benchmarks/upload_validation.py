@@ -0,0 +1,85 @@
+"""CPU time per upload for the legacy validate-twice path versus the single-pass path.
+
+    python benchmarks/upload_validation.py [--rounds 20] [--size 2400x1600] [--format PNG]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import create_app  # noqa: E402
+from app.images import encode_image, verify_image_upload  # noqa: E402
+from config import TestConfig  # noqa: E402
+
+
+def make_upload(payload: bytes, image_format: str) -> FileStorage:
+    mimetype = f"image/{image_format.lower()}"
+    return FileStorage(BytesIO(payload), filename="bench", content_type=mimetype)
+
+
+def legacy_validate(upload: FileStorage) -> str:
+    # forms.validate_image_file, then the route's own verify() on the same stream.
+    for _ in range(2):
+        upload.stream.seek(0)
+        image = Image.open(upload.stream)
+        image.verify()
+        image_format = image.format
+    upload.stream.seek(0)
+    return image_format
+
+
+def single_pass_validate(upload: FileStorage) -> str:
+    # The form validator and save_image both call verify_image_upload; the second is cached.
+    verify_image_upload(upload)
+    return verify_image_upload(upload).format
+
+
+def measure(validate, payloads: list[bytes], image_format: str, target_dir: str | None) -> float:
+    started = time.process_time()
+    for payload in payloads:
+        upload = make_upload(payload, image_format)
+        detected = validate(upload)
+        if target_dir is not None:
+            encode_image(upload.stream, target_dir, detected)
+    return (time.process_time() - started) / len(payloads) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--size", default="2400x1600")
+    parser.add_argument("--format", default="PNG", choices=["PNG", "JPEG", "WEBP"])
+    args = parser.parse_args()
+    width, height = (int(part) for part in args.size.split("x"))
+
+    payloads = []
+    for n in range(args.rounds):
+        buf = BytesIO()
+        # Distinct pixels per round so content-addressed storage cannot skip the write.
+        Image.effect_noise((width, height), 40 + n).convert("RGB").save(buf, format=args.format)
+        payloads.append(buf.getvalue())
+
+    app = create_app(TestConfig)
+    with app.app_context(), tempfile.TemporaryDirectory() as target_dir:
+        print(f"{args.rounds} x {args.size} {args.format}, ms CPU per upload")
+        print(f"{'':12} {'validate':>10} {'total':>10}")
+        for name, validate in (("legacy", legacy_validate), ("single-pass", single_pass_validate)):
+            validate_ms = measure(validate, payloads, args.format, None)
+            total_ms = measure(validate, payloads, args.format, target_dir)
+            print(f"{name:12} {validate_ms:10.2f} {total_ms:10.2f}")
+            for path in Path(target_dir).iterdir():
+                path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,29 @@ BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env")
 
 
+def _engine_options(prefix: str) -> dict:
+    options = {"pool_pre_ping": os.environ.get(f"{prefix}_POOL_PRE_PING", "true").lower() == "true"}
+    for name in ("POOL_SIZE", "MAX_OVERFLOW", "POOL_RECYCLE"):
+        value = os.environ.get(f"{prefix}_{name}")
+        if value:
+            options[name.lower()] = int(value)
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", f"sqlite:///{BASE_DIR/'social.db'}")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options("DB")
+    # Comma-separated read replicas; GETs of the feed/post/API views read from them
+    DATABASE_REPLICA_URLS = [
+        url.strip() for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    DATABASE_REPLICA_ENGINE_OPTIONS = _engine_options("DB_REPLICA")
+    # After a write the user's reads stay on the primary this long, past the replica lag
+    DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get("DATABASE_REPLICA_PIN_SECONDS", 5))
+    # app.asgi; derived from SQLALCHEMY_DATABASE_URI (aiosqlite / asyncpg) when unset
+    ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL")
 
     UPLOAD_ROOT = BASE_DIR / "static" / "uploads"
     UPLOAD_FOLDER = UPLOAD_ROOT
@@ -21,6 +40,92 @@ class Config:
 
     MAX_CONTENT_LENGTH = int(os.environ.get("MAX_CONTENT_LENGTH", 5 * 1024 * 1024))
     ALLOWED_IMAGE_FORMATS = {"PNG", "JPEG", "WEBP", "GIF"}
+    # Checked against the image header before any pixels are decoded
+    MAX_IMAGE_WIDTH = int(os.environ.get("MAX_IMAGE_WIDTH", 8000))
+    MAX_IMAGE_HEIGHT = int(os.environ.get("MAX_IMAGE_HEIGHT", 8000))
+    MAX_IMAGE_PIXELS = int(os.environ.get("MAX_IMAGE_PIXELS", 40_000_000))
+    # process: re-encode uploads in a worker pool off the request path | sync: inline
+    IMAGE_PIPELINE = os.environ.get("IMAGE_PIPELINE", "process")
+    # Encoder processes per app process; default CPUs // 2, or CPUs // workers under serve
+    IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", 0)) or None
+    # Pending jobs untouched this long are requeued when a worker starts (theirs died)
+    IMAGE_JOB_STALE_AFTER = int(os.environ.get("IMAGE_JOB_STALE_AFTER", 600))
+    # Downscaled copies written next to each upload and offered to browsers via srcset
+    IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+    AVATAR_VARIANT_SIZES = (64, 128)
+    IMAGE_VARIANT_WEBP = os.environ.get("IMAGE_VARIANT_WEBP", "true").lower() == "true"
+    # flask: send uploads from /media | accel: X-Accel-Redirect to nginx | nginx: proxy serves
+    # /media itself (see docker/nginx.conf)
+    MEDIA_SERVING = os.environ.get("MEDIA_SERVING", "flask")
+    MEDIA_ACCEL_PREFIX = "/_uploads/"
+    MEDIA_MAX_AGE = int(os.environ.get("MEDIA_MAX_AGE", 3600))
+
+    # gzip/brotli for text responses; static assets via manage.py precompress-static
+    COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4))
+    COMPRESSION_MIMETYPES = {
+        "text/html",
+        "text/css",
+        "text/plain",
+        "text/javascript",
+        "application/javascript",
+        "application/json",
+        "application/x-ndjson",
+        "image/svg+xml",
+    }
+
+    # manage.py serve; workers default to 2 * CPUs + 1, threads per worker to 4
+    SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", 0)) or None
+    SERVER_THREADS = int(os.environ.get("SERVER_THREADS", 0)) or None
+    SERVER_KEEPALIVE = int(os.environ.get("SERVER_KEEPALIVE", 5))
+    SERVER_TIMEOUT = int(os.environ.get("SERVER_TIMEOUT", 60))
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30))
+    SERVER_MAX_REQUESTS = int(os.environ.get("SERVER_MAX_REQUESTS", 1000))
+    # Proxies whose X-Forwarded-Proto/-For are trusted; "*" only when nothing else can connect
+    SERVER_FORWARDED_ALLOW_IPS = os.environ.get("SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+    # Prometheus /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate across worker processes
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+
+    # auto | fts5 | postgres | like
+    SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "auto")
+    SQL_INSTRUMENTATION = os.environ.get("SQL_INSTRUMENTATION", "false").lower() == "true"
+    SQL_INSTRUMENTATION_HEADERS = True
+    SQL_NPLUSONE_THRESHOLD = int(os.environ.get("SQL_NPLUSONE_THRESHOLD", 5))
+
+    # Anonymous feed page cache: memory | sqlite (file shared by workers) | none | auto.
+    # memory only invalidates the process that saw the write, so it is for single-process
+    # servers; auto is memory, or sqlite under a multi-worker manage.py serve.
+    PAGE_CACHE_BACKEND = os.environ.get("PAGE_CACHE_BACKEND", "auto")
+    PAGE_CACHE_PATH = os.environ.get("PAGE_CACHE_PATH", str(BASE_DIR / "page_cache.db"))
+    PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", 60))
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", 512))
+
+    # Logged-in user identity cache (per process); 0 loads the user row on every request
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 60))
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", 1024))
+
+    # Bearer tokens from POST /api/token; batch endpoints cap their input size
+    API_TOKEN_MAX_AGE = int(os.environ.get("API_TOKEN_MAX_AGE", 30 * 24 * 3600))
+    API_MAX_IDS = 100
+    API_BATCH_MAX_POSTS = int(os.environ.get("API_BATCH_MAX_POSTS", 50))
+
+    # Comma-separated user ids allowed to use /admin endpoints (data export). Ids rather than
+    # usernames: registration is open, so anyone could claim a listed name not yet taken.
+    ADMIN_USER_IDS = {
+        int(user_id)
+        for user_id in os.environ.get("ADMIN_USER_IDS", "").split(",")
+        if user_id.strip()
+    }
+
+    POST_COUNT_CACHE_TTL = int(os.environ.get("POST_COUNT_CACHE_TTL", 30))
+
+    # Newest posts kept in memory per process for the home page; the TTL bounds how long
+    # writes from other workers take to show up. 0 queries the database on every request.
+    RECENT_POSTS_SIZE = int(os.environ.get("RECENT_POSTS_SIZE", 20))
+    RECENT_POSTS_TTL = int(os.environ.get("RECENT_POSTS_TTL", 5))
 
 
 class TestConfig(Config):
@@ -31,3 +136,5 @@ class TestConfig(Config):
     PROFILE_UPLOAD_FOLDER = UPLOAD_ROOT / "profiles"
     POST_UPLOAD_FOLDER = UPLOAD_ROOT / "posts"
     SQLALCHEMY_DATABASE_URI = "sqlite://"
+    PAGE_CACHE_BACKEND = "memory"
+    IMAGE_PIPELINE = "sync"
@@ -1,23 +1,180 @@
 from __future__ import annotations
 
 import os
+import time
+from pathlib import Path
 
-from app import create_app, db
+import click
+
+from app import create_app
+from app.compression import precompress_directory
+from app.counters import recount_all
+from app.export import EXPORTS, export_stream
+from app.images import backfill_variants
+from app.jobs import get_pipeline
+from app.models import DEFAULT_PROFILE_IMAGE, ImageJob, Post, User, db
+from app.schema import upgrade_schema
+from app.search import rebuild_search_index
+from app.seed import DISTRIBUTIONS, SeedOptions, seed as seed_database
 
 app = create_app()
 
 
 @app.cli.command("init-db")
 def init_db() -> None:
-    """Create database tables."""
+    """Create database tables and any indexes missing from existing tables."""
     with app.app_context():
-        db.create_all()
+        created = upgrade_schema()
         print("Database initialized")
+        for name in created:
+            print(f"  created {name}")
+
+
+@app.cli.command("search-reindex")
+def search_reindex() -> None:
+    """Create the full-text search index if missing and rebuild it from posts."""
+    with app.app_context():
+        backend = rebuild_search_index()
+        print(f"Search index rebuilt ({backend.name})")
+
+
+@app.cli.command("recount")
+def recount() -> None:
+    """Recompute denormalized post and comment counters."""
+    with app.app_context():
+        recount_all()
+        print("Counters recomputed")
+
+
+@app.cli.command("image-jobs")
+@click.option("--resume", is_flag=True, help="Re-queue pending jobs and wait for them.")
+def image_jobs(resume: bool) -> None:
+    """Show background image job counts by status."""
+    with app.app_context():
+        if resume:
+            pipeline = get_pipeline()
+            queued = pipeline.resubmit_pending()
+            pipeline.drain()
+            pipeline.shutdown()
+            print(f"Processed {queued} pending jobs")
+        counts = db.session.query(ImageJob.status, db.func.count()).group_by(ImageJob.status)
+        for status, count in counts:
+            print(f"{status}: {count}")
+
+
+@app.cli.command("backfill-variants")
+def backfill_variants_command() -> None:
+    """Generate responsive image variants for uploads stored before they existed."""
+    with app.app_context():
+        targets = [
+            (
+                Post.query.filter(Post.image.isnot(None), Post.image_variants.is_(None)),
+                "image",
+                "POST_UPLOAD_FOLDER",
+            ),
+            (
+                User.query.filter(
+                    User.profile_image.isnot(None),
+                    User.profile_image != DEFAULT_PROFILE_IMAGE,
+                    User.profile_image_variants.is_(None),
+                ),
+                "profile_image",
+                "PROFILE_UPLOAD_FOLDER",
+            ),
+        ]
+        done = failed = 0
+        for query, attribute, folder_key in targets:
+            for target in query:
+                try:
+                    variants = backfill_variants(getattr(target, attribute), folder_key)
+                except OSError as exc:
+                    failed += 1
+                    print(f"  skipped {getattr(target, attribute)}: {exc}")
+                    continue
+                setattr(target, f"{attribute}_variants", variants)
+                done += 1
+            db.session.commit()
+        print(f"Generated variants for {done} images ({failed} skipped)")
+
+
+@app.cli.command("export")
+@click.argument("kind", type=click.Choice(sorted(EXPORTS)))
+@click.option("--after-id", default=0, show_default=True, help="Resume after this id.")
+@click.option("--output", "-o", type=click.File("wb"), default="-", help="File (default stdout).")
+@click.option("--gzip", "compress", is_flag=True, help="Gzip the output.")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows fetched per round trip.")
+def export(kind: str, after_id: int, output, compress: bool, batch_size: int) -> None:
+    """Dump posts or comments as NDJSON in id order, in constant memory."""
+    with app.app_context():
+        for chunk in export_stream(kind, after_id, compress, batch_size):
+            output.write(chunk)
+
+
+@app.cli.command("seed")
+@click.option("--users", default=1000, show_default=True)
+@click.option("--posts-per-user", default=10.0, show_default=True, help="Mean posts per user.")
+@click.option("--comments-per-post", default=3.0, show_default=True, help="Mean per post.")
+@click.option(
+    "--distribution", type=click.Choice(DISTRIBUTIONS), default="exponential", show_default=True
+)
+@click.option("--images", "image_fraction", default=0.0, help="Fraction of posts with an image.")
+@click.option("--seed", "random_seed", default=0, show_default=True, help="Random seed.")
+@click.option("--chunk-size", default=10_000, show_default=True, help="Rows per transaction.")
+def seed(
+    users: int,
+    posts_per_user: float,
+    comments_per_post: float,
+    distribution: str,
+    image_fraction: float,
+    random_seed: int,
+    chunk_size: int,
+) -> None:
+    """Bulk-insert synthetic users, posts and comments (password: "password")."""
+    options = SeedOptions(
+        users=users,
+        posts_per_user=posts_per_user,
+        comments_per_post=comments_per_post,
+        distribution=distribution,
+        image_fraction=image_fraction,
+        seed=random_seed,
+        chunk_size=chunk_size,
+    )
+    with app.app_context():
+        started = time.perf_counter()
+        stats = seed_database(options)
+        elapsed = time.perf_counter() - started
+        print(
+            f"Inserted {stats.users} users, {stats.posts} posts, {stats.comments} comments "
+            f"({stats.images} images) in {elapsed:.1f}s, {stats.rows / elapsed:,.0f} rows/s"
+        )
+
+
+@app.cli.command("precompress-static")
+def precompress_static() -> None:
+    """Write .br/.gz copies of static text assets, served in place of the originals."""
+    # Uploads are user content served from /media, not build assets.
+    written = precompress_directory(app.static_folder, exclude=(app.config["UPLOAD_ROOT"],))
+    for path in written:
+        print(f"  {Path(path).relative_to(app.static_folder)}")
+    print(f"Precompressed {len(written)} files")
+
+
+@app.cli.command("serve")
+@click.option("--host", default="0.0.0.0", show_default=True)
+@click.option("--port", default=lambda: int(os.getenv("PORT", "8000")), type=int)
+@click.option("--workers", type=int, help="Worker processes (default: 2 x CPUs + 1).")
+@click.option("--threads", type=int, help="Threads per worker (default: 4).")
+def serve(host: str, port: int, workers: int | None, threads: int | None) -> None:
+    """Run the app under a pre-forking gunicorn server."""
+    from app.server import PulseServer, server_options
+
+    options = server_options(app, f"{host}:{port}", workers, threads)
+    PulseServer(app, options).run()
 
 
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
     port = int(os.getenv("PORT", "8000"))
     debug = os.getenv("FLASK_DEBUG", "false").lower() == "true"
     app.run(host="0.0.0.0", debug=debug, port=port)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import shutil
+from contextlib import contextmanager
+from io import BytesIO
 from pathlib import Path
 
 import pytest
+from PIL import Image
 
 from app import create_app, db
+from app.models import Comment, Post, User
+from app.sqlstats import QueryRecorder
 from config import Config, TestConfig
 
 
@@ -24,14 +29,36 @@ def _cleanup_uploads(root: Path | str) -> None:
 
 
 @pytest.fixture()
-def app():
-    app = create_app(TestConfig)
-    with app.app_context():
-        db.create_all()
-    yield app
-    with app.app_context():
-        db.drop_all()
-    _cleanup_uploads(app.config["UPLOAD_ROOT"])
+def clean_uploads():
+    """``clean_uploads(app)`` removes the app's upload folders when the test ends."""
+    roots = []
+    yield lambda app: roots.append(app.config["UPLOAD_ROOT"])
+    for root in roots:
+        _cleanup_uploads(root)
+
+
+@pytest.fixture()
+def make_app(clean_uploads):
+    """``make_app(config_class)`` builds an app with its tables, dropped after the test."""
+    apps = []
+
+    def build(config_class: type[Config]):
+        app = create_app(config_class)
+        with app.app_context():
+            db.create_all()
+        apps.append(app)
+        clean_uploads(app)
+        return app
+
+    yield build
+    for app in apps:
+        with app.app_context():
+            db.drop_all()
+
+
+@pytest.fixture()
+def app(make_app):
+    return make_app(TestConfig)
 
 
 @pytest.fixture()
@@ -40,16 +67,85 @@ def client(app):
 
 
 @pytest.fixture()
-def csrf_app():
-    app = create_app(CSRFEnabledConfig)
-    with app.app_context():
-        db.create_all()
-    yield app
-    with app.app_context():
-        db.drop_all()
-    _cleanup_uploads(app.config["UPLOAD_ROOT"])
+def csrf_app(make_app):
+    return make_app(CSRFEnabledConfig)
 
 
 @pytest.fixture()
 def csrf_client(csrf_app):
     return csrf_app.test_client()
+
+
+@pytest.fixture()
+def query_budget():
+    """``with query_budget(n): client.get(...)`` fails the test if more than n queries run."""
+
+    @contextmanager
+    def budget(max_queries: int):
+        with QueryRecorder() as stats:
+            yield stats
+        if stats.count > max_queries:
+            pytest.fail(f"Query budget {max_queries} exceeded: {stats.report()}", pytrace=False)
+
+    return budget
+
+
+@pytest.fixture()
+def login_session():
+    """``login_session(client, user_id)`` logs the client in without going through /login."""
+
+    def login(client, user_id: int) -> None:
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(user_id)
+            sess["_fresh"] = True
+
+    return login
+
+
+@pytest.fixture()
+def make_user():
+    """``make_user(app, username)`` adds a user and returns its id."""
+
+    def add(app, username: str = "alice") -> int:
+        with app.app_context():
+            user = User(username=username, password="hash")
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+
+    return add
+
+
+@pytest.fixture()
+def make_image():
+    """``make_image(size, fmt, color)`` returns an encoded image ready to upload."""
+
+    def image(size: tuple[int, int] = (32, 32), fmt: str = "PNG", color=(255, 0, 0)) -> BytesIO:
+        buf = BytesIO()
+        Image.new("RGB", size, color).save(buf, format=fmt)
+        buf.seek(0)
+        return buf
+
+    return image
+
+
+@pytest.fixture()
+def seed():
+    """``seed(app, *posts, comments=n)`` adds user ``writer`` with ``(title, content)`` posts
+    (one by default) and ``n`` comments on the first; returns the user id and post ids."""
+
+    def add(app, *posts: tuple[str, str], comments: int = 0) -> tuple[int, list[int]]:
+        with app.app_context():
+            user = User(username="writer", password="hash")
+            rows = [
+                Post(title=title, content=content, user=user)
+                for title, content in posts or [("Post", "content body")]
+            ]
+            db.session.add_all([user, *rows])
+            db.session.add_all(
+                Comment(content=f"Comment {n}", post=rows[0], user=user) for n in range(comments)
+            )
+            db.session.commit()
+            return user.id, [post.id for post in rows]
+
+    return add
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from app import db
+from app.models import Post, User
+
+
+def _make_posts(app, user_id: int, count: int) -> list[int]:
+    with app.app_context():
+        posts = [
+            Post(title=f"Post {n}", content="content body", user_id=user_id) for n in range(count)
+        ]
+        db.session.add_all(posts)
+        db.session.commit()
+        return [post.id for post in posts]
+
+
+@pytest.fixture()
+def issue_token(login_session):
+    def issue(client, user_id: int) -> str:
+        login_session(client, user_id)
+        token = client.post("/api/token").get_json()["token"]
+        with client.session_transaction() as sess:
+            sess.clear()
+        return token
+
+    return issue
+
+
+def test_posts_by_ids_in_request_order_with_missing(app, client, query_budget, make_user):
+    user_id = make_user(app)
+    first, second, third = _make_posts(app, user_id, 3)
+
+    with query_budget(1):
+        resp = client.get(f"/api/posts?ids={third},999,{first},{third}")
+
+    assert resp.status_code == 200
+    items = resp.get_json()["items"]
+    assert [item["id"] for item in items] == [third, 999, first, third]
+    assert items[1] == {"id": 999, "error": "not_found"}
+    assert items[0]["title"] == "Post 2"
+
+    cached = client.get(
+        f"/api/posts?ids={third},999,{first},{third}",
+        headers={"If-None-Match": resp.headers["ETag"]},
+    )
+    assert cached.status_code == 304
+
+
+def test_posts_by_ids_rejects_bad_input(app, client):
+    assert client.get("/api/posts?ids=1,x").status_code == 400
+    assert client.get("/api/posts?ids=").status_code == 400
+    assert client.get(f"/api/posts?ids=1,{2**63}").status_code == 400
+    assert client.get("/api/posts?ids=0,-1").status_code == 400
+    too_many = ",".join(str(n) for n in range(app.config["API_MAX_IDS"] + 1))
+    assert client.get(f"/api/posts?ids={too_many}").status_code == 400
+
+
+def test_batch_create_with_bearer_token(app, client, issue_token, make_user):
+    user_id = make_user(app)
+    token = issue_token(client, user_id)
+
+    resp = client.post(
+        "/api/posts/batch",
+        json={"posts": [{"title": f"Batch {n}", "content": "long enough body"} for n in range(3)]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert resp.status_code == 201
+    data = resp.get_json()
+    assert data["created"] == 3
+    assert [result["status"] for result in data["results"]] == ["created"] * 3
+    with app.app_context():
+        assert Post.query.count() == 3
+        assert db.session.get(User, user_id).post_count == 3
+
+
+def test_batch_is_all_or_nothing(app, client, login_session, make_user):
+    user_id = make_user(app)
+    login_session(client, user_id)
+
+    resp = client.post(
+        "/api/posts/batch",
+        json=[
+            {"title": "Fine", "content": "long enough body"},
+            {"title": "", "content": "short"},
+            "not an object",
+        ],
+    )
+
+    assert resp.status_code == 400
+    results = resp.get_json()["results"]
+    assert results[0]["status"] == "valid"
+    assert set(results[1]["errors"]) == {"title", "content"}
+    assert results[2]["status"] == "invalid"
+    with app.app_context():
+        assert Post.query.count() == 0
+
+
+def test_batch_limits_size(app, client, login_session, make_user):
+    login_session(client, make_user(app))
+    items = [{"title": "T", "content": "long enough body"}] * (
+        app.config["API_BATCH_MAX_POSTS"] + 1
+    )
+    assert client.post("/api/posts/batch", json=items).status_code == 413
+
+
+def test_batch_requires_authentication(app, client):
+    resp = client.post("/api/posts/batch", json=[{"title": "T", "content": "long enough"}])
+    assert resp.status_code == 401
+    resp = client.post(
+        "/api/posts/batch",
+        json=[{"title": "T", "content": "long enough"}],
+        headers={"Authorization": "Bearer forged"},
+    )
+    assert resp.status_code == 401
+
+
+def test_batch_token_must_match_session_user(app, client, login_session, issue_token, make_user):
+    alice = make_user(app, "alice")
+    bob = make_user(app, "bobby")
+    token = issue_token(client, alice)
+    login_session(client, bob)
+
+    resp = client.post(
+        "/api/posts/batch",
+        json=[{"title": "T", "content": "long enough"}],
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert resp.status_code == 401
+
+
+def test_batch_session_requires_csrf_but_token_does_not(
+    csrf_app, csrf_client, login_session, make_user
+):
+    user_id = make_user(csrf_app)
+    login_session(csrf_client, user_id)
+    body = [{"title": "T", "content": "long enough body"}]
+
+    assert csrf_client.post("/api/posts/batch", json=body).status_code == 400
+
+    page = csrf_client.get("/create_post").get_data(as_text=True)
+    csrf_token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+    resp = csrf_client.post("/api/posts/batch", json=body, headers={"X-CSRFToken": csrf_token})
+    assert resp.status_code == 201
+
+    token = csrf_client.post("/api/token", headers={"X-CSRFToken": csrf_token}).get_json()["token"]
+    with csrf_client.session_transaction() as sess:
+        sess.clear()
+    resp = csrf_client.post(
+        "/api/posts/batch", json=body, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert resp.status_code == 201
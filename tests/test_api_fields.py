@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import pytest
+
+from app import db
+from app.models import Post, User
+from app.sqlstats import QueryRecorder
+
+
+@pytest.fixture()
+def posts(app):
+    with app.app_context():
+        user = User(username="alice", password="hash")
+        db.session.add(user)
+        db.session.flush()
+        rows = [
+            Post(title="Long", content="слово " * 200, user_id=user.id),
+            Post(title="Short", content="short body", user_id=user.id),
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [post.id for post in rows]
+
+
+def _post_select(stats) -> str:
+    return next(
+        statement
+        for statement, _ in reversed(stats.statements)
+        if statement.lstrip().startswith("SELECT") and "FROM post" in statement
+    )
+
+
+def test_fields_limit_keys_and_columns(client, posts):
+    with QueryRecorder(keep_statements=True) as stats:
+        resp = client.get("/api/posts?fields=id,title,author")
+
+    assert resp.status_code == 200
+    items = resp.get_json()["items"]
+    assert [set(item) for item in items] == [{"id", "title", "author"}] * 2
+    assert items[0]["author"] == "alice"
+    select = _post_select(stats)
+    assert "post.content" not in select
+    assert "post.image_variants" not in select
+    assert "user_1.password" not in select
+
+
+def test_excerpt_reads_a_prefix_of_content(client, posts):
+    with QueryRecorder(keep_statements=True) as stats:
+        resp = client.get("/api/posts?excerpt=20")
+
+    items = {item["title"]: item for item in resp.get_json()["items"]}
+    assert items["Long"]["content"] == ("слово " * 200)[:20]
+    assert items["Long"]["content_truncated"] is True
+    assert items["Short"]["content"] == "short body"
+    assert items["Short"]["content_truncated"] is False
+    assert "image" in items["Long"]
+    select = _post_select(stats)
+    assert "substr(post.content" in select
+    assert "post.content AS" not in select
+
+
+def test_fieldset_applies_to_ids_lookup(client, posts):
+    long_id, short_id = posts
+    resp = client.get(f"/api/posts?ids={short_id},{long_id}&fields=id,content&excerpt=5")
+
+    assert resp.get_json()["items"] == [
+        {"id": short_id, "content": "short", "content_truncated": True},
+        {"id": long_id, "content": "слово", "content_truncated": True},
+    ]
+    other = client.get(f"/api/posts?ids={short_id},{long_id}&fields=id")
+    assert other.headers["ETag"] != resp.headers["ETag"]
+
+
+def test_default_response_is_unchanged(client, posts):
+    item = client.get("/api/posts").get_json()["items"][0]
+    assert set(item) == {
+        "id",
+        "title",
+        "content",
+        "author",
+        "created_at",
+        "image",
+        "thumbnail",
+        "image_pending",
+    }
+
+
+@pytest.mark.parametrize("query", ["fields=id,password", "fields=,", "excerpt=0", "excerpt=abc"])
+def test_bad_fieldsets_are_rejected(client, posts, query):
+    assert client.get(f"/api/posts?{query}").status_code == 400
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from app import db  # noqa: E402
+from app.asgi import async_database_url, create_asgi_app  # noqa: E402
+from app.models import Comment, Post, User  # noqa: E402
+from config import TestConfig  # noqa: E402
+
+
+@pytest.fixture()
+def asgi_app(tmp_path, clean_uploads):
+    config = type(
+        "AsyncConfig", (TestConfig,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'a.db'}"}
+    )
+    api = create_asgi_app(config)
+    clean_uploads(api.flask_app)
+    with api.flask_app.app_context():
+        db.create_all()
+        user = User(username="asyncer", password="hash")
+        db.session.add(user)
+        db.session.flush()
+        posts = [
+            Post(title=f"Post {n}", content="content goes here", user_id=user.id) for n in range(5)
+        ]
+        db.session.add_all(posts)
+        db.session.flush()
+        db.session.add_all(
+            Comment(content=f"comment {n}", post_id=posts[0].id, user_id=user.id) for n in range(3)
+        )
+        db.session.commit()
+    yield api
+    asyncio.run(api.engine.dispose())
+
+
+def call(app, path: str, query: str = "", method: str = "GET"):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(b"host", b"testserver")],
+        "server": ("testserver", 80),
+        "scheme": "http",
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    return messages[0]["status"], json.loads(body) if body else None
+
+
+def test_list_posts_pages_with_cursor(asgi_app):
+    status, payload = call(asgi_app, "/api/posts", "limit=2")
+    assert status == 200
+    assert [item["title"] for item in payload["items"]] == ["Post 4", "Post 3"]
+    assert payload["items"][0]["author"] == "asyncer"
+
+    status, payload = call(asgi_app, "/api/posts", f"limit=2&cursor={payload['next_cursor']}")
+    assert [item["title"] for item in payload["items"]] == ["Post 2", "Post 1"]
+    assert payload["prev_cursor"]
+
+    assert call(asgi_app, "/api/posts", "cursor=garbage")[0] == 400
+
+
+def test_single_post_and_comments(asgi_app):
+    status, post = call(asgi_app, "/api/posts/1")
+    assert status == 200
+    assert post["title"] == "Post 0"
+
+    status, payload = call(asgi_app, "/api/posts/1/comments", "limit=2")
+    assert status == 200
+    assert payload["total"] == 3
+    assert [c["content"] for c in payload["items"]] == ["comment 0", "comment 1"]
+    assert call(asgi_app, "/api/posts/1/comments", "limit=2&page=2")[1]["items"][0]["id"] == 3
+
+
+def test_errors(asgi_app):
+    assert call(asgi_app, "/api/posts/999")[0] == 404
+    assert call(asgi_app, "/api/posts/999/comments")[0] == 404
+    assert call(asgi_app, "/nope")[0] == 404
+    assert call(asgi_app, "/api/posts", method="POST")[0] == 405
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    assert (
+        async_database_url("postgresql://u:p@db:5432/pulse")
+        == "postgresql+asyncpg://u:p@db:5432/pulse"
+    )
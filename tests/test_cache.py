@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import time
+
+from app import db
+from app.cache import LRUCache, SQLiteCache
+from app.models import Post, User
+
+
+def test_lru_cache_evicts_oldest_and_expires():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache.set("short", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    first = SQLiteCache(tmp_path / "cache.db")
+    second = SQLiteCache(tmp_path / "cache.db")
+    first.set("key", ("body", "text/html"), ttl=60)
+    assert second.get("key") == ("body", "text/html")
+
+    second.bump("feed")
+    assert first.generation("feed") == 1
+
+
+def test_anonymous_feed_served_from_cache(client):
+    assert client.get("/all_posts").headers["X-Cache"] == "MISS"
+    assert client.get("/all_posts").headers["X-Cache"] == "HIT"
+    assert client.get("/all_posts?page=2").headers["X-Cache"] == "MISS"
+
+
+def test_new_post_invalidates_feed(client, app, login_session, make_user):
+    user_id = make_user(app)
+    anonymous = app.test_client()
+    anonymous.get("/")
+    assert anonymous.get("/").headers["X-Cache"] == "HIT"
+
+    login_session(client, user_id)
+    client.post("/create_post", data={"title": "Fresh news", "content": "content body here"})
+
+    resp = anonymous.get("/")
+    assert resp.headers["X-Cache"] == "MISS"
+    assert "Fresh news" in resp.get_data(as_text=True)
+
+
+def test_avatar_change_invalidates_feed(client, app, make_user):
+    user_id = make_user(app)
+    client.get("/")
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.profile_image = "uploads/profiles/new.png"
+        db.session.commit()
+    assert client.get("/").headers["X-Cache"] == "MISS"
+
+
+def test_unrelated_writes_keep_cache(client, app, make_user):
+    make_user(app)
+    client.get("/")
+    with app.app_context():
+        db.session.add(User(username="lurker", password="hash"))
+        db.session.commit()
+    assert client.get("/").headers["X-Cache"] == "HIT"
+
+
+def test_authenticated_pages_are_not_cached(client, app, login_session, make_user):
+    user_id = make_user(app)
+    with app.app_context():
+        db.session.add(Post(title="Mine", content="content body", user_id=user_id))
+        db.session.commit()
+    login_session(client, user_id)
+    client.get("/all_posts")
+    resp = client.get("/all_posts")
+    assert "X-Cache" not in resp.headers
+    assert "Редактировать" in resp.get_data(as_text=True)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import gzip
+import os
+
+import brotli
+
+from app import db
+from app.compression import precompress_directory
+from app.models import Post, User
+
+
+def _seed_posts(app, count: int = 10) -> None:
+    with app.app_context():
+        user = User(username="alice", password="hash")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all(
+            Post(title=f"Post {n}", content="повторяющийся текст " * 20, user_id=user.id)
+            for n in range(count)
+        )
+        db.session.commit()
+
+
+def test_html_is_gzipped_when_accepted(app, client):
+    _seed_posts(app)
+    plain = client.get("/all_posts?page=1")
+    resp = client.get("/all_posts?page=1", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.vary
+    assert int(resp.headers["Content-Length"]) < len(plain.data)
+    assert gzip.decompress(resp.data) == plain.data
+
+
+def test_authenticated_html_is_not_compressed(app, client, login_session):
+    _seed_posts(app)
+    with app.app_context():
+        login_session(client, db.session.query(User.id).scalar())
+
+    page = client.get("/all_posts?page=1", headers={"Accept-Encoding": "gzip"})
+    assert page.status_code == 200 and "Content-Encoding" not in page.headers
+    api = client.get("/api/posts", headers={"Accept-Encoding": "gzip"})
+    assert api.headers["Content-Encoding"] == "gzip"
+
+
+def test_brotli_preferred_and_quality_respected(app, client):
+    _seed_posts(app)
+    resp = client.get("/api/posts", headers={"Accept-Encoding": "gzip, deflate, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(resp.data).startswith(b"{")
+
+    resp = client.get("/api/posts", headers={"Accept-Encoding": "br;q=0.5, gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+
+
+def test_small_responses_stay_uncompressed(client):
+    resp = client.get("/api/posts", headers={"Accept-Encoding": "gzip"})
+    assert len(resp.data) < 1024
+    assert "Content-Encoding" not in resp.headers
+    assert "Accept-Encoding" in resp.vary
+
+
+def test_compressed_etag_revalidates(app, client):
+    _seed_posts(app)
+    resp = client.get("/api/posts", headers={"Accept-Encoding": "gzip"})
+    etag = resp.headers["ETag"]
+    assert etag.startswith("W/")
+
+    cached = client.get("/api/posts", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_precompressed_static_assets(app, client, tmp_path):
+    (tmp_path / "site.css").write_text("body { color: red; }\n" * 200)
+    (tmp_path / "tiny.js").write_text("x")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG")
+    (tmp_path / "uploads").mkdir()
+    (tmp_path / "uploads" / "avatar.svg").write_text("<svg></svg>" * 100)
+
+    written = precompress_directory(tmp_path, exclude=(tmp_path / "uploads",))
+    assert sorted(path.name for path in written) == ["site.css.br", "site.css.gz"]
+
+    app.static_folder = str(tmp_path)
+    resp = client.get("/static/site.css", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert resp.mimetype == "text/css"
+    assert brotli.decompress(resp.get_data()) == (tmp_path / "site.css").read_bytes()
+    resp.close()
+
+    resp = client.get("/static/site.css", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    resp.close()
+
+    # A source edited after the build is served as is until the next precompress.
+    stale = (tmp_path / "site.css.gz").stat().st_mtime - 10
+    os.utime(tmp_path / "site.css.gz", (stale, stale))
+    os.utime(tmp_path / "site.css.br", (stale, stale))
+    resp = client.get("/static/site.css", headers={"Accept-Encoding": "gzip, br"})
+    assert "Content-Encoding" not in resp.headers
+    resp.close()
+
+    assert client.get("/static/../config.py").status_code == 404
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from app import db
+from app.models import Comment, Post
+
+
+def test_api_posts_answers_if_none_match_with_304(client, app, query_budget, seed):
+    seed(app)
+    first = client.get("/api/posts")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    with query_budget(2):
+        resp = client.get("/api/posts", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert resp.get_data() == b""
+
+    other_page = client.get("/api/posts?limit=5", headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+
+
+def test_api_posts_etag_changes_on_edit_and_delete(client, app, seed):
+    user_id, (post_id,) = seed(app)
+    etag = client.get("/api/posts?cursor=").headers["ETag"]
+
+    with app.app_context():
+        db.session.get(Post, post_id).title = "Edited"
+        db.session.commit()
+    resp = client.get("/api/posts?cursor=", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+
+    with app.app_context():
+        db.session.delete(db.session.get(Post, post_id))
+        db.session.commit()
+    assert client.get("/api/posts?cursor=", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_api_posts_if_modified_since(client, app, seed):
+    seed(app)
+    last_modified = client.get("/api/posts").headers["Last-Modified"]
+    resp = client.get("/api/posts", headers={"If-Modified-Since": last_modified})
+    assert resp.status_code == 304
+
+
+def test_view_post_revalidates_before_loading_comments(client, app, query_budget, seed):
+    user_id, (post_id,) = seed(app)
+    etag = client.get(f"/post/{post_id}").headers["ETag"]
+    with query_budget(1):
+        resp = client.get(f"/post/{post_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_new_comment_changes_post_version(client, app, login_session, seed):
+    user_id, (post_id,) = seed(app)
+    anonymous = app.test_client()
+    etag = anonymous.get(f"/post/{post_id}").headers["ETag"]
+
+    login_session(client, user_id)
+    client.post(f"/post/{post_id}", data={"content": "Fresh comment"})
+
+    resp = anonymous.get(f"/post/{post_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert "Fresh comment" in resp.get_data(as_text=True)
+
+    etag = resp.headers["ETag"]
+    with app.app_context():
+        Comment.query.one().content = "Edited comment"
+        db.session.commit()
+    assert anonymous.get(f"/post/{post_id}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_authenticated_view_post_has_no_validators(client, app, login_session, seed):
+    user_id, (post_id,) = seed(app)
+    login_session(client, user_id)
+    assert "ETag" not in client.get(f"/post/{post_id}").headers
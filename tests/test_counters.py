@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app import db
+from app.counters import recount_all
+from app.models import Comment, Post, User
+from app.schema import upgrade_schema
+
+
+def test_post_count_follows_create_and_delete(client, app, login_session, make_user):
+    user_id = make_user(app)
+    login_session(client, user_id)
+    client.post("/create_post", data={"title": "One", "content": "content body here"})
+    client.post("/create_post", data={"title": "Two", "content": "content body here"})
+    with app.app_context():
+        assert db.session.get(User, user_id).post_count == 2
+        post_id = Post.query.filter_by(title="One").one().id
+
+    client.post(f"/delete_post/{post_id}")
+    with app.app_context():
+        assert db.session.get(User, user_id).post_count == 1
+
+
+def test_comment_count_follows_create_and_delete(client, app, login_session, make_user):
+    user_id = make_user(app)
+    login_session(client, user_id)
+    with app.app_context():
+        post = Post(title="Post", content="content body", user_id=user_id)
+        db.session.add(post)
+        db.session.commit()
+        post_id = post.id
+
+    for text_ in ("First!", "Second"):
+        client.post(f"/post/{post_id}", data={"content": text_})
+    with app.app_context():
+        assert db.session.get(Post, post_id).comment_count == 2
+        comment_id = Comment.query.filter_by(content="First!").one().id
+
+    client.post(f"/delete_comment/{comment_id}")
+    with app.app_context():
+        assert db.session.get(Post, post_id).comment_count == 1
+    assert "Комментарии (1)" in client.get(f"/post/{post_id}").get_data(as_text=True)
+
+
+def test_in_session_instances_see_updated_counts(app):
+    with app.app_context():
+        user = User(username="writer", password="hash")
+        post = Post(title="Post", content="content body", user=user)
+        db.session.add_all([user, post, Comment(content="Hi", post=post, user=user)])
+        db.session.commit()
+        assert post.comment_count == 1
+        assert user.post_count == 1
+
+
+def test_recount_repairs_drift(app):
+    with app.app_context():
+        user = User(username="writer", password="hash")
+        post = Post(title="Post", content="content body", user=user)
+        db.session.add_all([user, post, Comment(content="Hi", post=post, user=user)])
+        db.session.commit()
+        db.session.execute(text("UPDATE post SET comment_count = 42"))
+        db.session.execute(text('UPDATE "user" SET post_count = 0'))
+        db.session.commit()
+
+        recount_all()
+        assert db.session.get(Post, post.id).comment_count == 1
+        assert db.session.get(User, user.id).post_count == 1
+
+
+def test_upgrade_schema_adds_and_backfills_counter_columns(app):
+    with app.app_context():
+        user = User(username="writer", password="hash")
+        post = Post(title="Post", content="content body", user=user)
+        db.session.add_all([user, post, Comment(content="Hi", post=post, user=user)])
+        db.session.commit()
+        post_id = post.id
+        db.session.execute(text("ALTER TABLE post DROP COLUMN comment_count"))
+        db.session.commit()
+        db.session.expunge_all()
+
+        assert upgrade_schema() == ["post.comment_count"]
+        assert db.session.get(Post, post_id).comment_count == 1
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+
+from app import db
+from app.export import export_stream
+from app.models import Comment, Post, User
+
+
+@pytest.fixture()
+def populated(app):
+    with app.app_context():
+        admin = User(username="admin", password="hash")
+        user = User(username="alice", password="hash")
+        posts = [Post(title=f"Пост {n}", content="content body", user=user) for n in range(5)]
+        db.session.add_all([admin, user, *posts])
+        db.session.add(Comment(content="Nice", post=posts[0], user=admin))
+        db.session.commit()
+        app.config["ADMIN_USER_IDS"] = {admin.id}
+        return {"admin": admin.id, "user": user.id, "posts": [post.id for post in posts]}
+
+
+def _lines(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def test_export_stream_resumes_after_id(app, populated):
+    with app.app_context():
+        rows = _lines(b"".join(export_stream("posts", batch_size=2)))
+        assert [row["id"] for row in rows] == populated["posts"]
+        assert rows[0]["title"] == "Пост 0"
+        assert rows[0]["author"] == "alice"
+
+        resumed = _lines(b"".join(export_stream("posts", after_id=populated["posts"][2])))
+        assert [row["id"] for row in resumed] == populated["posts"][3:]
+
+
+def test_admin_export_streams_gzip(app, client, populated, login_session):
+    login_session(client, populated["admin"])
+
+    resp = client.get("/admin/export/comments?gzip=1")
+
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "application/gzip"
+    rows = _lines(gzip.decompress(resp.data))
+    assert [(row["content"], row["author"]) for row in rows] == [("Nice", "admin")]
+
+
+def test_admin_export_is_admin_only(app, client, populated, login_session):
+    login_session(client, populated["user"])
+    assert client.get("/admin/export/posts").status_code == 403
+
+    login_session(client, populated["admin"])
+    assert client.get("/admin/export/users").status_code == 404
+    resp = client.get("/admin/export/posts")
+    assert resp.mimetype == "application/x-ndjson"
+    assert len(_lines(resp.data)) == 5
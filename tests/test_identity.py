@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import threading
+
+
+from app import db
+from app.identity import SessionUser, get_user_cache
+from app.models import Post, User
+from app.sqlstats import QueryRecorder
+
+
+def user_lookups(stats) -> int:
+    return sum(n for shape, n in stats.shapes.items() if "FROM user WHERE user.id" in shape)
+
+
+def test_authenticated_requests_reuse_cached_user(app, client, login_session, make_user):
+    login_session(client, make_user(app))
+    client.get("/")
+    with QueryRecorder() as stats:
+        for _ in range(3):
+            assert client.get("/").status_code == 200
+    assert user_lookups(stats) == 0
+
+
+def test_session_user_compares_equal_to_row(app, make_user):
+    user_id = make_user(app)
+    with app.app_context():
+        session_user = get_user_cache().load(user_id)
+        assert isinstance(session_user, SessionUser)
+        assert session_user == db.session.get(User, user_id)
+        assert session_user != User(id=user_id + 1)
+
+
+def test_owner_controls_rendered_for_cached_user(app, client, login_session, make_user):
+    user_id = make_user(app)
+    with app.app_context():
+        db.session.add(Post(title="Mine", content="content goes here", user_id=user_id))
+        db.session.commit()
+        post_id = Post.query.one().id
+    login_session(client, user_id)
+    client.get("/")
+    assert f"/edit_post/{post_id}".encode() in client.get(f"/post/{post_id}").data
+
+
+def test_avatar_change_invalidates_cached_user(app, client, login_session, make_image, make_user):
+    user_id = make_user(app)
+    login_session(client, user_id)
+    client.get("/")
+    with app.app_context():
+        assert get_user_cache().load(user_id).profile_image is None
+
+    client.post(
+        "/profile",
+        data={"profile_picture": (make_image(), "me.png")},
+        content_type="multipart/form-data",
+    )
+    with app.app_context():
+        assert get_user_cache().load(user_id).profile_image is not None
+
+
+def test_deleted_user_is_logged_out(app, client, login_session, make_user):
+    user_id = make_user(app)
+    login_session(client, user_id)
+    client.get("/")
+    with app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+    assert client.get("/profile").status_code == 302
+
+
+def test_cache_is_thread_safe(app, make_user):
+    user_ids = [make_user(app, f"user{n}") for n in range(8)]
+    errors = []
+
+    def worker():
+        try:
+            with app.app_context():
+                cache = get_user_cache()
+                for _ in range(50):
+                    for user_id in user_ids:
+                        assert cache.load(user_id).id == user_id
+                    cache.invalidate()
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app import db
+from app.jobs import get_pipeline, resume_stale_jobs
+from app.models import ImageJob, Post, User
+from config import Config, TestConfig
+
+
+class ProcessPipelineConfig(TestConfig):
+    IMAGE_PIPELINE = "process"
+    IMAGE_WORKERS = 1
+    UPLOAD_ROOT = Config.UPLOAD_ROOT / "test_jobs"
+    PROFILE_UPLOAD_FOLDER = UPLOAD_ROOT / "profiles"
+    POST_UPLOAD_FOLDER = UPLOAD_ROOT / "posts"
+
+
+@pytest.fixture()
+def jobs_app(make_app):
+    app = make_app(ProcessPipelineConfig)
+    yield app
+    app.extensions["pulse_images"].shutdown()
+
+
+@pytest.fixture()
+def client(jobs_app, login_session):
+    with jobs_app.app_context():
+        user = User(username="uploader", password="hash")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = jobs_app.test_client()
+    login_session(client, user_id)
+    return client
+
+
+def get_pipeline_for(app):
+    with app.app_context():
+        return get_pipeline()
+
+
+def create_post_with_image(client, image: BytesIO):
+    return client.post(
+        "/create_post",
+        data={"title": "Queued", "content": "content goes here", "image": (image, "a.png")},
+        content_type="multipart/form-data",
+    )
+
+
+def test_upload_is_processed_in_background(jobs_app, client, monkeypatch, make_image):
+    pipeline = get_pipeline_for(jobs_app)
+    held = []
+    monkeypatch.setattr(pipeline, "submit", lambda *args: held.append(args))
+    assert create_post_with_image(client, make_image()).status_code == 302
+
+    with jobs_app.app_context():
+        post = Post.query.one()
+        assert post.image is None and post.image_pending
+        job = ImageJob.query.one()
+        assert job.status == "pending" and Path(job.source_path).exists()
+    assert "Изображение обрабатывается" in client.get(f"/post/{post.id}").get_data(as_text=True)
+
+    monkeypatch.undo()
+    pipeline.submit(*held[0])
+    assert pipeline.drain(timeout=30)
+
+    with jobs_app.app_context():
+        post = Post.query.one()
+        job = ImageJob.query.one()
+        assert job.status == "done"
+        assert post.image == job.result_path and not post.image_pending
+        assert (Path(jobs_app.static_folder) / post.image).exists()
+        assert not Path(job.source_path).exists()
+
+    status = client.get(f"/api/image-jobs/{job.id}").get_json()
+    assert status["status"] == "done" and status["image"].endswith(Path(post.image).name)
+
+
+def test_orphaned_jobs_are_requeued_once_stale(jobs_app, client, monkeypatch, make_image):
+    pipeline = get_pipeline_for(jobs_app)
+    # The worker that queued these died before handing them to its pool.
+    monkeypatch.setattr(pipeline, "submit", lambda *args: None)
+    create_post_with_image(client, make_image())
+    create_post_with_image(client, make_image(color=(0, 255, 0)))
+    monkeypatch.undo()
+    with jobs_app.app_context():
+        stale, fresh = ImageJob.query.order_by(ImageJob.id).all()
+        stale.created_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        db.session.commit()
+
+    resume_stale_jobs(jobs_app)
+    resume_stale_jobs(jobs_app)
+    assert pipeline.drain(timeout=30)
+
+    with jobs_app.app_context():
+        stale, fresh = ImageJob.query.order_by(ImageJob.id).all()
+        assert stale.status == "done" and stale.claimed_at is not None
+        assert fresh.status == "pending" and fresh.claimed_at is None
+
+
+def test_upload_response_names_the_job(jobs_app, client, make_image):
+    response = create_post_with_image(client, make_image())
+    assert response.status_code == 302
+    job_url = response.headers["X-Image-Job"]
+
+    assert get_pipeline_for(jobs_app).drain(timeout=30)
+    status = client.get(job_url).get_json()
+    assert status["status"] == "done" and status["target_type"] == "post"
+    with jobs_app.app_context():
+        assert status["target_id"] == Post.query.one().id
+
+
+def test_corrupt_upload_marks_job_failed(jobs_app, client):
+    buf = BytesIO()
+    Image.frombytes("RGB", (64, 64), os.urandom(64 * 64 * 3)).save(buf, format="JPEG")
+    truncated = BytesIO(buf.getvalue()[: len(buf.getvalue()) // 2])
+    # Headers are valid so the request is accepted; decoding fails in the worker.
+    client.post(
+        "/create_post",
+        data={"title": "Broken", "content": "content goes here", "image": (truncated, "b.jpg")},
+        content_type="multipart/form-data",
+    )
+    assert get_pipeline_for(jobs_app).drain(timeout=30)
+
+    with jobs_app.app_context():
+        job = ImageJob.query.one()
+        post = Post.query.one()
+        assert job.status == "failed" and job.error
+        assert post.image is None and not post.image_pending
+
+
+def test_replaced_image_is_deleted_once_processed(jobs_app, client, make_image):
+    create_post_with_image(client, make_image())
+    get_pipeline_for(jobs_app).drain(timeout=30)
+    with jobs_app.app_context():
+        post = Post.query.one()
+        first = Path(jobs_app.static_folder) / post.image
+
+    client.post(
+        f"/edit_post/{post.id}",
+        data={
+            "title": "Queued",
+            "content": "content goes here",
+            "image": (make_image(color=(0, 0, 255)), "c.png"),
+        },
+        content_type="multipart/form-data",
+    )
+    get_pipeline_for(jobs_app).drain(timeout=30)
+    with jobs_app.app_context():
+        post = Post.query.one()
+        assert not first.exists()
+        assert (Path(jobs_app.static_folder) / post.image).exists()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+HASH_NAME = "ab" * 32
+
+
+@pytest.fixture()
+def stored(app):
+    folder = Path(app.config["POST_UPLOAD_FOLDER"])
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder.resolve() / f"{HASH_NAME}.gif"
+    path.write_bytes(b"GIF89a" + bytes(range(256)) * 4)
+    media_root = (Path(app.static_folder) / "uploads").resolve()
+    return path, path.relative_to(media_root).as_posix()
+
+
+def test_hashed_upload_is_immutable(client, stored):
+    path, name = stored
+    resp = client.get(f"/media/{name}")
+    assert resp.status_code == 200
+    assert resp.data == path.read_bytes()
+    assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+
+def test_range_request_returns_partial_content(client, stored):
+    path, name = stored
+    resp = client.get(f"/media/{name}", headers={"Range": "bytes=6-15"})
+    assert resp.status_code == 206
+    assert resp.data == path.read_bytes()[6:16]
+    assert resp.headers["Content-Range"] == f"bytes 6-15/{path.stat().st_size}"
+
+
+def test_mutable_names_get_short_cache(client):
+    resp = client.get("/media/profiles/default.svg")
+    assert resp.status_code == 200
+    assert resp.headers["Cache-Control"] == "max-age=3600"
+
+
+def test_accel_mode_delegates_to_nginx(app, client, stored):
+    _, name = stored
+    app.config["MEDIA_SERVING"] = "accel"
+    resp = client.get(f"/media/{name}")
+    assert resp.headers["X-Accel-Redirect"] == f"/_uploads/{name}"
+    assert resp.data == b""
+    assert resp.mimetype == "image/gif"
+    assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    assert client.get("/media/../config.py").status_code == 404
+
+
+def test_image_urls_point_at_media(app):
+    from app.models import Post
+
+    with app.test_request_context():
+        post = Post(image=f"uploads/posts/{HASH_NAME}.jpg")
+        assert post.image_url() == f"/media/posts/{HASH_NAME}.jpg"
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from prometheus_client import CollectorRegistry, multiprocess
+from prometheus_client.parser import text_string_to_metric_families
+
+from app import db
+from app.models import Post, User
+
+
+def _samples(text: str) -> dict:
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+def _value(samples: dict, name: str, **labels) -> float:
+    return samples.get((name, tuple(sorted(labels.items()))), 0.0)
+
+
+def test_metrics_count_requests_and_queries(client):
+    before = _samples(client.get("/metrics").get_data(as_text=True))
+    client.get("/")
+    client.get("/")
+    client.get("/no-such-page")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    after = _samples(resp.get_data(as_text=True))
+
+    home = {"endpoint": "app.home", "method": "GET"}
+    assert (
+        _value(after, "pulse_http_requests_total", status="200", **home)
+        - _value(before, "pulse_http_requests_total", status="200", **home)
+        == 2
+    )
+    assert (
+        _value(after, "pulse_http_request_duration_seconds_count", **home)
+        - _value(before, "pulse_http_request_duration_seconds_count", **home)
+        == 2
+    )
+    assert _value(
+        after, "pulse_http_requests_total", endpoint="unmatched", method="GET", status="404"
+    ) > _value(
+        before, "pulse_http_requests_total", endpoint="unmatched", method="GET", status="404"
+    )
+    assert _value(after, "pulse_db_query_duration_seconds_count", endpoint="app.home") > _value(
+        before, "pulse_db_query_duration_seconds_count", endpoint="app.home"
+    )
+
+
+def test_metrics_count_page_cache_events(app, client):
+    def events(samples: dict) -> tuple[float, ...]:
+        return tuple(
+            _value(samples, "pulse_page_cache_events_total", namespace="feed", outcome=outcome)
+            for outcome in ("hit", "miss", "invalidation")
+        )
+
+    before = events(_samples(client.get("/metrics").get_data(as_text=True)))
+    client.get("/all_posts")
+    client.get("/all_posts")
+    client.get("/all_posts?page=2")
+    with app.app_context():
+        user = User(username="writer", password="hash")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Post(title="Fresh", content="content body", user_id=user.id))
+        db.session.commit()
+
+    after = events(_samples(client.get("/metrics").get_data(as_text=True)))
+    assert [new - old for new, old in zip(after, before, strict=True)] == [1, 2, 1]
+
+
+def test_metrics_record_image_processing(app, client, login_session, make_image):
+    with app.app_context():
+        user = User(username="alice", password="hash")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    login_session(client, user_id)
+    before = _samples(client.get("/metrics").get_data(as_text=True))
+
+    client.post(
+        "/create_post",
+        data={
+            "title": "Photo",
+            "content": "content body",
+            "image": (make_image((800, 600)), "photo.png"),
+        },
+        content_type="multipart/form-data",
+    )
+
+    after = _samples(client.get("/metrics").get_data(as_text=True))
+    for stage in ("decode", "resize", "encode"):
+        name = "pulse_image_processing_seconds_count"
+        assert _value(after, name, stage=stage) > _value(before, name, stage=stage)
+    for kind in ("original", "variant"):
+        name = "pulse_image_bytes_written_total"
+        assert _value(after, name, kind=kind) > _value(before, name, kind=kind)
+
+
+def test_multiprocess_samples_are_summed(tmp_path):
+    script = "from app.metrics import REQUESTS; REQUESTS.labels('app.home', 'GET', '200').inc(3)"
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    root = Path(__file__).resolve().parent.parent
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", script], env=env, cwd=root, check=True)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    value = registry.get_sample_value(
+        "pulse_http_requests_total", {"endpoint": "app.home", "method": "GET", "status": "200"}
+    )
+    assert value == 6
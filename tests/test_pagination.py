@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Post, User
+
+
+def seed_posts(app, count: int, same_timestamp: bool = False) -> None:
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    with app.app_context():
+        user = User(username="writer", password="hash")
+        db.session.add(user)
+        for i in range(count):
+            posted = base if same_timestamp else base + timedelta(minutes=i)
+            db.session.add(
+                Post(title=f"Post {i}", content="content", user=user, date_posted=posted)
+            )
+        db.session.commit()
+
+
+def walk_forward(client, limit: int) -> list[list[str]]:
+    pages = []
+    payload = client.get(f"/api/posts?cursor=&limit={limit}").get_json()
+    pages.append([item["title"] for item in payload["items"]])
+    while payload["next_cursor"]:
+        payload = client.get(f"/api/posts?cursor={payload['next_cursor']}&limit={limit}").get_json()
+        pages.append([item["title"] for item in payload["items"]])
+    return pages
+
+
+def test_cursor_pages_cover_all_posts_newest_first(client, app):
+    seed_posts(app, 7)
+    pages = walk_forward(client, 3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    titles = [title for page in pages for title in page]
+    assert titles == [f"Post {i}" for i in range(6, -1, -1)]
+
+
+def test_cursor_pagination_breaks_timestamp_ties_by_id(client, app):
+    seed_posts(app, 5, same_timestamp=True)
+    titles = [title for page in walk_forward(client, 2) for title in page]
+    assert sorted(titles) == sorted(f"Post {i}" for i in range(5))
+    assert len(titles) == len(set(titles))
+
+
+def test_prev_cursor_returns_previous_page(client, app):
+    seed_posts(app, 5)
+    first = client.get("/api/posts?cursor=&limit=2").get_json()
+    assert first["prev_cursor"] is None
+    second = client.get(f"/api/posts?cursor={first['next_cursor']}&limit=2").get_json()
+    back = client.get(f"/api/posts?cursor={second['prev_cursor']}&limit=2").get_json()
+    assert back["items"] == first["items"]
+    assert back["prev_cursor"] is None
+
+
+def test_cursor_mode_total_estimate_is_opt_in(client, app):
+    seed_posts(app, 3)
+    payload = client.get("/api/posts?cursor=").get_json()
+    assert "total" not in payload and "total_estimate" not in payload
+    payload = client.get("/api/posts?cursor=&include_total=1").get_json()
+    assert payload["total_estimate"] == 3
+
+
+def test_invalid_cursor_rejected(client, app):
+    assert client.get("/api/posts?cursor=garbage").status_code == 400
+    assert client.get("/all_posts?cursor=garbage").status_code == 400
+    for post_id in ("1e400", str(2**64), "0"):
+        payload = f'["n","2020-01-01T00:00:00",{post_id}]'.encode()
+        cursor = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+        assert client.get(f"/api/posts?cursor={cursor}").status_code == 400
+        assert client.get(f"/all_posts?cursor={cursor}").status_code == 400
+
+
+def test_all_posts_links_use_cursors(client, app):
+    seed_posts(app, 8)
+    body = client.get("/all_posts").get_data(as_text=True)
+    assert "Post 7" in body and "Post 1" not in body
+    assert "cursor=" in body
+
+    body = client.get("/all_posts?page=2").get_data(as_text=True)
+    assert "Стр. 2 из 2" in body
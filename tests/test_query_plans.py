@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+from sqlalchemy import inspect, text
+
+from app import db
+from app.schema import upgrade_schema
+from app.sqlstats import QueryRecorder
+
+FULL_SCAN_RE = re.compile(r"^SCAN (post|comment|user)$")
+POSTS = [(f"Post {n}", "searchable content") for n in range(8)]
+
+
+def plan_problems(app, statements) -> list[str]:
+    problems = []
+    with app.app_context():
+        connection = db.session.connection()
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            for row in plan:
+                detail = row[-1]
+                if FULL_SCAN_RE.match(detail) or "USE TEMP B-TREE" in detail:
+                    problems.append(f"{detail}\n    in: {statement}")
+    return problems
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/",
+        "/all_posts",
+        "/all_posts?page=2",
+        "/all_posts?search=searchable",
+        "/post/{post_id}",
+        "/profile",
+        "/api/posts",
+        "/api/posts?cursor=",
+        "/api/search?q=content",
+    ],
+)
+def test_route_queries_use_indexes(client, app, path, login_session, seed):
+    user_id, (post_id, *_) = seed(app, *POSTS, comments=3)
+    login_session(client, user_id)
+    next_page = client.get("/api/posts?cursor=&limit=3").get_json()["next_cursor"]
+
+    with QueryRecorder(keep_statements=True) as stats:
+        assert client.get(path.format(post_id=post_id)).status_code == 200
+        if path == "/api/posts?cursor=":
+            client.get(f"/api/posts?cursor={next_page}&limit=3")
+
+    assert stats.statements
+    assert plan_problems(app, stats.statements) == []
+
+
+def test_upgrade_schema_adds_missing_indexes(app):
+    with app.app_context():
+        db.session.execute(text("DROP INDEX ix_post_date_posted_id"))
+        db.session.commit()
+        assert upgrade_schema() == ["ix_post_date_posted_id"]
+        names = {index["name"] for index in inspect(db.engine).get_indexes("post")}
+        assert "ix_post_date_posted_id" in names
+        assert upgrade_schema() == []
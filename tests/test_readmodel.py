@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.orm import joinedload
+
+from app import db, readmodel
+from app.models import Post, User
+
+VARIANTS = [
+    {"path": "uploads/posts/" + "a" * 64 + "_320.jpg", "width": 320, "type": "image/jpeg"},
+    {"path": "uploads/posts/" + "a" * 64 + "_640.jpg", "width": 640, "type": "image/jpeg"},
+    {"path": "uploads/posts/" + "a" * 64 + "_640.webp", "width": 640, "type": "image/webp"},
+]
+
+
+@pytest.fixture()
+def posts(app):
+    with app.app_context():
+        alice = User(
+            username="alice",
+            password="hash",
+            profile_image="uploads/profiles/" + "b" * 64 + ".png",
+            profile_image_variants=[
+                {
+                    "path": "uploads/profiles/" + "b" * 64 + "_64.png",
+                    "width": 64,
+                    "type": "image/png",
+                }
+            ],
+        )
+        bob = User(username="bob", password="hash")
+        db.session.add_all([alice, bob])
+        db.session.flush()
+        db.session.add_all(
+            [
+                Post(
+                    title="Photo",
+                    content="with image",
+                    user_id=alice.id,
+                    image="uploads/posts/" + "a" * 64 + ".jpg",
+                    image_variants=VARIANTS,
+                ),
+                Post(title="Text", content="no image", user_id=alice.id),
+                Post(title="Other", content="by bob", user_id=bob.id),
+            ]
+        )
+        db.session.commit()
+
+
+def _urls(post) -> tuple:
+    return (
+        post.image_url(),
+        post.image_url(320),
+        post.image_srcset(),
+        post.image_srcset("image/webp"),
+        post.user.profile_image_url(64),
+        post.user.profile_image_srcset(),
+    )
+
+
+@pytest.mark.parametrize("base_url", ["http://localhost/", "http://localhost/pulse/"])
+def test_rows_match_orm_objects(app, posts, base_url):
+    with app.test_request_context("/", base_url=base_url):
+        rows = readmodel.recent_posts(10)
+        assert not db.session.identity_map
+        orm = Post.query.options(joinedload(Post.user)).filter(
+            Post.id.in_([row.id for row in rows])
+        )
+        by_id = {post.id: post for post in orm}
+
+        assert len(rows) == 3
+        for row in rows:
+            post = by_id[row.id]
+            assert (row.title, row.content, row.date_posted) == (
+                post.title,
+                post.content,
+                post.date_posted,
+            )
+            assert row.user.username == post.user.username
+            assert _urls(row) == _urls(post)
+    photo = next(row for row in rows if row.title == "Photo")
+    assert photo.image_url().startswith(base_url[len("http://localhost") :] + "media/")
+
+
+def test_rows_share_authors_and_only_carry_selected_columns(app, posts):
+    with app.test_request_context("/"):
+        rows = readmodel.posts_by_id(
+            range(1, 4), columns=(Post.title,), author_columns=(User.username,)
+        ).values()
+        authors = {row.user.username: row.user for row in rows}
+        assert sum(row.user is authors["alice"] for row in rows) == 2
+        row = next(iter(rows))
+        assert not hasattr(row, "__dict__")
+        with pytest.raises(AttributeError):
+            getattr(row, "content")  # noqa: B009
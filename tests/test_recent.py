@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+
+from app import db, recent
+from app.models import Post, User
+from app.sqlstats import QueryRecorder
+
+
+def create_user(app, posts: int = 0) -> int:
+    with app.app_context():
+        user = User(username="alice", password="hash")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all(
+            Post(title=f"Post {n}", content="content body", user_id=user.id) for n in range(posts)
+        )
+        db.session.commit()
+        return user.id
+
+
+def home(client) -> tuple[str, int]:
+    with QueryRecorder() as stats:
+        body = client.get("/").get_data(as_text=True)
+    return body, stats.count
+
+
+def test_home_is_served_from_memory(app, client, login_session):
+    login_session(client, create_user(app, posts=8))
+    body, _ = home(client)
+    assert "Post 7" in body and "Post 1" not in body
+
+    for _ in range(3):
+        body, queries = home(client)
+        assert queries == 0
+        assert "Post 7" in body
+
+
+def test_own_writes_patch_the_window(app, client, login_session):
+    user_id = create_user(app, posts=2)
+    login_session(client, user_id)
+    home(client)
+
+    client.post("/create_post", data={"title": "Fresh", "content": "brand new content"})
+    body, queries = home(client)
+    assert "Fresh" in body and queries == 0
+    with app.app_context():
+        post_id = db.session.query(Post.id).filter_by(title="Fresh").scalar()
+
+    client.post(f"/edit_post/{post_id}", data={"title": "Renamed", "content": "brand new content"})
+    client.post(f"/post/{post_id}", data={"content": "first!"})
+    body, queries = home(client)
+    assert "Renamed" in body and "Fresh" not in body
+    assert "Комментарии: 1" in body
+    assert queries == 0
+
+    client.post(f"/delete_post/{post_id}")
+    body, queries = home(client)
+    assert "Renamed" not in body and "Post 1" in body
+    assert queries == 0
+
+
+def test_other_writers_show_up_after_reconcile(app, client, monkeypatch, login_session):
+    user_id = create_user(app, posts=1)
+    login_session(client, user_id)
+    home(client)
+
+    # Written by another process: no session events reach this one.
+    with app.app_context():
+        db.session.execute(
+            insert(Post).values(title="Elsewhere", content="other worker", user_id=user_id)
+        )
+        db.session.commit()
+    assert "Elsewhere" not in home(client)[0]
+
+    later = time.monotonic() + app.config["RECENT_POSTS_TTL"] + 1
+    monkeypatch.setattr(recent, "time", SimpleNamespace(monotonic=lambda: later))
+    assert "Elsewhere" in home(client)[0]
+
+
+def test_emptied_window_reloads_on_next_write(app, client, login_session):
+    app.extensions["pulse_recent"] = recent.RecentPosts(size=2, ttl=60)
+    user_id = create_user(app, posts=3)
+    login_session(client, user_id)
+    home(client)
+    with app.app_context():
+        newest = [row.id for row in app.extensions["pulse_recent"].rows(2)]
+    for post_id in newest:
+        client.post(f"/delete_post/{post_id}")
+
+    resp = client.post("/create_post", data={"title": "Fresh", "content": "brand new content"})
+    assert resp.status_code == 302
+    body = home(client)[0]
+    assert "Fresh" in body and "Post 0" in body
+
+
+def test_partial_window_reloads_when_too_short(app):
+    user_id = create_user(app, posts=5)
+    window = recent.RecentPosts(size=3, ttl=60)
+    with app.app_context():
+        window.reload()
+        newest = [row.id for row in window.rows(3)]
+        window.apply(set(), set(newest[:2]), set())
+        assert [row.id for row in window._rows] == newest[2:]
+
+        db.session.query(Post).filter(Post.id.in_(newest[:2])).delete()
+        db.session.commit()
+        assert len(window.rows(3)) == 3
+        assert all(row.user_id == user_id for row in window.rows(3))
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import db, replicas
+from app.models import Post, User
+from config import TestConfig
+
+
+@pytest.fixture()
+def replica_app(tmp_path, make_app):
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_urls = [f"sqlite:///{tmp_path / f'replica{n}.db'}" for n in range(2)]
+    config = type(
+        "ReplicaConfig",
+        (TestConfig,),
+        {
+            "SQLALCHEMY_DATABASE_URI": primary_url,
+            "DATABASE_REPLICA_URLS": replica_urls,
+            "DATABASE_REPLICA_ENGINE_OPTIONS": {"pool_pre_ping": True, "pool_size": 2},
+            "PAGE_CACHE_BACKEND": "none",
+        },
+    )
+    app = make_app(config)
+    with app.app_context():
+        for engine in app.extensions["pulse_replicas"].engines:
+            db.metadata.create_all(engine)
+        user = User(username="writer", password="hash")
+        db.session.add(user)
+        db.session.commit()
+    # Stand-in for replication: copy the user, then give each replica its own post.
+    for n, url in enumerate(replica_urls):
+        with create_engine(url).begin() as conn:
+            conn.execute(
+                text("INSERT INTO user (id, username, password) VALUES (1, 'writer', 'x')")
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO post (title, content, user_id, date_posted) "
+                    "VALUES (:title, 'content goes here', 1, CURRENT_TIMESTAMP)"
+                ),
+                {"title": f"from replica {n}"},
+            )
+    yield app
+    app.extensions["pulse_replicas"].dispose()
+
+
+def test_read_only_views_round_robin_over_replicas(replica_app):
+    client = replica_app.test_client()
+    first = client.get("/all_posts").get_data(as_text=True)
+    second = client.get("/all_posts").get_data(as_text=True)
+    assert "from replica 0" in first
+    assert "from replica 1" in second
+    payload = client.get("/api/posts").get_json()
+    assert payload["items"][0]["title"] == "from replica 0"
+
+
+def test_writes_go_to_primary(replica_app, login_session):
+    client = replica_app.test_client()
+    login_session(client, 1)
+    resp = client.post("/create_post", data={"title": "Fresh", "content": "content goes here"})
+    assert resp.status_code == 302
+    with replica_app.app_context():
+        titles = db.session.scalars(db.select(Post.title)).all()
+    assert titles == ["Fresh"]
+
+
+def test_redirect_after_write_reads_the_primary(replica_app, login_session, monkeypatch):
+    client = replica_app.test_client()
+    login_session(client, 1)
+    resp = client.post(
+        "/create_post",
+        data={"title": "Fresh", "content": "content goes here"},
+        follow_redirects=True,
+    )
+    assert resp.request.path == "/all_posts"
+    assert "Fresh" in resp.get_data(as_text=True)
+
+    later = time.time() + replica_app.config["DATABASE_REPLICA_PIN_SECONDS"] + 1
+    monkeypatch.setattr(replicas, "time", SimpleNamespace(time=lambda: later))
+    assert "Fresh" not in client.get("/all_posts").get_data(as_text=True)
+
+
+def test_reads_after_write_stay_on_primary(replica_app):
+    with replica_app.test_request_context("/all_posts"):
+        replicas = replica_app.extensions["pulse_replicas"]
+        db.session.info["pulse_replica"] = replicas.next_engine()
+        assert db.session.scalars(db.select(Post.title)).all() == ["from replica 0"]
+
+        db.session.add(Post(title="Mine", content="content goes here", user_id=1))
+        db.session.flush()
+        assert db.session.scalars(db.select(Post.title)).all() == ["Mine"]
+        db.session.commit()
+        assert db.session.scalars(db.select(Post.title)).all() == ["Mine"]
+
+
+def test_comment_post_uses_primary(replica_app, login_session):
+    with replica_app.app_context():
+        post = Post(title="Primary post", content="content goes here", user_id=1)
+        db.session.add(post)
+        db.session.commit()
+        post_id = post.id
+    client = replica_app.test_client()
+    login_session(client, 1)
+    resp = client.post(f"/post/{post_id}", data={"content": "hello there"})
+    assert resp.status_code == 302
+    with replica_app.app_context():
+        assert db.session.get(Post, post_id).comment_count == 1
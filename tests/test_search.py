@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from app import create_app, db
+from app.models import Post
+from app.schema import upgrade_schema
+from app.search import get_backend, rebuild_search_index
+from config import TestConfig
+
+# The tables as the first release created them, before search existed.
+BASELINE_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL PRIMARY KEY,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    password VARCHAR(200) NOT NULL,
+    profile_image VARCHAR(200)
+);
+CREATE TABLE post (
+    id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR(120) NOT NULL,
+    content TEXT NOT NULL,
+    date_posted DATETIME NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES user (id),
+    image VARCHAR(255)
+);
+CREATE TABLE comment (
+    id INTEGER NOT NULL PRIMARY KEY,
+    content TEXT NOT NULL,
+    date_created DATETIME NOT NULL,
+    post_id INTEGER NOT NULL REFERENCES post (id),
+    user_id INTEGER NOT NULL REFERENCES user (id)
+);
+INSERT INTO user (id, username, password) VALUES (1, 'writer', 'hash');
+INSERT INTO post (id, title, content, date_posted, user_id)
+VALUES (1, 'Hello world', 'Written before search', '2024-01-01 00:00:00', 1);
+"""
+POSTS = {
+    "flask": ("Flask tips", "Blueprints and app factories"),
+    "mention": ("Weekend", "Tried flask at the lake"),
+    "other": ("Swimming", "Butterfly stroke drills"),
+}
+
+
+@pytest.fixture()
+def ids(app, seed) -> dict[str, int]:
+    return dict(zip(POSTS, seed(app, *POSTS.values())[1], strict=True))
+
+
+def test_sqlite_uses_fts5_backend(app):
+    with app.app_context():
+        assert get_backend().name == "fts5"
+
+
+def test_api_search_ranks_title_matches_first(client, app, ids):
+    payload = client.get("/api/search?q=flask").get_json()
+    assert [item["id"] for item in payload["items"]] == [ids["flask"], ids["mention"]]
+    assert payload["items"][0]["score"] > payload["items"][1]["score"]
+
+
+def test_search_matches_prefixes_and_requires_query(client, app, ids):
+    payload = client.get("/api/search?q=butter").get_json()
+    assert [item["id"] for item in payload["items"]] == [ids["other"]]
+    assert client.get("/api/search?q=").status_code == 400
+
+
+def test_index_follows_edits_and_deletes(client, app, ids):
+    with app.app_context():
+        post = db.session.get(Post, ids["other"])
+        post.title = "Flask swimming"
+        db.session.delete(db.session.get(Post, ids["mention"]))
+        db.session.commit()
+
+    payload = client.get("/api/search?q=flask").get_json()
+    assert {item["id"] for item in payload["items"]} == {ids["flask"], ids["other"]}
+
+
+def test_rebuild_restores_index(client, app, ids):
+    with app.app_context():
+        db.session.execute(text("INSERT INTO post_fts(post_fts) VALUES ('delete-all')"))
+        db.session.commit()
+        assert client.get("/api/search?q=flask").get_json()["items"] == []
+        rebuild_search_index()
+
+    payload = client.get("/api/search?q=flask").get_json()
+    assert len(payload["items"]) == 2 and payload["items"][0]["id"] == ids["flask"]
+
+
+def test_all_posts_search_uses_index(client, app, ids):
+    body = client.get("/all_posts?search=butterfly").get_data(as_text=True)
+    assert "Swimming" in body
+    assert "Flask tips" not in body
+
+
+def test_upgrade_installs_search_on_an_existing_database(tmp_path):
+    path = tmp_path / "baseline.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(BASELINE_SCHEMA)
+    config = type("UpgradeConfig", (TestConfig,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+    app = create_app(config)
+    with app.app_context():
+        assert "search index (fts5)" in upgrade_schema()
+        assert "search index (fts5)" not in upgrade_schema()
+
+    client = app.test_client()
+    assert "Hello world" in client.get("/all_posts?search=hello").get_data(as_text=True)
+    assert [item["id"] for item in client.get("/api/search?q=hello").get_json()["items"]] == [1]
+    with app.app_context():
+        db.engine.dispose()
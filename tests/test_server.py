@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("gunicorn")
+
+from app.cache import LRUCache, PageCache, SQLiteCache  # noqa: E402
+from app.models import db  # noqa: E402
+from app.server import (  # noqa: E402
+    PulseServer,
+    _post_fork,
+    image_workers,
+    server_options,
+    worker_counts,
+)
+
+
+def test_worker_counts_follow_cpu_count(app, monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    assert worker_counts(app) == (9, 4)
+    assert worker_counts(app, workers=2, threads=1) == (2, 1)
+    app.config["SERVER_WORKERS"] = 3
+    assert worker_counts(app)[0] == 3
+
+
+def test_server_options_preload_the_app(app):
+    options = server_options(app, "127.0.0.1:0")
+    assert options["preload_app"] is True
+    assert options["keepalive"] == app.config["SERVER_KEEPALIVE"]
+    assert options["worker_class"] == "gthread"
+    assert options["forwarded_allow_ips"] == "127.0.0.1"
+    assert "reload" not in options
+
+    server = PulseServer(app, options)
+    assert server.cfg.preload_app is True
+    assert server.cfg.workers == options["workers"]
+    assert server.load() is app
+
+
+def test_serve_shares_the_auto_page_cache_between_workers(app, tmp_path):
+    app.config.update(PAGE_CACHE_BACKEND="auto", PAGE_CACHE_PATH=str(tmp_path / "cache.db"))
+    PulseServer(app, server_options(app, "127.0.0.1:0", workers=1))
+    assert isinstance(app.extensions["pulse_page_cache"].backend, LRUCache)
+
+    PulseServer(app, server_options(app, "127.0.0.1:0", workers=3))
+    assert isinstance(app.extensions["pulse_page_cache"].backend, SQLiteCache)
+
+
+def test_post_fork_disposes_engines_and_cache_handles(app, tmp_path, monkeypatch):
+    disposed = []
+    with app.app_context():
+        engine = db.engine
+        monkeypatch.setattr(
+            type(engine), "dispose", lambda self, close=True: disposed.append(close)
+        )
+    backend = SQLiteCache(tmp_path / "cache.db")
+    backend.set("key", "value", 60)
+    inherited = backend._connect()
+    app.extensions["pulse_page_cache"] = PageCache(backend, 60)
+
+    server = SimpleNamespace(app=SimpleNamespace(application=app), cfg=SimpleNamespace(workers=9))
+    _post_fork(server, None)
+
+    assert disposed == [False]
+    assert backend._connect() is not inherited
+    assert backend.get("key") == "value"
+    assert app.extensions["pulse_recent"]._loaded
+    assert app.extensions["pulse_images"].max_workers == image_workers(app, 9)
+
+
+def test_image_workers_share_cpus_between_web_workers(app, monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    assert image_workers(app, 17) == 1
+    assert image_workers(app, 2) == 4
+    app.config["IMAGE_WORKERS"] = 3
+    assert image_workers(app, 17) == 3
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.models import Comment, Post
+from app.sqlstats import QueryRecorder, statement_shape
+from config import TestConfig
+
+POSTS = [("Post", "content body")] + [(f"Extra {n}", "content body") for n in range(4)]
+
+
+class InstrumentedConfig(TestConfig):
+    SQL_INSTRUMENTATION = True
+    SQL_NPLUSONE_THRESHOLD = 3
+
+
+@pytest.fixture()
+def instrumented_app():
+    app = create_app(InstrumentedConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+def test_statement_shape_collapses_literals_and_in_lists():
+    assert statement_shape("SELECT *\n FROM post WHERE id IN (?, ?, ?) LIMIT 6") == (
+        "SELECT * FROM post WHERE id IN (...) LIMIT ?"
+    )
+
+
+def test_instrumentation_headers(instrumented_app, seed):
+    seed(instrumented_app, *POSTS, comments=4)
+    resp = instrumented_app.test_client().get("/")
+    assert resp.headers["X-DB-Query-Count"] == "1"
+    assert float(resp.headers["X-DB-Time-Ms"]) >= 0
+
+
+def test_instrumentation_is_opt_in(client):
+    assert "X-DB-Query-Count" not in client.get("/").headers
+
+
+def test_repeated_statements_are_logged(instrumented_app, caplog, seed):
+    seed(instrumented_app, *POSTS, comments=4)
+
+    @instrumented_app.route("/n-plus-one")
+    def n_plus_one():
+        counts = [Comment.query.filter_by(post_id=post.id).count() for post in Post.query.all()]
+        return str(sum(counts))
+
+    with caplog.at_level(logging.WARNING):
+        instrumented_app.test_client().get("/n-plus-one")
+    assert any("Possible N+1" in record.getMessage() for record in caplog.records)
+
+
+@pytest.mark.parametrize(
+    ("path", "budget"),
+    [
+        ("/", 1),
+        ("/all_posts", 1),
+        ("/api/posts", 3),
+        ("/api/posts?cursor=", 2),
+        ("/post/{post_id}", 2),
+    ],
+)
+def test_anonymous_routes_query_budget(client, app, query_budget, path, budget, seed):
+    _, (post_id, *_) = seed(app, *POSTS, comments=4)
+    with query_budget(budget):
+        assert client.get(path.format(post_id=post_id)).status_code == 200
+
+
+def test_profile_query_budget(client, app, query_budget, login_session, seed):
+    user_id, _ = seed(app, *POSTS, comments=4)
+    login_session(client, user_id)
+    client.get("/profile")  # warm the session user cache
+    with query_budget(2):
+        assert client.get("/profile").status_code == 200
+
+
+def test_query_budget_fails_when_exceeded(client, app, query_budget, seed):
+    seed(app, *POSTS, comments=4)
+    with pytest.raises(pytest.fail.Exception, match="Query budget 0 exceeded"):
+        with query_budget(0):
+            client.get("/")
+
+
+def test_failed_statements_keep_timers_paired(app):
+    with app.app_context(), QueryRecorder() as stats:
+        connection = db.session.connection()
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM no_such_table"))
+        assert not connection.info.get("pulse_query_start")
+        db.session.rollback()
+        db.session.execute(text("SELECT 1"))
+    assert stats.count == 1
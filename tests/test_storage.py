@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app import db, images
+from app.images import delete_image, retain_image
+from app.models import Post, StoredFile, User
+from app.sqlstats import QueryRecorder
+
+
+@pytest.fixture()
+def create_post(client, make_image):
+    def post(title: str) -> None:
+        client.post(
+            "/create_post",
+            data={"title": title, "content": "content goes here", "image": (make_image(), "m.png")},
+            content_type="multipart/form-data",
+        )
+
+    return post
+
+
+def refcount(app, path: str) -> int | None:
+    with app.app_context():
+        stored = db.session.get(StoredFile, path)
+        return stored.refcount if stored else None
+
+
+@pytest.fixture()
+def uploader(app, client, login_session) -> None:
+    with app.app_context():
+        user = User(username="reposter", password="hash")
+        db.session.add(user)
+        db.session.commit()
+        login_session(client, user.id)
+
+
+def test_identical_uploads_share_one_file(app, client, uploader, create_post):
+    create_post("First")
+    create_post("Second")
+
+    with app.app_context():
+        first, second = Post.query.order_by(Post.id).all()
+        ids, path = (first.id, second.id), first.image
+        assert second.image == path
+        assert len(Path(path).stem) == 64  # sha256 of the normalized bytes
+    assert refcount(app, path) == 2
+    stored = Path(app.static_folder) / path
+
+    client.post(f"/delete_post/{ids[0]}")
+    assert stored.exists()
+    assert refcount(app, path) == 1
+
+    client.post(f"/delete_post/{ids[1]}")
+    assert not stored.exists()
+    assert refcount(app, path) is None
+
+
+def test_reuploading_same_image_keeps_file(app, client, uploader, create_post, make_image):
+    create_post("Same")
+    with app.app_context():
+        post = Post.query.one()
+        post_id, path = post.id, post.image
+
+    client.post(
+        f"/edit_post/{post_id}",
+        data={"title": "Same", "content": "content goes here", "image": (make_image(), "m.png")},
+        content_type="multipart/form-data",
+    )
+    assert (Path(app.static_folder) / path).exists()
+    assert refcount(app, path) == 1
+
+
+def test_untracked_legacy_upload_is_deleted(app):
+    folder = Path(app.config["POST_UPLOAD_FOLDER"])
+    folder.mkdir(parents=True, exist_ok=True)
+    legacy = folder / "0123abcd.png"
+    Image.new("RGB", (8, 8)).save(legacy)
+
+    with app.app_context():
+        relative = legacy.resolve().relative_to(Path(app.static_folder).resolve()).as_posix()
+        delete_image(relative)
+    assert not legacy.exists()
+
+
+def test_retain_is_a_single_upsert(app):
+    with app.app_context(), QueryRecorder(keep_statements=True) as stats:
+        retain_image("uploads/posts/shared.png")
+        retain_image("uploads/posts/shared.png", 2)
+        db.session.commit()
+    assert refcount(app, "uploads/posts/shared.png") == 3
+    writes = [sql for sql, _ in stats.statements if not sql.lstrip().startswith("SELECT")]
+    assert all("ON CONFLICT" in sql for sql in writes[:2])
+
+
+def test_upload_restores_files_deleted_while_it_was_retaining(
+    app, uploader, create_post, monkeypatch
+):
+    original = images.retain_image
+
+    def retain_after_concurrent_delete(relative_path, count=1):
+        # Another request released the last reference and unlinked the file just now.
+        (Path(app.static_folder) / relative_path).unlink()
+        original(relative_path, count)
+
+    monkeypatch.setattr(images, "retain_image", retain_after_concurrent_delete)
+    create_post("Racy")
+
+    with app.app_context():
+        path = Post.query.one().image
+    assert (Path(app.static_folder) / path).exists()
+    assert refcount(app, path) == 1
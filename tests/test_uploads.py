@@ -3,7 +3,7 @@ from __future__ import annotations
 from io import BytesIO
 from pathlib import Path
 
-from PIL import Image
+from PIL import Image, ImageFile
 
 from app import db
 from app.models import Post
@@ -113,3 +113,66 @@ def test_file_cleanup_on_replace_and_delete(client, app):
     resp = client.post(f"/delete_post/{post_id}", follow_redirects=True)
     assert resp.status_code == 200
     assert not new_path.exists()
+
+
+def test_reject_oversized_dimensions_before_decoding(client, app, monkeypatch):
+    register_and_login(client)
+    app.config.update(MAX_IMAGE_WIDTH=100, MAX_IMAGE_HEIGHT=100)
+    wide = (make_image_bytes(size=(101, 10)), "wide.png", "image/png")
+    decoded = []
+    monkeypatch.setattr(ImageFile.ImageFile, "load", lambda self: decoded.append(self))
+
+    resp = client.post(
+        "/create_post",
+        data={"title": "Wide", "content": "content goes here", "image": wide},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 400
+    assert "100×100".encode() in resp.data
+    assert decoded == []
+
+
+def test_reject_pixel_count_limit(client, app):
+    register_and_login(client)
+    app.config["MAX_IMAGE_PIXELS"] = 50 * 50
+    square = (make_image_bytes(size=(60, 60)), "big.png", "image/png")
+    resp = client.post(
+        "/create_post",
+        data={"title": "Big", "content": "content goes here", "image": square},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 400
+    with app.app_context():
+        assert Post.query.count() == 0
+
+
+def test_reject_mismatched_magic_bytes(client, app):
+    register_and_login(client)
+    disguised = (BytesIO(b"GIF89a" + b"\x00" * 64), "a.gif", "image/gif")
+    resp = client.post(
+        "/create_post",
+        data={"title": "Fake", "content": "content goes here", "image": disguised},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 400
+
+
+def test_upload_header_is_parsed_once(client, app, monkeypatch):
+    register_and_login(client)
+    opened = []
+    original_open = Image.open
+
+    def counting_open(fp, *args, **kwargs):
+        opened.append(fp)
+        return original_open(fp, *args, **kwargs)
+
+    monkeypatch.setattr(Image, "open", counting_open)
+    upload = (make_image_bytes(size=(40, 40)), "ok.png", "image/png")
+    resp = client.post(
+        "/create_post",
+        data={"title": "Once", "content": "content goes here", "image": upload},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 302
+    # One header parse during validation, one full decode while re-encoding.
+    assert len(opened) == 2
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from PIL import Image
+
+from app import db
+from app.images import backfill_variants
+from app.models import Post, User
+
+
+def static_path(app, relative: str) -> Path:
+    return Path(app.static_folder) / relative
+
+
+def test_post_upload_writes_downscaled_variants(app, client, login_session, make_image, make_user):
+    login_session(client, make_user(app))
+    resp = client.post(
+        "/create_post",
+        data={
+            "title": "Wide",
+            "content": "content goes here",
+            "image": (make_image((900, 300), "JPEG"), "a.jpg"),
+        },
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 302
+
+    with app.app_context():
+        post = Post.query.one()
+        variants = post.image_variants
+        # 1280 would upscale the 900px original, so only 320 and 640 exist.
+        assert sorted({v["width"] for v in variants}) == [320, 640]
+        assert {v["type"] for v in variants} == {"image/jpeg", "image/webp"}
+        for variant in variants:
+            with Image.open(static_path(app, variant["path"])) as image:
+                assert image.width == variant["width"]
+                assert image.height == round(300 * variant["width"] / 900)
+
+        with app.test_request_context():
+            assert post.image_url(200).endswith("_320.jpg")
+            assert post.image_url(2000) == post.image_url()
+            assert post.image_srcset().count("w,") == 1
+            assert "_640.webp 640w" in post.image_srcset("image/webp")
+
+        payload = client.get("/api/posts?cursor=").get_json()
+        assert payload["items"][0]["thumbnail"].endswith("_320.jpg")
+
+    page = client.get(f"/post/{post.id}").get_data(as_text=True)
+    assert 'type="image/webp"' in page
+    assert "_320.jpg 320w" in page
+
+
+def test_avatar_variants_are_square_and_removed_on_replace(
+    app, client, login_session, make_image, make_user
+):
+    user_id = make_user(app)
+    login_session(client, user_id)
+
+    def upload(color):
+        return client.post(
+            "/profile",
+            data={"profile_picture": (make_image((300, 200), "PNG", color), "me.png")},
+            content_type="multipart/form-data",
+        )
+
+    upload((255, 0, 0))
+    with app.app_context():
+        first = db.session.get(User, user_id).profile_image_variants
+    assert sorted({v["width"] for v in first}) == [64, 128]
+    for variant in first:
+        with Image.open(static_path(app, variant["path"])) as image:
+            assert image.size == (variant["width"], variant["width"])
+
+    upload((0, 255, 0))
+    assert not any(static_path(app, v["path"]).exists() for v in first)
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        with app.test_request_context():
+            assert user.profile_image_url(64).endswith("_64.png")
+            assert "_128.png 128w" in user.profile_image_srcset()
+
+
+def test_deleting_post_removes_variants(app, client, login_session, make_image, make_user):
+    login_session(client, make_user(app))
+    client.post(
+        "/create_post",
+        data={
+            "title": "Gone",
+            "content": "content goes here",
+            "image": (make_image((700, 700), "JPEG"), "a.jpg"),
+        },
+        content_type="multipart/form-data",
+    )
+    with app.app_context():
+        post = Post.query.one()
+        post_id, paths = post.id, [post.image] + [v["path"] for v in post.image_variants]
+    assert all(static_path(app, path).exists() for path in paths)
+
+    client.post(f"/delete_post/{post_id}")
+    assert not any(static_path(app, path).exists() for path in paths)
+
+
+def test_backfill_variants_for_existing_upload(app):
+    folder = Path(app.config["POST_UPLOAD_FOLDER"])
+    folder.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (800, 400)).save(folder / "legacy.png")
+
+    with app.app_context():
+        relative = (folder / "legacy.png").resolve().relative_to(Path(app.static_folder).resolve())
+        variants = backfill_variants(relative.as_posix(), "POST_UPLOAD_FOLDER")
+    assert sorted(v["width"] for v in variants if v["type"] == "image/png") == [320, 640]
+    assert all(static_path(app, v["path"]).exists() for v in variants)